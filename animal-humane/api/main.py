@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any
 import traceback
 import asyncio
+from contextlib import asynccontextmanager
 from functools import wraps
 
 from fastapi import FastAPI, HTTPException, Depends, status, Request, Header, Query
@@ -18,6 +19,7 @@ from models.api_models import (
 )
 from services.dog_service import DogService
 from services.elasticsearch_service import ElasticsearchService
+from services.request_cache import request_scope
 from utils.logger import setup_logger
 
 import os
@@ -58,11 +60,21 @@ def cached(cache_key: str):
         return wrapper
     return decorator
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One Elasticsearch service (clients, connection pools, thread pool) for every request
+    app.state.es_service = ElasticsearchService(config.elasticsearch)
+    try:
+        yield
+    finally:
+        await app.state.es_service.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Animal Humane API",
     description="API for shelter dog tracking and analytics",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -74,9 +86,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_cache_scope(request: Request, call_next):
+    # Each Elasticsearch read runs at most once per request (see services/request_cache.py)
+    with request_scope():
+        return await call_next(request)
+
 # Dependency injection
 def get_elasticsearch_service() -> ElasticsearchService:
-    return ElasticsearchService()
+    return app.state.es_service
 
 def get_dog_service(es_service: ElasticsearchService = Depends(get_elasticsearch_service)) -> DogService:
     return DogService(es_service)
@@ -160,9 +178,7 @@ async def refresh_cache(request: Request, key: str = Query(...)):
             # Call the missing-dogs reader which will cache via decorator
             await get_missing_dogs()
         elif key == "diff_analysis":
-            from services.elasticsearch_service import ElasticsearchService
-            es_service = ElasticsearchService()
-            await es_service.get_diff_analysis()
+            await get_elasticsearch_service().get_diff_analysis()
         elif key == "overview":
             # trigger overview computation
             # Note: get_overview depends on DogService; we call the endpoint indirectly
@@ -213,6 +229,27 @@ async def get_new_dogs_this_week(es_service: ElasticsearchService = Depends(get_
         logger.error(f"Error getting new dogs this week: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/state", response_model=APIResponse)
+async def get_state(
+    at: str = Query(..., description="ISO datetime; naive values are shelter local time"),
+    es_service: ElasticsearchService = Depends(get_elasticsearch_service)
+):
+    """Get every dog listed on the site as of a past moment"""
+    try:
+        moment = datetime.fromisoformat(at.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid 'at' datetime: {at}")
+    try:
+        state = await es_service.get_state_at(moment)
+        if state is None:
+            raise HTTPException(status_code=404, detail=f"No scrape at or before {at}")
+        return APIResponse.success_response(state)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting state at {at}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/dogs", response_model=APIResponse)
 async def get_dogs(dog_service: DogService = Depends(get_dog_service)):
     """Get all available dogs"""
@@ -379,12 +416,12 @@ async def get_diff_analysis(es_service: ElasticsearchService = Depends(get_elast
 
 @app.get("/api/recent-pupdates", response_model=APIResponse)
 @cached("recent_pupdates")
-async def get_recent_pupdates():
+async def get_recent_pupdates(es_service: ElasticsearchService = Depends(get_elasticsearch_service)):
     """Get recent pupdates data (new dogs, returned dogs, adoptions, etc.)"""
     try:
         from services.recent_pupdates_service import RecentPupdatesService
         from dataclasses import asdict
-        service = RecentPupdatesService()
+        service = RecentPupdatesService(es_service)
         data = await service.get_recent_pupdates()
         return APIResponse.success_response(asdict(data))
     except Exception as e:
@@ -442,8 +479,7 @@ async def get_missing_dogs():
 @app.get("/api/debug/raw-diff")
 async def debug_raw_diff():
     try:
-        from services.elasticsearch_service import ElasticsearchService
-        es_service = ElasticsearchService()
+        es_service = get_elasticsearch_service()
         # Run and return raw result
         result = await es_service.get_diff_analysis()
         return result
@@ -511,8 +547,7 @@ async def remove_adopted_override(dog_id: int = Query(...)):
 async def debug_inspect_prince():
     """Return intermediate values to help trace why Prince Charming is not in adopted list"""
     try:
-        from services.elasticsearch_service import ElasticsearchService
-        es_service = ElasticsearchService()
+        es_service = get_elasticsearch_service()
 
         # Get current availables
         availables = await es_service.get_current_availables()
@@ -548,7 +583,7 @@ async def debug_inspect_prince():
             "size": 1000
         }
 
-        raw_recent_resp = es_service.handler.es.search(index='animal-humane-*', body=recent_query)
+        raw_recent_resp = await es_service.async_handler.es.search(index='animal-humane-*', body=recent_query)
         raw_recent_ids = [hit.get('_source', {}).get('id') for hit in raw_recent_resp.get('hits', {}).get('hits', [])][:50]
 
         # Run the verification search used for trial verification
@@ -558,7 +593,7 @@ async def debug_inspect_prince():
             "_source": ["name", "id", "status", "timestamp", "url", "location"],
             "size": 1
         }
-        verify_resp = es_service.handler.es.search(index='animal-humane-*', body=verify_body)
+        verify_resp = await es_service.async_handler.es.search(index='animal-humane-*', body=verify_body)
         verify_hits = verify_resp.get('hits', {}).get('hits', [])
         verify_top = None
         if verify_hits:
@@ -4,13 +4,15 @@ Auto-monitor for new Elasticsearch indices and update timestamp automatically
 Runs locally and pushes updates to git when new indices are detected
 """
 import json
-import requests
+import os
 import subprocess
 import time
 from datetime import datetime
 from pathlib import Path
 import logging
 
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -19,6 +21,8 @@ class IndexMonitor:
     def __init__(self):
         self.last_known_index = self.load_last_known_index()
         self.repo_path = Path(__file__).parent
+        es_host = os.getenv('ELASTICSEARCH_HOST', 'http://localhost:9200')
+        self.handler = ElasticsearchHandler(host=es_host, index_name="animal-humane-latest")
         
     def load_last_known_index(self):
         """Load the last known index from our tracking file"""
@@ -36,20 +40,8 @@ class IndexMonitor:
     def get_latest_index(self):
         """Get the most recent animal-humane index from Elasticsearch"""
         try:
-            response = requests.get('http://localhost:9200/_cat/indices/animal-humane-*?format=json&h=index', timeout=10)
-            if response.status_code != 200:
-                logger.error(f"Failed to query Elasticsearch: {response.status_code}")
-                return None
-                
-            indices = response.json()
-            if not indices:
-                logger.warning("No animal-humane indices found")
-                return None
-                
-            # Find the most recent index
-            index_names = [idx['index'] for idx in indices]
-            latest_index = sorted(index_names)[-1]
-            return latest_index
+            # Cheap to call every poll: the catalog only re-lists indices once a scrape lands
+            return self.handler.index_catalog.latest_scrape()
             
         except Exception as e:
             logger.error(f"Error querying Elasticsearch: {e}")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Load archived scrapes (archived_data/*.ndjson, in _bulk format) into Elasticsearch.
+Files are streamed in chunks with several requests in flight; rejected (429)
+requests back off and retry, and documents that still fail are reported.
+"""
+import argparse
+import glob
+import itertools
+import os
+
+from elasticsearch import Elasticsearch
+
+from shelterdog_tracker.bulk_ingest import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_MAX_CHUNK_BYTES, DEFAULT_WORKERS, bulk_ingest, read_bulk_ndjson
+)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('paths', nargs='*', default=['archived_data/*.ndjson'], help='Files or globs to load')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Documents per bulk request')
+    parser.add_argument('--max-chunk-bytes', type=int, default=DEFAULT_MAX_CHUNK_BYTES, help='Bytes per bulk request')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Bulk requests in flight')
+    args = parser.parse_args()
+
+    es_host = os.getenv('ELASTICSEARCH_HOST', 'http://localhost:9200')
+    es = Elasticsearch(es_host, request_timeout=60)
+    files = sorted(itertools.chain.from_iterable(glob.glob(pattern) for pattern in args.paths))
+    if not files:
+        print("❌ No files to load")
+        return
+
+    print(f"📦 Loading {len(files)} files into {es_host}")
+    result = bulk_ingest(
+        es,
+        itertools.chain.from_iterable(read_bulk_ndjson(path) for path in files),
+        chunk_size=args.chunk_size,
+        max_chunk_bytes=args.max_chunk_bytes,
+        workers=args.workers
+    )
+    print(f"✅ Indexed {result.indexed} documents in {result.chunks} requests")
+    if result.failed:
+        print(f"⚠️  {len(result.failed)} documents failed, first error: {result.failed[0]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Compact old animal-humane-YYYYMMDD-HHMM indices into daily and monthly indices.
+Runs nightly from the scheduler; run by hand with --dry-run to see the plan first.
+"""
+import argparse
+import os
+
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+from shelterdog_tracker.index_compaction import (
+    DEFAULT_KEEP_DAYS, DEFAULT_MONTHLY_AFTER_DAYS, compact_indices
+)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keep-days', type=int, default=DEFAULT_KEEP_DAYS,
+                        help='Leave per-scrape indices from the last N days alone')
+    parser.add_argument('--monthly-after-days', type=int, default=DEFAULT_MONTHLY_AFTER_DAYS,
+                        help='Roll months that ended more than N days ago into monthly indices')
+    parser.add_argument('--dry-run', action='store_true', help='Print the plan without changing anything')
+    args = parser.parse_args()
+
+    es_host = os.getenv('ELASTICSEARCH_HOST', 'http://localhost:9200')
+    handler = ElasticsearchHandler(host=es_host, index_name="animal-humane-latest")
+
+    print(f"🗜️  Compacting animal-humane indices on {es_host}")
+    done = compact_indices(
+        handler.es,
+        keep_days=args.keep_days,
+        monthly_after_days=args.monthly_after_days,
+        dry_run=args.dry_run
+    )
+    print(f"✅ {len(done)} compacted indices {'planned' if args.dry_run else 'written'}")
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,10 @@ class ElasticsearchConfig:
     host: str = "http://localhost:9200"
     timeout: int = 60
     max_retries: int = 3
+    # Connections kept open per node by each client the API shares across requests
+    pool_maxsize: int = 10
+    # Threads running the synchronous handler for the API's multi-step queries
+    executor_workers: int = 4
 
 @dataclass
 class APIConfig:
@@ -56,8 +60,10 @@ class Config:
         elif es_host:
             #print(f"DEBUG: Setting elasticsearch.host to {es_host}")
             self.elasticsearch.host = es_host
-        else:
-            #print(f"DEBUG: No env vars found, using default: {self.elasticsearch.host}")
+        if os.getenv("ES_POOL_MAXSIZE"):
+            self.elasticsearch.pool_maxsize = int(os.getenv("ES_POOL_MAXSIZE"))
+        if os.getenv("ES_EXECUTOR_WORKERS"):
+            self.elasticsearch.executor_workers = int(os.getenv("ES_EXECUTOR_WORKERS"))
             
         if os.getenv("API_PORT"):
             self.api.port = int(os.getenv("API_PORT"))
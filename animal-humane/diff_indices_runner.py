@@ -4,7 +4,6 @@ from datetime import datetime
 import json
 import sys
 
-from elasticsearch import Elasticsearch
 from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
 from output_utils import print_dog_groups
 from config import config
@@ -42,21 +41,12 @@ def check_unlisteds_for_adoptees(results):
 
     # Collect dogs to move
     to_move = []
+    handler = ElasticsearchHandler(host="http://elasticsearch:9200", index_name="animal-humane-latest")
+    latest = handler.latest_docs([dog['dog_id'] for dog in other_unlisted], fields=["location"])
     for dog in other_unlisted:
-        dog_id = dog['dog_id']
-        es = Elasticsearch("http://elasticsearch:9200")
-        query = {
-            "sort": {"_index": {"order": "desc"}},
-            "query": {"match": {"id": dog_id}}
-        }
-        response = es.search(
-            index="animal-humane-*",
-            body=query,
-            size=1
-        )
-        hits = response.get('hits', {}).get('hits', [])
-        if hits:
-            doc = hits[0]['_source']
+        found = latest.get(int(dog['dog_id']))
+        if found:
+            doc = found.source
             if doc.get('location', '') == '':
                 to_move.append(dog)
             else:
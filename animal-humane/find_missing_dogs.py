@@ -55,52 +55,15 @@ def get_existing_dog_ids_from_elasticsearch() -> Set[int]:
             index_name="animal-humane-latest"
         )
 
-        # Get all existing dog IDs from Elasticsearch
-        # We'll query across all animal-humane indices
-        existing_ids = set()
-
-        # Get only open indices to avoid closed index exceptions
-        indices_info = handler.es.cat.indices(format='json')
-        open_indices = [index['index'] for index in indices_info
-                       if index.get('status') == 'open' and index['index'].startswith('animal-humane-')]
-
-        if not open_indices:
-            print("No open animal-humane indices found in Elasticsearch")
+        # Every scrape's ids are kept as a sorted id set (see shelterdog_tracker/dog_id_sets.py),
+        # so "every dog ever listed" is a union in memory rather than a query per batch of indices
+        id_sets = handler.get_scrape_id_sets()
+        if not len(id_sets):
+            print("No animal-humane scrapes found in Elasticsearch")
             return set()
 
-        print(f"Querying {len(open_indices)} open indices...")
-
-        # To avoid HTTP line length limits, we'll query indices in batches
-        batch_size = 50  # Process 50 indices at a time
-        all_batches = [open_indices[i:i + batch_size] for i in range(0, len(open_indices), batch_size)]
-
-        for batch_num, batch_indices in enumerate(all_batches, 1):
-            print(f"Processing batch {batch_num}/{len(all_batches)} ({len(batch_indices)} indices)...")
-
-            # Query for all unique IDs in this batch
-            query = {
-                "size": 0,
-                "aggs": {
-                    "unique_ids": {
-                        "terms": {
-                            "field": "id",
-                            "size": 100000  # Large size to get all IDs
-                        }
-                    }
-                },
-                "query": {"match_all": {}}
-            }
-
-            try:
-                response = handler.es.search(index=batch_indices, body=query)
-
-                # Extract IDs from aggregation results
-                if "aggregations" in response and "unique_ids" in response["aggregations"]:
-                    for bucket in response["aggregations"]["unique_ids"]["buckets"]:
-                        existing_ids.add(int(bucket["key"]))
-            except Exception as e:
-                print(f"Warning: Failed to query batch {batch_num}: {e}")
-                continue
+        print(f"Combining dog ids from {len(id_sets)} scrapes...")
+        existing_ids = {int(dog_id) for dog_id in id_sets.union()}
 
         return existing_ids
 
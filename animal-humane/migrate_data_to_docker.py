@@ -6,7 +6,9 @@ import json
 import requests
 from datetime import datetime
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import scan, bulk
+from elasticsearch.helpers import scan
+
+from shelterdog_tracker.bulk_ingest import bulk_ingest
 
 def main():
     print("🔄 Migrating Elasticsearch Data to Docker")
@@ -93,28 +95,16 @@ def main():
                 }
             )
             
-            # Migrate documents
-            docs = []
-            doc_count = 0
-            
-            for doc in scan(local_es, index=index_name, query={"query": {"match_all": {}}}):
-                docs.append({
-                    "_index": index_name,
-                    "_id": doc["_id"],
-                    "_source": doc["_source"]
-                })
-                doc_count += 1
-                
-                # Bulk insert every 100 documents
-                if len(docs) >= 100:
-                    bulk(docker_es, docs)
-                    docs = []
-            
-            # Insert remaining documents
-            if docs:
-                bulk(docker_es, docs)
+            # Stream documents across in chunks, several requests at a time
+            result = bulk_ingest(
+                docker_es,
+                ({"_index": index_name, "_id": doc["_id"], "_source": doc["_source"]}
+                 for doc in scan(local_es, index=index_name, query={"query": {"match_all": {}}}))
+            )
+            if result.failed:
+                print(f"   ⚠️  {len(result.failed)} documents failed, first error: {result.failed[0]}")
             
-            print(f"   ✅ Migrated {doc_count} documents")
+            print(f"   ✅ Migrated {result.indexed} documents")
         
         # Update the alias to point to the most recent index
         if animal_indices:
@@ -8,7 +8,9 @@ import requests
 import argparse
 from datetime import datetime
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import scan, bulk
+from elasticsearch.helpers import scan
+
+from shelterdog_tracker.bulk_ingest import bulk_ingest
 
 def get_available_indices(es_client, pattern="animal-humane-"):
     """Get list of available indices matching pattern"""
@@ -51,28 +53,16 @@ def migrate_index(local_es, docker_es, index_name, force=False):
             }
         )
         
-        # Migrate documents
-        docs = []
-        doc_count = 0
-        
-        for doc in scan(local_es, index=index_name, query={"query": {"match_all": {}}}):
-            docs.append({
-                "_index": index_name,
-                "_id": doc["_id"],
-                "_source": doc["_source"]
-            })
-            doc_count += 1
-            
-            # Bulk insert every 100 documents
-            if len(docs) >= 100:
-                bulk(docker_es, docs)
-                docs = []
-        
-        # Insert remaining documents
-        if docs:
-            bulk(docker_es, docs)
+        # Stream documents across in chunks, several requests at a time
+        result = bulk_ingest(
+            docker_es,
+            ({"_index": index_name, "_id": doc["_id"], "_source": doc["_source"]}
+             for doc in scan(local_es, index=index_name, query={"query": {"match_all": {}}}))
+        )
+        if result.failed:
+            print(f"   ⚠️  {len(result.failed)} documents failed, first error: {result.failed[0]}")
         
-        print(f"   ✅ Migrated {doc_count} documents")
+        print(f"   ✅ Migrated {result.indexed} documents")
         return True
         
     except Exception as e:
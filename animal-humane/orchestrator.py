@@ -5,7 +5,8 @@ import os
 import subprocess
 import sys
 from datetime import datetime
-from elasticsearch import Elasticsearch
+
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,7 +15,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-
 def run_in_container_and_get_urls(container, script):
     result = subprocess.run(["docker", "exec", "-i", container, "python", script], capture_output=True, text=True, timeout=30)
     #print("STDOUT:", repr(result.stdout))  # Shows the exact stdout output
@@ -35,73 +35,49 @@ def run_in_container_and_get_urls(container, script):
         return None
 
 # result is: {'adoptions': [{'name': 'Princess Bubble Gum ', 'dog_id': 212478123, 'url': 'https://new.shelterluv.com/embed/animal/212478123', 'location': ''}], 
-def update_adoption(es, adopted_dogs):
-    for dog in adopted_dogs:
-        dog_id = dog["dog_id"]
-        # Find the most recent document for this dog_id
-        res = es.search(
-            index="animal-humane-*",
-            body={
-                "query": {"match": {"id": dog_id}},
-                "sort":[{"_index":{"order":"desc"}}],
-                "size": 1
-            }
-        )
-        hits = res["hits"]["hits"]
-        if hits:
-            doc = hits[0] 
-            es.update(
-                index=doc["_index"],
-                id=doc["_id"],
-                body={"doc": {"status": "adopted", "location":""}}
-            )
+def update_adoption(handler, adopted_dogs):
+    # The handler finds each dog's most recent document and updates them all in one bulk request
+    handler.apply_corrections(
+        (dog["dog_id"], {"status": "adopted", "location": ""}) for dog in adopted_dogs
+    )
 
 #'returned': [{'name': 'Snapdragon', 'dog_id': 212533095, 'url': 'https://new.shelterluv.com/embed/animal/212533095', 'location': 'Main Cam    pus - Main Kennel South, MKS-05'}],
-def update_return(es, returned_dogs):#
-
+def update_return(handler, returned_dogs):#
+    # Find the two most recent docs for every dog at once
+    recent = handler.recent_docs(
+        [dog["dog_id"] for dog in returned_dogs], fields=["timestamp", "returned"], size=2
+    )
+    corrections = []
     for dog in returned_dogs:
         dog_id = dog["dog_id"]
-        # Find the most recent docs for this dog
-        res = es.search(
-            index="animal-humane-*",
-            body={"query": {"match": {"id": dog_id}}, "sort":[{"_index":{"order":"desc"}}], "size": 2 })
-         
-        hits = res["hits"]["hits"]
+        hits = recent.get(int(dog_id), [])
+        if len(hits) < 2:
+            continue
 
         #Increment just once on the day the dog is returned 
-        doc1 = hits[0]["_source"]
-        doc2 = hits[1]["_source"]
+        doc1 = hits[0].source
+        doc2 = hits[1].source
         date1 = doc1.get("timestamp", "")[:10]  # Adjust field/format as needed
         date2 = doc2.get("timestamp", "")[:10]  # Adjust field/format as needed
         if date1 == date2:
             # Dates are the same, skip update
             continue
         else:
-            index = hits[0]["_index"] 
-            doc_id = hits[0]["_id"]
             current_returned = doc1.get("returned", 0)
-            es.update(
-                index=index,
-                id=doc_id,
-                body={"doc": {"returned": current_returned + 1}}
-            )
+            corrections.append((dog_id, {"returned": current_returned + 1}))
+
+    latest = {dog_id: hits[0] for dog_id, hits in recent.items() if hits}
+    handler.apply_corrections(corrections, latest=latest)
          
 #'trial_adoptions': [{'name': 'Wilbur', 'dog_id': 210495598, 'url': 'https://new.shelterluv.com/embed/animal/210495598', 'location': 'Main Campus, Trial Adoption', 'origin': 'ABQ Animal Welfare Department', 'status': 'Available', 'intake_date': '2026-01-07', 'length_of_stay_days': 2, 'birthdate': '2024-09-18', 'age_group': 'Adult', 'breed': 'Retriever, Labrador', 'secondary_breed': 'Mix', 'weight_grou
-def update_trial_adoption(es,trial_dogs):
-    for dog in trial_dogs:
-        contains_trial_adoption = "Trial Adoption" in dog["location"]
-        if contains_trial_adoption:
-            pass
-        else:
-            res = es.search(index="animal-humane-*",body={"query":{"match":{"id":"dog_id"}},"sort":[{"_index":{"order":"desc"}}],"size":1})
-            hits = res["hits"]["hits"]
-            if hits:
-                doc = hits[0]
-                es.update(
-                    index=doc["_index"],
-                    id=doc["_id"],
-                    body={"doc": {"location":dog["location"].split(",", 1)[0] + ", Trial Adoption"}}
-                )
+def update_trial_adoption(handler, trial_dogs):
+    corrections = [
+        (dog["dog_id"], {"location": dog["location"].split(",", 1)[0] + ", Trial Adoption"})
+        for dog in trial_dogs
+        if "Trial Adoption" not in dog["location"]
+    ]
+    handler.apply_corrections(corrections)
+
 def run_script(script_name):
     print(f"Running {script_name}...")
     result = subprocess.run([sys.executable, script_name], capture_output=True, text=True)
@@ -125,7 +101,7 @@ def git_push():
 
 if __name__ == "__main__":
     logger.info("Running orchestrator.py")
-    es = Elasticsearch("http://localhost:9200")
+    handler = ElasticsearchHandler(host="http://localhost:9200", index_name="animal-humane-latest")
 
     # 1. Run diff_indices_runner.py inside the api docker container diff_indices_runner.py doesn't return anything
     #    It checks for differences and updates where necessary. It's stand-alone, which is why the updates here 
@@ -150,7 +126,7 @@ if __name__ == "__main__":
     #    print("Adopted dogs")
     #    print(json.dumps(adoption_fields),end="")
 
-    #    update_adoption(es, adoption_fields)
+    #    update_adoption(handler, adoption_fields)
 
     #if result.get("returned"):
     #    returned_fields = [
@@ -164,7 +140,7 @@ if __name__ == "__main__":
     #    print("Dogs that have been returned")
     #    print(json.dumps(returned_fields),end="")
 
-    #    update_return(es, returned_fields)
+    #    update_return(handler, returned_fields)
 
         
 
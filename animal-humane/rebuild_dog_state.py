@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Build the dog-state index (one document per dog) from existing animal-humane snapshots,
+and backfill the dog-events transition log by replaying them in order.
+Run once after upgrading; afterwards every scrape keeps it current. Safe to re-run.
+"""
+import os
+
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler, DOG_STATE_INDEX
+
+def main():
+    es_host = os.getenv('ELASTICSEARCH_HOST', 'http://localhost:9200')
+    handler = ElasticsearchHandler(host=es_host, index_name="animal-humane-latest")
+
+    print(f"🔄 Rebuilding {DOG_STATE_INDEX} from snapshot indices on {es_host}")
+    count = handler.rebuild_dog_state()
+    print(f"✅ Processed {count} snapshot indices")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+One-off: rebuild existing animal-humane-* indices under the versioned index template.
+
+Indices created before the template have dynamic mappings (mixed text/keyword/long
+field types). Each one is copied to a temporary index, recreated under the template
+(same name, aliases and read-only setting) and copied back. Document counts are
+checked at both steps; an index is never deleted before its copy is verified.
+Indices already on the current template version are skipped, so it's safe to re-run.
+"""
+import argparse
+import os
+
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+from shelterdog_tracker.index_template import (
+    SNAPSHOT_TEMPLATE_VERSION, ensure_snapshot_template, index_template_version
+)
+
+TMP_PREFIX = "reindex-tmp-"  # outside animal-humane-* so readers never see the copies
+
+
+def copy_index(es, source, dest):
+    expected = es.count(index=source)["count"]
+    es.options(request_timeout=3600).reindex(
+        body={"source": {"index": source}, "dest": {"index": dest}},
+        wait_for_completion=True,
+        refresh=True
+    )
+    copied = es.count(index=dest)["count"]
+    if copied != expected:
+        raise RuntimeError(f"Copied {copied} of {expected} documents from {source} to {dest}")
+    return copied
+
+
+def reindex_one(es, index):
+    tmp = f"{TMP_PREFIX}{index}"
+    settings = es.indices.get_settings(index=index)[index]["settings"]["index"]
+    read_only = str(settings.get("blocks", {}).get("write", "false")).lower() == "true"
+    aliases = list(es.indices.get_alias(index=index)[index].get("aliases", {}).keys())
+
+    if es.indices.exists(index=tmp):
+        es.indices.delete(index=tmp)
+    # dynamic: false keeps _source intact without tripping over the old mixed types
+    es.indices.create(index=tmp, body={"mappings": {"dynamic": False}})
+    count = copy_index(es, index, tmp)
+
+    es.indices.delete(index=index)
+    es.indices.create(index=index)  # the template supplies settings and mappings
+    copy_index(es, tmp, index)
+
+    if aliases:
+        es.indices.update_aliases(body={"actions": [{"add": {"index": index, "alias": a}} for a in aliases]})
+    if read_only:
+        es.indices.put_settings(index=index, body={"index.blocks.write": True})
+    es.indices.delete(index=tmp)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--index', action='append', help='Only these indices (repeatable)')
+    parser.add_argument('--dry-run', action='store_true', help='List indices that would be rebuilt')
+    args = parser.parse_args()
+
+    es_host = os.getenv('ELASTICSEARCH_HOST', 'http://localhost:9200')
+    handler = ElasticsearchHandler(host=es_host, index_name="animal-humane-latest")
+    es = handler.es
+    ensure_snapshot_template(es)
+
+    if args.index:
+        indices = args.index
+    else:
+        resp = es.cat.indices(index="animal-humane-*", format="json")
+        indices = sorted(item["index"] for item in resp if item.get("status", "open") == "open")
+
+    pending = [idx for idx in indices if (index_template_version(es, idx) or 0) < SNAPSHOT_TEMPLATE_VERSION]
+    print(f"🔄 {len(pending)} of {len(indices)} indices need rebuilding under template v{SNAPSHOT_TEMPLATE_VERSION}")
+
+    for index in pending:
+        if args.dry_run:
+            print(f"  would rebuild {index}")
+            continue
+        try:
+            count = reindex_one(es, index)
+            print(f"  ✅ {index}: {count} documents")
+        except Exception as e:
+            print(f"  ❌ {index}: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 from shelterdog_tracker.shelter_scraper import ShelterScraper
 from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
 from scheduler.diff_analyzer import DiffAnalyzer
+from shelterdog_tracker.index_catalog import get_catalog
+from shelterdog_tracker.index_compaction import compact_indices
 
 # Setup logging
 logging.basicConfig(
@@ -38,6 +40,13 @@ class AnimalHumaneScheduler:
         self.executor = ThreadPoolExecutor(max_workers=4)
         # Get Elasticsearch host from environment variable for Docker
         self.es_host = os.getenv('ELASTICSEARCH_HOST', 'http://localhost:9200')
+        # "full" writes every dog into a new index per scrape; "delta" writes only
+        # added/changed dogs plus a manifest (see shelterdog_tracker/snapshot_delta.py)
+        self.storage_mode = os.getenv('SNAPSHOT_STORAGE_MODE', 'full').lower()
+        # Whether the last scrape found anything new, and the day the orchestrator last
+        # published; together they let quiet windows skip diff analysis, static JSON and the git push
+        self.scrape_changed = True
+        self.last_published = None
         
     def run_async(self, fn, *args, **kwargs):
         """Submit a task to the executor so scheduled jobs don't block the scheduler loop"""
@@ -57,17 +66,41 @@ class AnimalHumaneScheduler:
             
             handler = ElasticsearchHandler(host=self.es_host, index_name=index_name)
             
-            # Create index
-            handler.es.indices.create(index=index_name, ignore=400)
-            logger.info(f"Created index: {index_name}")
-            
-            # Scrape data
-            all_dogs = self.scraper.scrape_all_dogs()
+            # Conditional feed requests; None when no feed changed since the last stored scrape
+            all_dogs = self.scraper.scrape_all_dogs(skip_if_unchanged=True)
+            if all_dogs is None:
+                # Same history as an unchanged push: an "unchanged" manifest, no index
+                if handler.record_unchanged_scrape():
+                    logger.info(f"No feed changed since the last scrape; recorded {index_name} without writing an index")
+                else:
+                    logger.info(f"No feed changed since the last scrape; no previous scrape to record {index_name} against")
+                # Keeps any new ETag/Last-Modified from 200 responses whose body hadn't changed
+                self._scrape_stored(changed=False)
+                self._sync_analytics_mirror(handler)
+                return True
             logger.info(f"Scraped {len(all_dogs)} dogs")
             
-            # Push to Elasticsearch
-            handler.push_dogs_to_elasticsearch(all_dogs)
-            logger.info(f"Pushed {len(all_dogs)} dogs to Elasticsearch")
+            if self.storage_mode == 'delta':
+                # Only added/changed dogs are written; readers rebuild the scrape from its manifest
+                manifest = handler.push_scrape_delta(all_dogs)
+                logger.info(f"Stored {index_name} as a delta: {manifest['written_count']} of {manifest['dog_count']} dogs written")
+                self._scrape_stored(changed=bool(manifest['added'] or manifest['changed'] or manifest['removed']))
+                self._sync_analytics_mirror(handler)
+                # No per-scrape index exists for the animal-humane-latest alias to point at
+                return True
+            
+            # Mappings come from the versioned animal-humane-* template; the index itself is
+            # created by the bulk write, so an unchanged scrape leaves no empty index behind
+            handler.ensure_index_template()
+            
+            # Push to Elasticsearch (also upserts the per-dog dog-state index)
+            if handler.push_dogs_to_elasticsearch(all_dogs, skip_if_unchanged=True) is None:
+                logger.info(f"No changes since the previous scrape; recorded {index_name} without writing an index")
+                self._scrape_stored(changed=False)
+                self._sync_analytics_mirror(handler)
+                return True
+            logger.info(f"Pushed {len(all_dogs)} dogs to Elasticsearch and updated dog-state")
+            self._scrape_stored(changed=True)
             
             # Update alias
             handler.es.indices.update_aliases(body={
@@ -78,6 +111,8 @@ class AnimalHumaneScheduler:
             })
             logger.info(f"Updated alias to point to {index_name}")
             
+            self._sync_analytics_mirror(handler)
+            
             # Update demo site timestamp after successful ingest - DISABLED for manual control
             # self._update_demo_timestamp(index_name)
             
@@ -87,6 +122,31 @@ class AnimalHumaneScheduler:
             logger.error(f"Error in scrape_and_index: {e}", exc_info=True)
             return False
     
+    def _scrape_stored(self, changed):
+        """The scrape is in Elasticsearch, so its feeds become the baseline for the next one"""
+        self.scraper.commit_feed_validators()
+        self.scrape_changed = changed
+
+    def run_orchestrator(self):
+        """Publish the latest scrape, unless nothing changed since it was last published today"""
+        # The day's sections (adopted today, lengths of stay) still move on at midnight
+        today = datetime.now().date()
+        if not self.scrape_changed and self.last_published == today:
+            logger.info("No changes since the last scrape; skipping diff analysis, static JSON and git push")
+            return False
+        if run_orchestrator():
+            self.last_published = today
+            return True
+        return False
+
+    def _sync_analytics_mirror(self, handler):
+        """Copy the new scrape into the local analytics mirror when it's the chart backend"""
+        if handler.analytics_backend != 'sqlite':
+            return
+        # Also re-copies the last few days, picking up the previous orchestrator run's corrections
+        synced = handler.sync_analytics_mirror()
+        logger.info(f"Analytics mirror synced ({synced} scrapes copied)")
+    
     def _update_demo_timestamp(self, index_name):
         """Update demo site timestamp after successful data ingest"""
         try:
@@ -174,8 +234,11 @@ class AnimalHumaneScheduler:
                     import asyncio
                     loop = asyncio.new_event_loop()
                     asyncio.set_event_loop(loop)
-                    diff_data = loop.run_until_complete(es_service.get_diff_analysis())
-                    loop.close()
+                    try:
+                        diff_data = loop.run_until_complete(es_service.get_diff_analysis())
+                    finally:
+                        loop.run_until_complete(es_service.close())
+                        loop.close()
                     
                     logger.info(f"Diff Analysis tab data updated: {len(diff_data.get('new_dogs', []))} new, {len(diff_data.get('adopted_dogs', []))} adopted, {len(diff_data.get('trial_adoption_dogs', []))} trial, {len(diff_data.get('other_unlisted_dogs', []))} unlisted")
                     
@@ -318,6 +381,19 @@ class AnimalHumaneScheduler:
         except Exception as e:
             logger.error(f"Error updating missing dogs list: {e}", exc_info=True)
     
+    def compact_old_indices(self):
+        """Merge closed days into daily indices and old months into monthly indices"""
+        try:
+            handler = ElasticsearchHandler(host=self.es_host, index_name="animal-humane-latest")
+            compacted = compact_indices(handler.es)
+            # The scrapes now live in other indices
+            get_catalog(handler.host).invalidate()
+            logger.info(f"Compaction finished: {len(compacted)} compacted indices written")
+            return True
+        except Exception as e:
+            logger.error(f"Error compacting indices: {e}", exc_info=True)
+            return False
+    
     def health_check(self):
         """Check if Elasticsearch is accessible"""
         try:
@@ -349,8 +425,10 @@ def run_orchestrator():
     try:
         subprocess.run(["python", "orchestrator.py"], check=True)
         logger.info("orchestrator.py completed successfully")
+        return True
     except Exception as e:
         logger.error(f"orchestrator.py failed: {e}")
+        return False
 
 
 def main():
@@ -371,12 +449,12 @@ def main():
     schedule.every().day.at("19:00").do(scheduler.run_async, scheduler.scrape_and_index)  # 7 PM MT
     
     # Schedule orchestrator.py to run at 9:15, 11:15, 13:15, 15:15, 17:15, 19:15 MT
-    schedule.every().day.at("09:15").do(scheduler.run_async, run_orchestrator)
-    schedule.every().day.at("11:15").do(scheduler.run_async, run_orchestrator)
-    schedule.every().day.at("13:15").do(scheduler.run_async, run_orchestrator)
-    schedule.every().day.at("15:15").do(scheduler.run_async, run_orchestrator)
-    schedule.every().day.at("17:15").do(scheduler.run_async, run_orchestrator)
-    schedule.every().day.at("19:15").do(scheduler.run_async, run_orchestrator)
+    schedule.every().day.at("09:15").do(scheduler.run_async, scheduler.run_orchestrator)
+    schedule.every().day.at("11:15").do(scheduler.run_async, scheduler.run_orchestrator)
+    schedule.every().day.at("13:15").do(scheduler.run_async, scheduler.run_orchestrator)
+    schedule.every().day.at("15:15").do(scheduler.run_async, scheduler.run_orchestrator)
+    schedule.every().day.at("17:15").do(scheduler.run_async, scheduler.run_orchestrator)
+    schedule.every().day.at("19:15").do(scheduler.run_async, scheduler.run_orchestrator)
 
     for job in schedule.get_jobs():
         logger.info(f"Scheduled job: {job}")
@@ -385,10 +463,14 @@ def main():
     # Health check every hour
     schedule.every().hour.do(scheduler.run_async, scheduler.health_check)  
     
+    # Compact old per-scrape indices overnight, well clear of the scrapes
+    schedule.every().day.at("02:30").do(scheduler.run_async, scheduler.compact_old_indices)
+    
     logger.info("Scheduler configured with the following jobs (Mountain Time):")
     logger.info("- Scraping: 9:00, 11:00, 13:00, 15:00, 17:00, 19:00")
     logger.info("- Diff analysis: 9:15, 11:15, 13:15, 15:15, 17:15, 19:15")
     logger.info("- Health check: Every hour")
+    logger.info("- Index compaction: 2:30")
     
     # Run initial health check
     if not scheduler.health_check():
@@ -6,7 +6,6 @@ Outputs results to files for review
 import json
 import os
 import sys
-import requests
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional
@@ -15,6 +14,7 @@ from typing import Dict, List, Any, Optional
 sys.path.append(str(Path(__file__).parent.parent))
 
 from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+from shelterdog_tracker.live_status import get_live_status_checker
 
 class DiffAnalyzer:
     def __init__(self, output_dir: str = "diff_reports"):
@@ -25,15 +25,9 @@ class DiffAnalyzer:
         self.output_dir.mkdir(exist_ok=True)
         
     def get_all_indices(self) -> List[str]:
-        """Get all animal-humane indices, sorted by date (most recent first)"""
+        """Get all animal-humane scrapes (full or delta-stored), sorted by date (most recent first)"""
         try:
-            # Get all indices
-            resp = self.handler.es.cat.indices(format="json")
-            indices = [item["index"] for item in resp if item["index"].startswith("animal-humane-")]
-            
-            # Sort by index name (which includes date/time)
-            indices.sort(reverse=True)
-            return indices
+            return list(reversed(self.handler.list_scrapes()))
             
         except Exception as e:
             print(f"Error getting all indices: {e}")
@@ -42,145 +36,48 @@ class DiffAnalyzer:
     def get_recent_indices(self, days_back: int = 7) -> List[str]:
         """Get indices from the last N days"""
         try:
-            # Get all indices
-            resp = self.handler.es.cat.indices(format="json")
-            indices = [item["index"] for item in resp if item["index"].startswith("animal-humane-")]
-            
-            # Filter to recent indices
+            # Whole days on or after the cutoff (a scrape counts from its date's midnight)
             cutoff_date = datetime.now() - timedelta(days=days_back)
-            recent_indices = []
-            
-            for index in indices:
-                try:
-                    # Extract date from index name: animal-humane-YYYYMMDD-HHMM
-                    date_part = index.split("animal-humane-")[1].split("-")[0]
-                    index_date = datetime.strptime(date_part, "%Y%m%d")
-                    
-                    if index_date >= cutoff_date:
-                        recent_indices.append(index)
-                except (ValueError, IndexError):
-                    continue
+            first_day = cutoff_date.replace(hour=0, minute=0, second=0, microsecond=0)
+            if first_day < cutoff_date:
+                first_day += timedelta(days=1)
+            recent_indices = self.handler.index_catalog.scrapes_between(start=first_day)
             
             # Sort by date (most recent first)
-            recent_indices.sort(reverse=True)
-            return recent_indices
+            return list(reversed(recent_indices))
             
         except Exception as e:
             print(f"Error getting recent indices: {e}")
             return []
     
     def get_dogs_from_index(self, index_name: str) -> Dict[int, Dict[str, Any]]:
-        """Get all dogs from a specific index"""
+        """Get all dogs from a specific scrape, however it is stored"""
         try:
-            query = {
-                "query": {"match_all": {}},
-                "_source": ["id", "name", "status", "location", "origin", "intake_date", "length_of_stay_days"],
-                "size": 1000
-            }
-            
-            response = self.handler.es.search(index=index_name, body=query)
-            
-            dogs = {}
-            for hit in response['hits']['hits']:
-                source = hit['_source']
-                dog_id = source.get('id')
-                if dog_id:
-                    dogs[dog_id] = source
-            
-            return dogs
+            return self.handler.get_scrape_view(
+                index_name,
+                source=["id", "name", "status", "location", "origin", "intake_date", "length_of_stay_days"]
+            )
             
         except Exception as e:
             print(f"Error getting dogs from index {index_name}: {e}")
             return {}
     
     def check_live_status(self, dog_id: str) -> Dict[str, Any]:
-        """Check the live status of a dog from ShelterLuv API"""
+        """Check the live status of a dog from its ShelterLuv page"""
+        return self.check_live_statuses([dog_id])[int(dog_id)]
+
+    def check_live_statuses(self, dog_ids: List[str]) -> Dict[int, Dict[str, Any]]:
+        """Check many dogs' live statuses at once (concurrent, rate limited and cached; see live_status.py)"""
         try:
-            url = f"https://new.shelterluv.com/embed/animal/{dog_id}"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            content = response.text
-            print(f"DEBUG: Checking live status for dog {dog_id} at {url}")
-            
-            # Decode HTML entities first
-            import html
-            content = html.unescape(content)
-            
-            # Try multiple patterns to find location data, including HTML-encoded versions
-            import re
-            
-            location_patterns = [
-                r'"location"\s*:\s*"([^"]*)"',  # JSON format with regular quotes
-                r'&quot;location&quot;\s*:\s*&quot;([^&]*)&quot;',  # HTML-encoded quotes
-                r'location&quot;\s*:\s*&quot;([^&]*)&quot;',  # Partial HTML encoding
-                r'location["\']?\s*:\s*["\']([^"\']*)["\']',  # Various quote styles
-                r'Location["\']?\s*:\s*["\']([^"\']*)["\']',  # Capitalized
-                r'<[^>]*location[^>]*>([^<]*)</[^>]*>',  # HTML tags
-                r'Location:\s*([^\n\r<]+)',  # Plain text format
-            ]
-            
-            location = None
-            for pattern in location_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                if matches:
-                    # Take the first match (they should all be the same)
-                    location = matches[0].strip()
-                    print(f"DEBUG: Found location '{location}' using pattern '{pattern}'")
-                    break
-            
-            # Check for adoption indicators in the page content
-            adoption_indicators = [
-                'not available',
-                'no longer available', 
-                'has been adopted',
-                'adopted',
-                'unavailable'
-            ]
-            
-            content_lower = content.lower()
-            is_adopted_by_content = any(indicator in content_lower for indicator in adoption_indicators)
-            
-            if location is not None:
-                is_adopted = location == "" or is_adopted_by_content
-                is_trial = 'trial adoption' in location.lower() if location else False
-                
-                print(f"DEBUG: Dog {dog_id} - Location: '{location}', Adopted: {is_adopted}, Trial: {is_trial}")
-                
-                return {
-                    'location': location,
-                    'is_adopted': is_adopted,
-                    'is_trial_adoption': is_trial
-                }
-            
-            # If no location found but adoption indicators present
-            if is_adopted_by_content:
-                print(f"DEBUG: Dog {dog_id} - No location found but adoption indicators present")
-                return {
-                    'location': "",
-                    'is_adopted': True,
-                    'is_trial_adoption': False
-                }
-            
-            print(f"DEBUG: Dog {dog_id} - No location or adoption indicators found")
-            return {
-                'location': "unknown",
-                'is_adopted': False,
-                'is_trial_adoption': False
-            }
-            
+            statuses = get_live_status_checker().check_many_sync(dog_ids)
+            return {dog_id: status.as_dict() for dog_id, status in statuses.items()}
         except Exception as e:
-            print(f"Error checking live status for dog {dog_id}: {e}")
+            print(f"Error checking live status for dogs {list(dog_ids)}: {e}")
             return {
-                'location': "error",
-                'is_adopted': False,
-                'is_trial_adoption': False
+                int(dog_id): {'location': "error", 'is_adopted': False, 'is_trial_adoption': False}
+                for dog_id in dog_ids
             }
-    
+
     def analyze_recent_changes(self, current_index: str, previous_index: str, all_historical_indices: List[str]) -> Dict[str, Any]:
         """Analyze recent changes between current and previous index, using historical context for categorization"""
         current_dogs = self.get_dogs_from_index(current_index)
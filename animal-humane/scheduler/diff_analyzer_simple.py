@@ -25,10 +25,8 @@ class SimpleDiffAnalyzer:
     def get_all_indices(self) -> List[str]:
         """Get all animal-humane indices, sorted by date (most recent first)"""
         try:
-            resp = self.handler.es.cat.indices(format="json")
-            indices = [item["index"] for item in resp if item["index"].startswith("animal-humane-")]
-            indices.sort(reverse=True)
-            return indices
+            # Per-scrape indices only; daily/monthly/delta indices hold several scrapes each
+            return list(reversed(self.handler.get_snapshot_indices()))
         except Exception as e:
             print(f"Error getting all indices: {e}")
             return []
@@ -2,23 +2,66 @@
 Async wrapper for Elasticsearch operations
 """
 import asyncio
+from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+
+from shelterdog_tracker.async_elasticsearch_handler import AsyncElasticsearchHandler
 from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+from services.request_cache import coalesced
 from config import config
 import logging
 
 logger = logging.getLogger(__name__)
 
+def client_options(es_config) -> Dict[str, Any]:
+    """Connection settings shared by the sync and async clients"""
+    return {
+        "request_timeout": es_config.timeout,
+        "max_retries": es_config.max_retries,
+        "retry_on_timeout": True,
+        "connections_per_node": es_config.pool_maxsize,
+        # Disable SSL verification for local development
+        "verify_certs": False,
+        "ssl_show_warn": False,
+    }
+
+
 class ElasticsearchService:
-    def __init__(self):
-        logger.info(f"ElasticsearchService initializing with host: {config.elasticsearch.host}")
+    """
+    The API builds one of these for the application's lifetime (see api/main.py's
+    lifespan) so requests share its connection pools and thread pool; close()
+    releases them. One-off callers can create their own and close it when done.
+    """
+    def __init__(self, es_config=None):
+        es_config = es_config or config.elasticsearch
+        logger.info(f"ElasticsearchService initializing with host: {es_config.host}")
+        options = client_options(es_config)
         self.handler = ElasticsearchHandler(
-            host=config.elasticsearch.host,
-            index_name="animal-humane-latest"
+            host=es_config.host,
+            index_name="animal-humane-latest",
+            client=Elasticsearch(es_config.host, **options)
         )
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # Single-query reads await the async client; multi-step computations
+        # still run the synchronous handler in the thread pool
+        self.async_handler = AsyncElasticsearchHandler(
+            es_config.host,
+            client=AsyncElasticsearch(es_config.host, **options)
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=es_config.executor_workers,
+            thread_name_prefix="es-service"
+        )
+        # Reads currently running, keyed by method and arguments (see request_cache.py)
+        self._in_flight = {}
+
+    async def close(self):
+        """Release the clients' connections and the thread pool"""
+        self.executor.shutdown(wait=False)
+        await self.async_handler.close()
+        self.handler.es.close()
 
     async def _run_in_executor(self, func, *args, **kwargs):
         """Run synchronous function in thread pool"""
@@ -28,82 +71,101 @@ class ElasticsearchService:
             lambda: func(*args, **kwargs)
         )
 
+    @coalesced
     async def get_current_availables(self) -> List[Dict[str, Any]]:
         """Get currently available dogs"""
-        return await self._run_in_executor(self.handler.get_current_availables)
+        return await self.async_handler.get_current_availables()
 
+    @coalesced
     async def get_dog_by_id(self, dog_id: int) -> Optional[Dict[str, Any]]:
         """Get dog by ID"""
-        return await self._run_in_executor(self.handler.get_dog_by_id, dog_id)
+        return await self.async_handler.get_dog_by_id(dog_id)
 
+    @coalesced
     async def get_current_listed_count(self) -> int:
         """Get current listed count"""
         return await self._run_in_executor(self.handler.get_current_listed_count)
 
     async def get_new_dog_count_this_week(self) -> int:
         """Get new dog count this week"""
-        dog_names = await self._run_in_executor(self.handler.get_new_dog_count_this_week_accurate)
-        return len(dog_names)
+        return len(await self.get_new_dog_names_this_week())
 
+    @coalesced
     async def get_new_dog_names_this_week(self) -> List[str]:
         """Get new dog names this week"""
         return await self._run_in_executor(self.handler.get_new_dog_count_this_week_accurate)
 
+    @coalesced
     async def get_adopted_dogs_this_week(self) -> Tuple[List[str], List[str], List[str], List[int], int]:
         """Get adopted dogs this week"""
         return await self._run_in_executor(self.handler.get_adopted_dog_count_this_week)
 
+    @coalesced
+    async def get_dog_events(self, event_types: Optional[List[str]] = None, since: Optional[str] = None,
+                             dog_ids: Optional[List[int]] = None) -> Optional[List[Dict[str, Any]]]:
+        """Get status-transition events (None if the events index hasn't been built)"""
+        return await self.async_handler.get_events(event_types=event_types, since=since, dog_ids=dog_ids)
+
+    @coalesced
+    async def get_first_seen(self, dog_ids: Optional[List[int]] = None) -> Dict[str, Dict[str, Any]]:
+        """Get when (and in which scrape) each dog was first listed"""
+        return await self.async_handler.get_first_seen(dog_ids)
+
+    @coalesced
+    async def get_dog_history(self):
+        """Get the "ever seen" / "ever adopted" id sets"""
+        return await self._run_in_executor(self.handler.get_dog_history)
+
+    @coalesced
+    async def get_state_at(self, at: datetime) -> Optional[Dict[str, Any]]:
+        """Get every dog listed as of a past moment"""
+        return await self._run_in_executor(self.handler.state_at, at)
+
+    @coalesced
     async def get_trial_adoptions(self) -> List[Dict[str, Any]]:
         """Get dogs currently on trial adoption"""
-        def _get_trial_adoptions():
-            # Get current available dogs
-            availables = self.handler.get_current_availables()
-            # Filter for dogs with "trial adoption" in location (case insensitive)
-            trial_adoptions = [
-                dog for dog in availables 
-                if 'trial adoption' in dog.get('location', '').lower()
-            ]
-            return trial_adoptions
-
-        return await self._run_in_executor(_get_trial_adoptions)
+        availables = await self.get_current_availables()
+        # Filter for dogs with "trial adoption" in location (case insensitive)
+        return [
+            dog for dog in availables
+            if 'trial adoption' in (dog.get('location') or '').lower()
+        ]
 
+    @coalesced
     async def get_age_groups(self, index_name: str = None) -> List[Dict[str, Any]]:
         """Get age group distribution"""
         if index_name is None:
-            index_name = await self._run_in_executor(self.handler.get_most_recent_index)
-        return await self._run_in_executor(self.handler.get_age_groups, index_name)
+            index_name = await self.get_most_recent_index()
+        if index_name not in (await self.async_handler.index_catalog()).snapshot_indices:
+            # Delta, unchanged and compacted scrapes are rebuilt by the sync handler
+            return await self._run_in_executor(self.handler.get_age_groups, index_name)
+        return await self.async_handler.get_age_groups(index_name)
 
+    @coalesced
     async def get_avg_length_of_stay(self) -> int:
         """Get average length of stay"""
-        return await self._run_in_executor(self.handler.get_avg_length_of_stay)
+        return await self.async_handler.get_avg_length_of_stay()
 
+    @coalesced
     async def get_longest_resident(self) -> Dict[str, Any]:
         """Get longest resident"""
-        return await self._run_in_executor(self.handler.get_longest_resident)
+        return await self.async_handler.get_longest_resident()
 
+    @coalesced
     async def get_adoptions_per_day(self) -> List[Dict[str, Any]]:
         """Get adoptions per day"""
         return await self._run_in_executor(self.handler.get_adoptions_per_day)
 
+    @coalesced
     async def get_origins(self) -> List[Dict[str, Any]]:
         """Get dog origins"""
         return await self._run_in_executor(self.handler.get_origins)
 
+    @coalesced
     async def get_latest_index_for_dog(self, dog_id: int) -> Optional[str]:
         """Get the latest index containing a specific dog"""
-        query = {
-            "query": {"match": {"id": dog_id}},
-            "size": 1,
-            "_source": False,
-            "sort": [{"_index": {"order": "desc"}}]
-        }
-
-        def _search():
-            res = self.handler.es.search(index="animal-humane-*", body=query)
-            hits = res["hits"]["hits"]
-            return hits[0]["_index"] if hits else None
-
-        return await self._run_in_executor(_search)
+        found = (await self.async_handler.latest_docs([dog_id], fields=[])).get(int(dog_id))
+        return found.index if found else None
 
     async def update_dog_document(self, index_name: str, dog_id: int, update_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a dog document"""
@@ -117,48 +179,59 @@ class ElasticsearchService:
 
         return await self._run_in_executor(_update)
 
-    def __del__(self):
-        """Cleanup thread pool on destruction"""
-        if hasattr(self, 'executor'):
-            self.executor.shutdown(wait=False)
-
     async def get_dog_groups(self, availables: List[Dict], index_name: str) -> Dict[str, Any]:
         """Get dog groups (adopted, trial, unlisted)"""
         return await self._run_in_executor(self.handler.get_dog_groups, availables, index_name)
 
+    @coalesced
     async def get_weekly_age_group_adoptions(self) -> List[Dict[str, Any]]:
         """Get weekly age group adoptions"""
         return await self._run_in_executor(self.handler.get_weekly_age_group_adoptions)
 
+    @coalesced
     async def get_adoption_percentages_per_origin(self) -> List[Dict[str, Any]]:
         """Get adoption percentages per origin"""
         return await self._run_in_executor(self.handler.get_adoption_percentages_per_origin)
 
+    @coalesced
+    async def get_scrape_ids(self, scrape: str) -> List[int]:
+        """Get the dog ids listed at a scrape, however it's stored"""
+        return await self._run_in_executor(self.handler.get_scrape_ids, scrape)
+
+    @coalesced
+    async def get_scrape_view(self, scrape: str, source: Optional[List[str]] = None) -> Dict[int, Dict[str, Any]]:
+        """Get {dog_id: record} for every dog listed at a scrape, however it's stored"""
+        return await self._run_in_executor(self.handler.get_scrape_view, scrape, source)
+
+    @coalesced
     async def get_most_recent_index(self) -> str:
         """Get most recent index name"""
-        return await self._run_in_executor(self.handler.get_most_recent_index)
+        return await self.async_handler.get_most_recent_index()
 
+    @coalesced
     async def get_new_dogs(self) -> Dict[str, Any]:
         """Get new dogs"""
         return await self._run_in_executor(self.handler.get_new_dogs)
 
+    @coalesced
     async def get_length_of_stay_distribution(self, status: Optional[str] = None) -> Dict[str, Any]:
         """Get length of stay histogram distribution using optimized aggregation approach"""
         return await self._run_in_executor(self.handler.get_length_of_stay_distribution, status)
 
+    @coalesced
     async def get_diff_analysis(self) -> Dict[str, Any]:
         """Get diff analysis data (new, returned, adopted, trial, unlisted dogs)"""
-        # Get current available dogs
-        availables = await self.get_current_availables()
-
-        # Get most recent index
-        index_name = await self.get_most_recent_index()
-
-        # Get dog groups (adopted, trial, unlisted, returned)
-        dog_groups = await self.get_dog_groups(availables, index_name)
-
-        # Get new dogs
-        new_dogs_data = await self.get_new_dogs()
+        def _read():
+            # Every section reads the same point in time, so a scrape landing
+            # midway can't make them disagree
+            with self.handler.read_session() as session:
+                availables = session.get_current_availables()
+                index_name = session.get_most_recent_index()
+                # Adopted, trial, unlisted and returned dogs
+                dog_groups = session.get_dog_groups(availables, index_name)
+                return dog_groups, session.get_new_dogs()
+
+        dog_groups, new_dogs_data = await self._run_in_executor(_read)
         new_dogs = new_dogs_data.get("new_dogs", [])
 
         # Extract dog IDs from new dogs URLs to exclude them from other_unlisted_dogs
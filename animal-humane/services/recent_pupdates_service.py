@@ -15,6 +15,7 @@ from models.recent_pupdates import (
     RecentPupdatesData, DogEntry, DataFreshness, SectionConfig, 
     PupdateSection, DEFAULT_SECTION_CONFIGS
 )
+from services.request_cache import request_scope
 
 logger = logging.getLogger(__name__)
 
@@ -108,7 +109,9 @@ class RecentPupdatesService:
         """
         Get comprehensive recent pupdates data
         """
-        return await self._get_full_analysis()
+        # The sections ask for the same availables, events and history; read each once
+        with request_scope():
+            return await self._get_full_analysis()
     
     async def _get_full_analysis(self) -> RecentPupdatesData:
         """Get complete analysis with targeted data sources to avoid scroll issues"""
@@ -348,9 +351,24 @@ class RecentPupdatesService:
         
         return None
     
+    async def _get_current_dogs_with_event_today(self, event_type: str) -> Optional[List[Dict[str, Any]]]:
+        """Current availables that had the given transition since local midnight (None without an events index)"""
+        events = await self.es_service.get_dog_events(event_types=[event_type], since="now/d")
+        if events is None:
+            return None
+        event_ids = {event.get('dog_id') for event in events}
+        current_availables = await self.es_service.get_current_availables()
+        return [dog for dog in current_availables if dog.get('dog_id') in event_ids]
+
     async def _get_new_dogs(self):
         """Get truly new dogs (recent intake, no adoption history)"""
         try:
+            # An intake event means the dog had never been seen before, so it can't have been adopted
+            new_dogs = await self._get_current_dogs_with_event_today('intake')
+            if new_dogs is not None:
+                logger.info(f"Found {len(new_dogs)} dogs with an intake event today")
+                return new_dogs
+
             # Get current availables from latest index
             current_availables = await self.es_service.get_current_availables()
             
@@ -405,6 +423,11 @@ class RecentPupdatesService:
     async def _get_returned_dogs(self):
         """Get returned dogs (recent intake but with adoption history)"""
         try:
+            returned_dogs = await self._get_current_dogs_with_event_today('returned')
+            if returned_dogs is not None:
+                logger.info(f"Found {len(returned_dogs)} dogs with a returned event today")
+                return returned_dogs
+
             # Get current availables from latest index
             current_availables = await self.es_service.get_current_availables()
             
@@ -450,124 +473,54 @@ class RecentPupdatesService:
             return []
 
     async def _check_adoption_history(self, dog_id: int) -> bool:
-        """Check if a dog has adoption history in historical indices"""
+        """Check if a dog has ever been adopted"""
         try:
-            # Search historical indices for this dog with status 'adopted'
-            from datetime import datetime, timedelta
-            
-            # Check the last 90 days of historical data
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=90)
-            
-            # Generate list of indices to search (recent ones first)
-            indices_to_search = []
-            current_date = end_date
-            while current_date >= start_date:
-                date_str = current_date.strftime('%Y%m%d')
-                # Check common time patterns 
-                for hour in ['0900', '1100', '1300', '1500', '1700', '1900']:
-                    index_name = f"animal-humane-{date_str}-{hour}"
-                    indices_to_search.append(index_name)
-                current_date -= timedelta(days=1)
-            
-            # Search for adoption records in batches to avoid too many indices
-            batch_size = 10
-            for i in range(0, len(indices_to_search), batch_size):
-                batch_indices = indices_to_search[i:i+batch_size]
-                
-                # Check if any of these indices exist
-                existing_indices = []
-                for idx in batch_indices:
-                    try:
-                        exists = await self._run_in_executor(
-                            self.es_service.handler.es.indices.exists, 
-                            index=idx
-                        )
-                        if exists:
-                            existing_indices.append(idx)
-                    except:
-                        continue
-                
-                if not existing_indices:
-                    continue
-                
-                # Search for adopted status in existing indices
-                search_body = {
-                    "query": {
-                        "bool": {
-                            "must": [
-                                {"term": {"id": dog_id}},
-                                {"term": {"status": "adopted"}}
-                            ]
-                        }
-                    },
-                    "size": 1
-                }
-                
-                try:
-                    index_pattern = ",".join(existing_indices)
-                    result = await self._run_in_executor(
-                        self.es_service.handler.es.search,
-                        index=index_pattern,
-                        body=search_body
-                    )
-                    
-                    if result['hits']['total']['value'] > 0:
-                        logger.info(f"Found adoption history for dog {dog_id}")
-                        return True
-                        
-                except Exception as e:
-                    logger.warning(f"Error searching historical data for dog {dog_id}: {e}")
-                    continue
-            
-            return False
-            
+            history = await self.es_service.get_dog_history()
+            return history.ever_adopted(dog_id)
         except Exception as e:
             logger.error(f"Error checking adoption history for dog {dog_id}: {e}")
             return False
 
-    async def _run_in_executor(self, func, *args, **kwargs):
-        """Run synchronous function in thread pool"""
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-        
-        if not hasattr(self, '_executor'):
-            self._executor = ThreadPoolExecutor(max_workers=2)
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            self._executor,
-            lambda: func(*args, **kwargs)
-        )
-    
     async def _get_adopted_dogs(self):
         """Get recently adopted dogs"""
         try:
+            adoptions = await self.es_service.get_dog_events(event_types=['adopted'], since='now-7d/d')
+            if adoptions is not None:
+                return self._adopted_records(adoptions)
+
             from datetime import datetime, timedelta
             cutoff_date = datetime.now() - timedelta(days=7)
             cutoff_str = cutoff_date.strftime('%Y-%m-%dT%H:%M:%S')
             
-            # Search recent indices for adopted dogs
-            query = {
-                "query": {
-                    "bool": {
-                        "must": [
-                            {"term": {"status": "adopted"}},
-                            {"range": {"timestamp": {"gte": cutoff_str}}}
-                        ]
-                    }
-                },
-                "size": 100
-            }
-            
-            # Use latest index only to avoid scroll issues
+            # Adopted records in the latest scrape only, read however it's stored (full, delta or unchanged)
             most_recent_index = await self.es_service.get_most_recent_index()
-            response = self.es_service.es.search(index=most_recent_index, body=query)
+            view = await self.es_service.get_scrape_view(most_recent_index)
             
-            return [hit['_source'] for hit in response['hits']['hits']]
+            return self._adopted_records(
+                record for record in view.values()
+                if record.get('status') == 'adopted' and (record.get('timestamp') or '') >= cutoff_str
+            )
         except Exception as e:
             logger.error(f"Error getting adopted dogs: {e}")
             return []
+
+    @staticmethod
+    def _adopted_records(docs) -> List[Dict[str, Any]]:
+        """Adoption events (or snapshot records) as the dog_id/name/url/location/status dicts the other sections use, one per dog"""
+        records = {}
+        for doc in docs:
+            dog_id = doc.get('dog_id', doc.get('id'))
+            if dog_id is None:
+                continue
+            # Events come oldest first, so a dog adopted twice keeps its latest adoption
+            records[dog_id] = {
+                'dog_id': dog_id,
+                'name': doc.get('name'),
+                'url': doc.get('url') or f"https://new.shelterluv.com/embed/animal/{dog_id}",
+                'location': doc.get('location'),
+                'status': doc.get('status')
+            }
+        return list(records.values())
     
     async def _get_trial_dogs(self):
         """Get dogs in trial adoption"""
@@ -584,19 +537,13 @@ class RecentPupdatesService:
         config = DEFAULT_SECTION_CONFIGS[PupdateSection.UNLISTED_DOGS]
         logger.info("Starting unlisted dogs processing...")
         try:
-            # Step 1: Get all dog IDs from the most recent index
+            # Step 1: Get all dog IDs listed at the most recent scrape (from its manifest, so delta scrapes count too)
             most_recent_index = await self.es_service.get_most_recent_index()
-            recent_index_result = await self._run_in_executor(
-                self.es_service.handler.es.search,
-                index=most_recent_index,
-                body={"query": {"match_all": {}}, "_source": ["id"], "size": 1000}
-            )
-            recent_index_dog_ids = {int(hit['_source'].get('id')) for hit in recent_index_result['hits']['hits'] if hit['_source'].get('id')}
+            recent_index_dog_ids = {int(dog_id) for dog_id in await self.es_service.get_scrape_ids(most_recent_index)}
             logger.info(f"Most recent index ({most_recent_index}) has {len(recent_index_dog_ids)} dogs")
             
             # Step 2: Get all unique dog IDs that have ever appeared
-            all_dogs_result = await self._run_in_executor(
-                self.es_service.handler.es.search,
+            all_dogs_result = await self.es_service.async_handler.es.search(
                 index='animal-humane-*',
                 body={
                     "size": 0,
@@ -610,31 +557,20 @@ class RecentPupdatesService:
             all_dog_ids = [bucket['key'] for bucket in all_dogs_result['aggregations']['unique_dogs']['buckets']]
             logger.info(f"Found {len(all_dog_ids)} unique dogs across all indices")
             
-            # Step 3: For each dog not in most recent index, find their most recent document
+            # Step 3: Find the most recent document of every dog not in the most recent index
+            unlisted_ids = [int(dog_id) for dog_id in all_dog_ids if int(dog_id) not in recent_index_dog_ids]
+            latest = await self.es_service.async_handler.latest_docs(
+                unlisted_ids,
+                ["id", "name", "status", "location", "timestamp"]
+            )
+
             unlisted_dogs = []
-            for dog_id in all_dog_ids:
-                if int(dog_id) in recent_index_dog_ids:
-                    continue  # Skip dogs in most recent index
-                    
-                # Get most recent document for this dog
-                dog_search = {
-                    "query": {"term": {"id": int(dog_id)}},
-                    "sort": [{"timestamp": {"order": "desc"}}],
-                    "size": 1,
-                    "_source": ["id", "name", "status", "location", "timestamp"]
-                }
-                
-                dog_result = await self._run_in_executor(
-                    self.es_service.handler.es.search,
-                    index='animal-humane-*',
-                    body=dog_search
-                )
-                
-                if not dog_result['hits']['hits']:
+            for dog_id in unlisted_ids:
+                if dog_id not in latest:
                     continue
-                    
-                latest_doc = dog_result['hits']['hits'][0]['_source']
-                
+
+                latest_doc = latest[dog_id].source
+
                 # Check all criteria: Available status, non-empty location, and not on Trial Adoption
                 if (latest_doc.get('status') == 'Available' and 
                     latest_doc.get('location') and 
@@ -737,9 +673,8 @@ class RecentPupdatesService:
                 }
             }
             
-            # Query across all indices using the pattern animal-humane-* and _run_in_executor
-            result = await self._run_in_executor(
-                self.es_service.handler.es.search,
+            # Query across all indices using the pattern animal-humane-*
+            result = await self.es_service.async_handler.es.search(
                 index="animal-humane-*",
                 body=query
             )
@@ -0,0 +1,74 @@
+"""
+Request coalescing and request-scoped memoization for ElasticsearchService reads
+
+One recent-pupdates analysis used to scan every available dog three times
+(new, returned and trial dogs each asked for them), and the overview stats asked
+again through get_trial_adoptions. Reads decorated with @coalesced now share work
+two ways:
+
+- Concurrent identical calls (same method, same arguments) await one in-flight
+  task instead of each querying Elasticsearch.
+- Inside request_scope() results are kept until the scope exits, so each read
+  runs at most once per request or composite computation. The scope lives in a
+  contextvar; tasks started with asyncio.gather inherit it, so an analysis that
+  fans out still shares one cache.
+
+Results are shared between callers, so treat them as read-only. A read that
+raises isn't kept: the callers waiting on it get the error and the next call
+tries again.
+"""
+import asyncio
+import contextvars
+import functools
+from contextlib import contextmanager
+
+_scope_cache = contextvars.ContextVar("es_request_scope", default=None)
+
+
+@contextmanager
+def request_scope():
+    """Memoize coalesced reads until the block exits (nested scopes share the outer one)"""
+    if _scope_cache.get() is not None:
+        yield
+        return
+    token = _scope_cache.set({})
+    try:
+        yield
+    finally:
+        _scope_cache.reset(token)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_freeze(item) for item in value]
+        return tuple(sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items)
+    return value
+
+
+def coalesced(method):
+    """Share one call among concurrent identical callers and within a request_scope()"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        key = (name, _freeze(args), _freeze(kwargs))
+        scope = _scope_cache.get()
+        # Outside a scope only calls that are still running are shared
+        pending = scope if scope is not None else self._in_flight
+        task = pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(method(self, *args, **kwargs))
+            pending[key] = task
+
+            def settled(done):
+                if scope is None or done.cancelled() or done.exception() is not None:
+                    if pending.get(key) is done:
+                        del pending[key]
+
+            task.add_done_callback(settled)
+        # A caller giving up (e.g. a cancelled request) mustn't cancel the read for the others
+        return await asyncio.shield(task)
+
+    return wrapper
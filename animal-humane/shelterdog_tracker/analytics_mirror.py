@@ -0,0 +1,247 @@
+"""
+Local analytics mirror of the scrape history.
+
+The trend charts (adoptions per day, weekly adoptions by age group, adoption
+rate per origin) aggregate over every animal-humane-* document, so each request
+fans out across hundreds of small indices. The mirror keeps the handful of
+fields those charts need in a single SQLite file, one row per dog per scrape,
+and answers the same questions with plain SQL.
+
+It's kept up to date incrementally: sync() copies scrapes it hasn't seen yet and
+re-copies the last few days' scrapes, because corrections (adoptions, location
+updates) are still being applied to those in Elasticsearch. Adopted events are
+mirrored too, since the weekly chart prefers them when dog-events exists.
+
+Set ANALYTICS_BACKEND=sqlite to have ElasticsearchHandler answer the chart
+methods from the mirror; ANALYTICS_DB_PATH points at the file.
+"""
+import os
+import sqlite3
+from collections import Counter, defaultdict
+from contextlib import closing
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from shelterdog_tracker.dog_events import ADOPTED
+from shelterdog_tracker.index_compaction import DEFAULT_KEEP_DAYS
+
+DEFAULT_DB_PATH = str(Path(__file__).parent.parent / "analytics" / "animal_humane.sqlite3")
+
+ELASTICSEARCH = "elasticsearch"
+SQLITE = "sqlite"
+
+# The Elasticsearch chart queries bucket days and weeks at a fixed -07:00 offset
+CHART_OFFSET = timezone(timedelta(hours=-7))
+CHART_DATE_FORMAT = "%m/%d/%Y"
+
+RECORD_FIELDS = ["id", "name", "status", "location", "origin", "age_group",
+                 "timestamp", "intake_date", "length_of_stay_days"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    scrape TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    name TEXT,
+    status TEXT,
+    location TEXT,
+    origin TEXT,
+    age_group TEXT,
+    timestamp TEXT,
+    local_date TEXT,
+    intake_date TEXT,
+    length_of_stay_days INTEGER,
+    PRIMARY KEY (scrape, id)
+);
+CREATE INDEX IF NOT EXISTS records_status ON records (status, local_date);
+CREATE INDEX IF NOT EXISTS records_origin ON records (origin, id);
+CREATE TABLE IF NOT EXISTS scrapes (
+    scrape TEXT PRIMARY KEY,
+    doc_count INTEGER,
+    synced_at TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    dog_id INTEGER NOT NULL,
+    scrape TEXT NOT NULL,
+    event TEXT NOT NULL,
+    name TEXT,
+    age_group TEXT,
+    origin TEXT,
+    timestamp TEXT,
+    local_date TEXT,
+    PRIMARY KEY (dog_id, scrape, event)
+);
+"""
+
+
+def local_date(timestamp):
+    """ISO date of a timestamp in the charts' -07:00 offset, or None if it can't be parsed."""
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        # Same assumption Elasticsearch makes for offset-less dates
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(CHART_OFFSET).date().isoformat()
+
+
+def _day_range(first, last):
+    day = first
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+class AnalyticsMirror:
+    def __init__(self, path=None):
+        self.path = path or os.getenv("ANALYTICS_DB_PATH", DEFAULT_DB_PATH)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    # --- Sync -------------------------------------------------------------
+
+    def synced_scrapes(self):
+        with closing(self._connect()) as conn:
+            return {row[0] for row in conn.execute("SELECT scrape FROM scrapes")}
+
+    def write_scrape(self, scrape, records):
+        """Replace everything stored for one scrape with the given records."""
+        rows = [
+            (scrape, int(record["id"]), record.get("name"), record.get("status"),
+             record.get("location"), record.get("origin"), record.get("age_group"),
+             record.get("timestamp"), local_date(record.get("timestamp")),
+             record.get("intake_date"), record.get("length_of_stay_days"))
+            for record in records
+            if record.get("id") is not None
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM records WHERE scrape = ?", (scrape,))
+            conn.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO scrapes VALUES (?, ?, ?)",
+                (scrape, len(rows), datetime.now(timezone.utc).isoformat())
+            )
+        return len(rows)
+
+    def write_events(self, events):
+        rows = [
+            (int(event["dog_id"]), event["scrape"], event["event"], event.get("name"),
+             event.get("age_group"), event.get("origin"), event.get("timestamp"),
+             local_date(event.get("timestamp")))
+            for event in events
+            if event.get("dog_id") is not None
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def _latest_event_timestamp(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT MAX(timestamp) FROM events").fetchone()[0]
+
+    def sync(self, handler, resync_days=DEFAULT_KEEP_DAYS, rebuild=False, today=None):
+        """
+        Copy new scrapes (and re-copy recent ones) from Elasticsearch.
+
+        Returns:
+            Number of scrapes written.
+        """
+        today = today or datetime.now()
+        resync_from = f"animal-humane-{(today - timedelta(days=resync_days)).strftime('%Y%m%d')}"
+        synced = set() if rebuild else self.synced_scrapes()
+
+        written = 0
+        for scrape in handler.list_scrapes():
+            if scrape in synced and scrape < resync_from:
+                continue
+            view = handler.get_scrape_view(scrape, source=RECORD_FIELDS)
+            count = self.write_scrape(scrape, view.values())
+            print(f"Mirrored {scrape}: {count} records")
+            written += 1
+
+        since = None if rebuild else self._latest_event_timestamp()
+        events = handler.get_events(event_types=[ADOPTED], since=since)
+        if events:
+            print(f"Mirrored {self.write_events(events)} {ADOPTED} events")
+        return written
+
+    # --- Chart queries (same shapes as the Elasticsearch versions) --------
+
+    def adoptions_per_day(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT local_date, name FROM records "
+                "WHERE LOWER(status) = 'adopted' AND local_date IS NOT NULL"
+            ).fetchall()
+        if not rows:
+            return []
+
+        by_day = defaultdict(Counter)
+        for day, name in rows:
+            by_day[day][name] += 1
+
+        # date_histogram fills the days between the first and last bucket
+        days = sorted(by_day)
+        chart_data = []
+        for day in _day_range(date.fromisoformat(days[0]), date.fromisoformat(days[-1])):
+            names = by_day.get(day.isoformat(), Counter())
+            ranked = sorted((name for name in names if name is not None), key=lambda n: (-names[n], n))
+            chart_data.append({
+                "date": day.strftime(CHART_DATE_FORMAT),
+                "count": sum(names.values()),
+                "names": ranked[:100]
+            })
+        return chart_data
+
+    def weekly_age_group_adoptions(self, weeks=10):
+        with closing(self._connect()) as conn:
+            # One adopted event per adoption when events have been mirrored
+            rows = conn.execute(
+                "SELECT local_date, age_group FROM events "
+                "WHERE event = ? AND local_date IS NOT NULL", (ADOPTED,)
+            ).fetchall()
+            if not rows:
+                rows = conn.execute(
+                    "SELECT local_date, age_group FROM records "
+                    "WHERE LOWER(status) = 'adopted' AND local_date IS NOT NULL"
+                ).fetchall()
+        if not rows:
+            return []
+
+        by_week = defaultdict(Counter)
+        for day, age_group in rows:
+            day = date.fromisoformat(day)
+            by_week[day - timedelta(days=day.weekday())][age_group] += 1
+
+        result = []
+        first, last = min(by_week), max(by_week)
+        week = first
+        while week <= last:
+            counts = by_week.get(week, Counter())
+            week_data = {"week": week.strftime(CHART_DATE_FORMAT), "Puppy": 0, "Adult": 0, "Senior": 0}
+            for age_group, count in counts.items():
+                if age_group is not None:
+                    week_data[age_group] = count
+            result.append(week_data)
+            week += timedelta(days=7)
+        return result[-weeks:]
+
+    def adoption_rates_per_origin(self):
+        """Return [(origin, adoption_rate_percent)], busiest origins first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT origin, COUNT(*) AS docs, COUNT(DISTINCT id) AS total, "
+                "COUNT(DISTINCT CASE WHEN status = 'adopted' THEN id END) AS adopted "
+                "FROM records WHERE origin IS NOT NULL "
+                "GROUP BY origin ORDER BY docs DESC, origin ASC"
+            ).fetchall()
+        return [
+            (origin, (adopted / total) * 100 if total > 0 else 0)
+            for origin, _, total, adopted in rows
+        ]
@@ -0,0 +1,192 @@
+"""
+AsyncElasticsearch counterpart of ElasticsearchHandler's read paths.
+
+The FastAPI services used to push every query through a thread pool around the
+synchronous handler, so a handful of slow aggregations could tie up all the
+workers while other requests queued behind them. The single-query reads here
+await the async client instead; query bodies and response parsing come from
+elasticsearch_handler so both handlers answer the same way. Multi-step
+computations (dog groups, charts, state_at) stay on the synchronous handler.
+
+An AsyncElasticsearch client belongs to the event loop it first ran on, so each
+handler owns its client (or is given one) and should be closed on that loop.
+The client needs the elasticsearch[async] extra (aiohttp).
+"""
+from elasticsearch import AsyncElasticsearch
+from elasticsearch import exceptions as es_exceptions
+from elasticsearch.helpers import async_scan
+
+from shelterdog_tracker import elasticsearch_handler
+from shelterdog_tracker.dog_events import DOG_EVENTS_INDEX
+from shelterdog_tracker.elasticsearch_handler import (
+    AGE_GROUPS_QUERY, AVAILABLE_DOG_FIELDS, AVG_LENGTH_OF_STAY_QUERY, DOG_STATE_INDEX, FIRST_SEEN_STATE_FIELDS,
+    LATEST_FIRST_SORT, LONGEST_RESIDENT_FIELDS, age_groups_from_response, available_dogs_from_states,
+    average_length_of_stay, collect_first_seen, collect_recent_docs, events_query, first_seen_body,
+    first_seen_from_states, id_batches, longest_resident_from_states, recent_docs_body, sort_events
+)
+from shelterdog_tracker.index_catalog import get_catalog
+
+
+class AsyncElasticsearchHandler:
+    def __init__(self, host, client=None):
+        self.host = host
+        self.es = client if client is not None else AsyncElasticsearch(
+            host,
+            request_timeout=60,
+            # Disable SSL verification for local development
+            verify_certs=False,
+            ssl_show_warn=False
+        )
+
+    async def close(self):
+        await self.es.close()
+
+    async def index_catalog(self):
+        """The shared IndexCatalog for this host, reloaded if anything was written since."""
+        catalog = get_catalog(self.host)
+        await catalog.async_sync(self.es)
+        return catalog
+
+    async def get_most_recent_index(self):
+        try:
+            # The newest scrape, which may be a delta or unchanged one with no index of its own
+            most_recent = (await self.index_catalog()).latest_scrape()
+            if most_recent is None:
+                print("No valid animal-humane indices found with proper date format")
+            return most_recent
+        except Exception as e:
+            print(f"Error getting most recent index: {e}")
+            return None
+
+    async def get_dog_states(self, query=None, source=None):
+        """
+        Return {dog_id: latest record} from dog-state, or the newest snapshot record
+        per dog when dog-state hasn't been built yet.
+        """
+        try:
+            states = {}
+            async for hit in async_scan(
+                self.es,
+                index=DOG_STATE_INDEX,
+                query={"query": query or {"match_all": {}}},
+                _source=source if source else True
+            ):
+                dog_data = hit["_source"]
+                if dog_data.get("id") is not None:
+                    states[str(dog_data["id"])] = dog_data
+            return states
+        except es_exceptions.NotFoundError:
+            print(f"{DOG_STATE_INDEX} not found, falling back to the newest snapshot records")
+            latest = await self.latest_docs(fields=source)
+            return {str(dog_id): doc.source for dog_id, doc in latest.items()}
+
+    async def recent_docs(self, ids=None, fields=None, size=1, index_pattern="animal-humane-*"):
+        """ElasticsearchHandler.recent_docs: {int(id): [LatestDoc, ...]} newest first."""
+        batches = id_batches(ids, elasticsearch_handler.LATEST_DOCS_PAGE_SIZE)
+        if not batches:
+            return {}
+        page_size = elasticsearch_handler.LATEST_DOCS_PAGE_SIZE
+
+        pit_id = (await self.es.open_point_in_time(index=index_pattern, keep_alive="1m"))["id"]
+        docs = {}
+        try:
+            for batch in batches:
+                body = recent_docs_body(batch, fields, size, pit_id, page_size)
+                while True:
+                    resp = await self.es.search(body=body)
+                    pit_id = resp.get("pit_id", pit_id)
+                    body["pit"]["id"] = pit_id
+                    hits = resp["hits"]["hits"]
+                    collect_recent_docs(hits, docs)
+                    if len(hits) < page_size:
+                        break
+                    body["search_after"] = hits[-1]["sort"]
+        finally:
+            try:
+                await self.es.close_point_in_time(body={"id": pit_id})
+            except Exception as e:
+                print(f"Failed to close point in time: {e}")
+        return docs
+
+    async def latest_docs(self, ids=None, fields=None, index_pattern="animal-humane-*"):
+        """ElasticsearchHandler.latest_docs: {int(id): LatestDoc} for each dog's newest document."""
+        recent = await self.recent_docs(ids, fields=fields, size=1, index_pattern=index_pattern)
+        return {dog_id: docs[0] for dog_id, docs in recent.items() if docs}
+
+    async def get_current_availables(self):
+        states = await self.get_dog_states(query={"term": {"status": "Available"}}, source=AVAILABLE_DOG_FIELDS)
+        return available_dogs_from_states(states)
+
+    async def get_dog_by_id(self, dog_id):
+        body = {"query": {"match": {"id": dog_id}}, "sort": LATEST_FIRST_SORT}
+        response = await self.es.search(index="animal-humane-*", body=body, size=1)
+        hits = response.get("hits", {}).get("hits", [])
+        if hits:
+            dog_data = hits[0]["_source"]
+            dog_data["_index"] = hits[0]["_index"]
+            return dog_data
+        return None
+
+    async def get_events(self, event_types=None, since=None, until=None, dog_ids=None, source=None):
+        """ElasticsearchHandler.get_events: oldest first, None before dog-events is built."""
+        try:
+            events = [
+                hit["_source"]
+                async for hit in async_scan(
+                    self.es,
+                    index=DOG_EVENTS_INDEX,
+                    query=events_query(event_types, since, until, dog_ids),
+                    _source=source if source else True
+                )
+            ]
+        except es_exceptions.NotFoundError:
+            return None
+        return sort_events(events)
+
+    async def get_first_seen(self, dog_ids=None):
+        """ElasticsearchHandler.get_first_seen: {str(dog_id): {"id", "name", "first_seen", "first_index"}}."""
+        ids = [int(dog_id) for dog_id in dog_ids] if dog_ids is not None else None
+        if ids is not None and not ids:
+            return {}
+
+        if await self.es.indices.exists(index=DOG_STATE_INDEX):
+            states = await self.get_dog_states(
+                query={"terms": {"id": ids}} if ids is not None else None,
+                source=FIRST_SEEN_STATE_FIELDS
+            )
+            return first_seen_from_states(states)
+
+        body = first_seen_body(ids)
+        first_seen = {}
+        while True:
+            response = await self.es.search(index="animal-humane-*", body=body)
+            agg = response["aggregations"]["dogs"]
+            collect_first_seen(agg["buckets"], first_seen)
+            if not agg["buckets"] or "after_key" not in agg:
+                break
+            body["aggs"]["dogs"]["composite"]["after"] = agg["after_key"]
+        return first_seen
+
+    async def get_age_groups(self, idx):
+        try:
+            if not await self.es.indices.exists(index=idx):
+                print(f"Index {idx} does not exist, returning empty age groups")
+                return []
+            response = await self.es.search(index=idx, body=AGE_GROUPS_QUERY)
+            age_group_data = age_groups_from_response(response)
+            if age_group_data is None:
+                print(f"No aggregations found in response for index {idx}, returning empty age groups")
+                return []
+            return age_group_data
+        except Exception as e:
+            print(f"Error in get_age_groups: {e}")
+            return []
+
+    async def get_avg_length_of_stay(self):
+        res = await self.es.search(index="animal-humane-*", body=AVG_LENGTH_OF_STAY_QUERY)
+        average_los, count = average_length_of_stay(res)
+        return round(average_los)
+
+    async def get_longest_resident(self):
+        dogs_by_id = await self.get_dog_states(source=LONGEST_RESIDENT_FIELDS)
+        return longest_resident_from_states(dogs_by_id)
@@ -0,0 +1,163 @@
+"""
+Streaming, chunked bulk ingest shared by the scrape writer, backfills and the
+migration scripts.
+
+Actions are the same dicts helpers.bulk takes ({"_index", "_id", "_source"},
+"_op_type", ...). They're read lazily and cut into chunks by document count and
+by serialized size, so a backfill never holds more than a few chunks in memory.
+Chunks go out on a small thread pool. Whole requests or individual documents
+rejected with 429 (the cluster's write queue is full) are retried with
+exponential backoff; any other per-document error is collected and returned
+rather than raised. Only the final chunk asks for refresh=wait_for, after every
+other chunk has landed, so callers can read what they wrote without paying for a
+refresh per chunk.
+"""
+import json
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from elasticsearch import exceptions as es_exceptions
+from elasticsearch.helpers import expand_action
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_INITIAL_BACKOFF = 1
+DEFAULT_MAX_BACKOFF = 60
+
+# indexed: documents written; failed: [{"_index", "_id", "status", "error"}]; chunks: requests made
+BulkIngestResult = namedtuple("BulkIngestResult", ["indexed", "failed", "chunks"])
+
+
+def _serialize(action):
+    op, data = expand_action(action)
+    lines = [json.dumps(op)]
+    if data is not None:
+        lines.append(data if isinstance(data, str) else json.dumps(data))
+    return op, lines
+
+
+def iter_chunks(actions, chunk_size=DEFAULT_CHUNK_SIZE, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES):
+    """Yield lists of (op, lines) holding at most chunk_size documents / max_chunk_bytes."""
+    chunk = []
+    chunk_bytes = 0
+    for action in actions:
+        op, lines = _serialize(action)
+        # +1 per line for the newline separating NDJSON lines
+        item_bytes = sum(len(line.encode("utf-8")) + 1 for line in lines)
+        if chunk and (len(chunk) >= chunk_size or chunk_bytes + item_bytes > max_chunk_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append((op, lines))
+        chunk_bytes += item_bytes
+    if chunk:
+        yield chunk
+
+
+def _failure(op, status, error):
+    meta = next(iter(op.values()))
+    return {"_index": meta.get("_index"), "_id": meta.get("_id"), "status": status, "error": error}
+
+
+def send_chunk(es, chunk, refresh=None, max_retries=DEFAULT_MAX_RETRIES,
+               initial_backoff=DEFAULT_INITIAL_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF):
+    """Send one chunk, retrying 429s with backoff. Returns (indexed, failed)."""
+    indexed = 0
+    failed = []
+    pending = chunk
+    attempt = 0
+    while pending:
+        kwargs = {"refresh": refresh} if refresh else {}
+        try:
+            resp = es.bulk(operations=[line for _, lines in pending for line in lines], **kwargs)
+        except es_exceptions.ApiError as e:
+            if e.status_code == 429 and attempt < max_retries:
+                time.sleep(min(max_backoff, initial_backoff * 2 ** attempt))
+                attempt += 1
+                continue
+            failed.extend(_failure(op, e.status_code, str(e)) for op, _ in pending)
+            break
+        except es_exceptions.TransportError as e:
+            failed.extend(_failure(op, None, str(e)) for op, _ in pending)
+            break
+
+        retry = []
+        for item, result in zip(pending, resp["items"]):
+            info = next(iter(result.values()))
+            status = info.get("status", 500)
+            if 200 <= status < 300:
+                indexed += 1
+            elif status == 429 and attempt < max_retries:
+                retry.append(item)
+            else:
+                failed.append({"_index": info.get("_index"), "_id": info.get("_id"),
+                               "status": status, "error": info.get("error")})
+        pending = retry
+        if pending:
+            time.sleep(min(max_backoff, initial_backoff * 2 ** attempt))
+            attempt += 1
+    return indexed, failed
+
+
+def bulk_ingest(es, actions, chunk_size=DEFAULT_CHUNK_SIZE, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                workers=DEFAULT_WORKERS, max_retries=DEFAULT_MAX_RETRIES, initial_backoff=DEFAULT_INITIAL_BACKOFF,
+                max_backoff=DEFAULT_MAX_BACKOFF, refresh="wait_for"):
+    """
+    Write actions (any iterable, consumed lazily) and return a BulkIngestResult.
+
+    refresh applies to the final chunk only; pass None to skip it.
+    """
+    indexed = 0
+    failed = []
+    chunks = 0
+
+    def send(chunk, chunk_refresh=None):
+        return send_chunk(es, chunk, refresh=chunk_refresh, max_retries=max_retries,
+                          initial_backoff=initial_backoff, max_backoff=max_backoff)
+
+    def collect(outcome):
+        nonlocal indexed
+        indexed += outcome[0]
+        failed.extend(outcome[1])
+
+    # Each chunk is held back until the next one shows up, so the last one can be
+    # sent on its own once everything before it has been written
+    previous = None
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        in_flight = deque()
+        for chunk in iter_chunks(actions, chunk_size, max_chunk_bytes):
+            if previous is not None:
+                in_flight.append(pool.submit(send, previous))
+                chunks += 1
+                if len(in_flight) >= workers:
+                    collect(in_flight.popleft().result())
+            previous = chunk
+        while in_flight:
+            collect(in_flight.popleft().result())
+    if previous is not None:
+        collect(send(previous, refresh))
+        chunks += 1
+    return BulkIngestResult(indexed, failed, chunks)
+
+
+def read_bulk_ndjson(path):
+    """
+    Actions from a file in _bulk format (action line, then source line), e.g.
+    archived_data/*.ndjson. Malformed records are reported and skipped.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = ((number, line) for number, line in enumerate(f, 1) if line.strip())
+        for number, line in lines:
+            try:
+                (op_type, meta), = json.loads(line).items()
+                action = {"_op_type": op_type, **meta}
+                if op_type != "delete":
+                    number, line = next(lines)
+                    action["_source"] = json.loads(line)
+            except (ValueError, StopIteration) as e:
+                print(f"{path}:{number}: skipping malformed record: {e}")
+                continue
+            yield action
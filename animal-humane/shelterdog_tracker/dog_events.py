@@ -0,0 +1,149 @@
+"""
+Status-transition events derived at ingest time.
+
+Each scrape is compared against the previous per-dog state (see dog-state in
+elasticsearch_handler) and the differences are written as small typed events.
+Questions like "who was adopted this week" or "who came back today" then become
+range queries over events instead of comparisons between whole snapshot indices.
+"""
+from datetime import datetime, timezone
+
+# Named outside the animal-humane-* pattern on purpose: every snapshot reader fans
+# out over that wildcard and would otherwise pick up event documents.
+DOG_EVENTS_INDEX = "dog-events"
+
+INTAKE = "intake"
+DELISTED = "delisted"
+TRIAL_STARTED = "trial_started"
+ADOPTED = "adopted"
+RETURNED = "returned"
+RELISTED = "relisted"
+
+EVENT_TYPES = [INTAKE, DELISTED, TRIAL_STARTED, ADOPTED, RETURNED, RELISTED]
+
+# Shelter local time, used when rounding range queries like "now/d" or "now-7d/d"
+EVENTS_TIME_ZONE = "America/Denver"
+
+DOG_EVENTS_MAPPING = {
+    "mappings": {
+        "properties": {
+            "dog_id": {"type": "long"},
+            "event": {"type": "keyword"},
+            "name": {"type": "text", "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}},
+            "scrape": {"type": "keyword"},
+            "timestamp": {"type": "date"},
+            "status": {"type": "keyword"},
+            "location": {"type": "keyword"},
+            "previous_status": {"type": "keyword"},
+            "previous_location": {"type": "keyword"},
+            "age_group": {"type": "keyword"},
+            "origin": {"type": "keyword"},
+            "length_of_stay_days": {"type": "integer"},
+            "url": {"type": "keyword"}
+        }
+    }
+}
+
+
+def _is_trial(location):
+    return 'trial adoption' in str(location or '').lower()
+
+
+def _is_adopted(status):
+    return str(status or '').lower() == 'adopted'
+
+
+def make_event(event, record, scrape, timestamp, previous=None):
+    """Build an event document from a dog record and its previous state (if any)."""
+    previous = previous or {}
+    dog_id = record.get('id')
+    return {
+        "dog_id": dog_id,
+        "event": event,
+        "name": record.get('name'),
+        "scrape": scrape,
+        "timestamp": timestamp,
+        "status": record.get('status'),
+        "location": record.get('location'),
+        "previous_status": previous.get('status'),
+        "previous_location": previous.get('location'),
+        "age_group": record.get('age_group'),
+        "origin": record.get('origin'),
+        "length_of_stay_days": record.get('length_of_stay_days'),
+        "url": record.get('url') or f"https://new.shelterluv.com/embed/animal/{dog_id}"
+    }
+
+
+def event_doc_id(event_doc):
+    # Deterministic ids make re-ingesting or replaying a scrape idempotent
+    return f"{event_doc['dog_id']}-{event_doc['scrape']}-{event_doc['event']}"
+
+
+def detect_events(previous_states, current_records, scrape, timestamp=None):
+    """
+    Compare one scrape against the previous per-dog state.
+
+    Args:
+        previous_states: {str(dog_id): state} where state has status, location and listed.
+        current_records: Records (dicts shaped like Dog.to_dict) from the new scrape.
+        scrape: Snapshot index name the records were written to.
+        timestamp: Scrape time; defaults to the first record's timestamp, then now.
+
+    Returns:
+        List of event documents.
+    """
+    if timestamp is None:
+        timestamp = next(
+            (r.get('timestamp') for r in current_records if r.get('timestamp')),
+            datetime.now(timezone.utc).isoformat()
+        )
+
+    events = []
+    seen_ids = set()
+    for record in current_records:
+        dog_id = record.get('id')
+        if dog_id is None:
+            continue
+        seen_ids.add(str(dog_id))
+        previous = previous_states.get(str(dog_id))
+
+        if previous is None:
+            events.append(make_event(INTAKE, record, scrape, timestamp))
+            if _is_trial(record.get('location')):
+                events.append(make_event(TRIAL_STARTED, record, scrape, timestamp))
+            continue
+
+        if _is_adopted(previous.get('status')) and not _is_adopted(record.get('status')):
+            events.append(make_event(RETURNED, record, scrape, timestamp, previous))
+        elif previous.get('listed') is False:
+            events.append(make_event(RELISTED, record, scrape, timestamp, previous))
+
+        if _is_adopted(record.get('status')) and not _is_adopted(previous.get('status')):
+            events.append(make_event(ADOPTED, record, scrape, timestamp, previous))
+        elif _is_trial(record.get('location')) and not _is_trial(previous.get('location')):
+            events.append(make_event(TRIAL_STARTED, record, scrape, timestamp, previous))
+
+    for dog_id, previous in previous_states.items():
+        if dog_id in seen_ids or not previous.get('listed'):
+            continue
+        events.append(make_event(DELISTED, previous, scrape, timestamp, previous))
+
+    return events
+
+
+def advance_states(states, current_records, scrape):
+    """Advance an in-memory {str(dog_id): state} map past one scrape (used when replaying history)."""
+    seen_ids = set()
+    for record in current_records:
+        dog_id = record.get('id')
+        if dog_id is None:
+            continue
+        seen_ids.add(str(dog_id))
+        state = dict(record)
+        state['listed'] = True
+        state['last_index'] = scrape
+        states[str(dog_id)] = state
+    for dog_id, state in states.items():
+        if dog_id not in seen_ids:
+            state['listed'] = False
+    return states
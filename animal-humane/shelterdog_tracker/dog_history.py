@@ -0,0 +1,150 @@
+"""
+"Ever seen" and "ever adopted" dog ids.
+
+has_been_seen_before and the recent-pupdates adoption-history check used to ask
+Elasticsearch about one dog at a time, the latter by probing up to 540 guessed
+index names for existence first. Both are membership questions over a few
+thousand ids, so DogHistory keeps the answers as sorted int64 arrays searched with
+np.searchsorted: every dog ever listed with the day it was first seen, and every
+dog with an adoption on record. Exact sets this size cost 8-12 bytes per dog, so
+there's no need for a Bloom filter's false positives.
+
+Ingest folds each scrape and each adoption event in and saves a sidecar .npz file
+(like dog_id_sets); `through` records the newest scrape it covers, so readers in
+other processes can tell when it's behind and rebuild it from dog-state/dog-events.
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from shelterdog_tracker.dog_id_sets import to_id_array
+from shelterdog_tracker.index_compaction import SNAPSHOT_NAME
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_PATH = str(Path(__file__).parent.parent / "analytics" / "dog_history.npz")
+
+_EMPTY_IDS = np.array([], dtype=np.int64)
+_EMPTY_DAYS = np.array([], dtype=np.int32)
+
+
+def scrape_day(scrape):
+    """YYYYMMDD as an int for an animal-humane-YYYYMMDD-HHMM scrape name."""
+    match = SNAPSHOT_NAME.match(scrape or "")
+    if not match:
+        raise ValueError(f"Not a scrape name: {scrape!r}")
+    return int(match.group(1))
+
+
+def _day_number(day):
+    if hasattr(day, "strftime"):
+        day = day.strftime("%Y%m%d")
+    return int(day)
+
+
+def _position(ids, dog_id):
+    dog_id = int(dog_id)
+    pos = int(np.searchsorted(ids, dog_id))
+    return pos if pos < len(ids) and ids[pos] == dog_id else None
+
+
+class DogHistory:
+    def __init__(self, seen_ids=None, first_days=None, adopted_ids=None, through=None):
+        self.seen_ids = seen_ids if seen_ids is not None else _EMPTY_IDS
+        self.first_days = first_days if first_days is not None else _EMPTY_DAYS
+        self.adopted_ids = adopted_ids if adopted_ids is not None else _EMPTY_IDS
+        self.through = through
+
+    @classmethod
+    def build(cls, first_seen, adopted_ids=(), through=None):
+        """From {dog_id: first scrape name} and the ids of every dog ever adopted."""
+        history = cls(through=through)
+        by_day = {}
+        for dog_id, scrape in first_seen.items():
+            if SNAPSHOT_NAME.match(scrape or ""):
+                by_day.setdefault(scrape, []).append(dog_id)
+        for scrape, ids in by_day.items():
+            history.add_scrape(scrape, ids)
+        history.add_adopted(adopted_ids)
+        history.through = through
+        return history
+
+    # --- Updates ----------------------------------------------------------
+
+    def add_scrape(self, scrape, ids):
+        """Fold in the dogs listed at a scrape."""
+        day = scrape_day(scrape)
+        ids = to_id_array(ids)
+        if len(ids):
+            pos = np.searchsorted(self.seen_ids, ids)
+            known = pos < len(self.seen_ids)
+            known[known] = self.seen_ids[pos[known]] == ids[known]
+            self.first_days[pos[known]] = np.minimum(self.first_days[pos[known]], day)
+            new_ids = ids[~known]
+            if len(new_ids):
+                seen_ids = np.concatenate([self.seen_ids, new_ids])
+                first_days = np.concatenate([self.first_days, np.full(len(new_ids), day, dtype=np.int32)])
+                order = np.argsort(seen_ids, kind="stable")
+                self.seen_ids, self.first_days = seen_ids[order], first_days[order]
+        if self.through is None or scrape > self.through:
+            self.through = scrape
+
+    def add_adopted(self, ids):
+        ids = to_id_array(ids)
+        if len(ids):
+            self.adopted_ids = np.union1d(self.adopted_ids, ids)
+
+    # --- Lookups ----------------------------------------------------------
+
+    def ever_seen(self, dog_id):
+        return _position(self.seen_ids, dog_id) is not None
+
+    def seen_before(self, dog_id, day):
+        """Whether the dog was listed at a scrape before the given day (date or "YYYYMMDD")."""
+        pos = _position(self.seen_ids, dog_id)
+        return pos is not None and int(self.first_days[pos]) < _day_number(day)
+
+    def ever_adopted(self, dog_id):
+        return _position(self.adopted_ids, dog_id) is not None
+
+    # --- Sidecar ----------------------------------------------------------
+
+    def save(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, seen_ids=self.seen_ids, first_days=self.first_days,
+                            adopted_ids=self.adopted_ids, through=np.array(self.through or ""))
+        os.replace(tmp_path, path)
+        _loaded.pop(path, None)
+
+    @classmethod
+    def load(cls, path):
+        """Load a sidecar file; a missing or unreadable one just means starting empty."""
+        try:
+            with np.load(path) as data:
+                return cls(data["seen_ids"], data["first_days"], data["adopted_ids"], str(data["through"]) or None)
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(path):
+                logger.warning(f"Ignoring unreadable dog history sidecar {path}: {e}")
+            return cls()
+
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def load_cached(path):
+    """DogHistory.load, re-reading the file only when it has been replaced since."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return DogHistory()
+    with _loaded_lock:
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, DogHistory.load(path))
+            _loaded[path] = cached
+        return cached[1]
@@ -0,0 +1,100 @@
+"""
+Per-scrape sets of dog ids.
+
+New, disappeared, unlisted and missing dogs are all differences between the ids
+listed at different scrapes. Every scrape's ids are already recorded at ingest in
+its manifest (dog_ids, see snapshot_delta.build_manifest); ScrapeIdSets keeps them
+as sorted numpy arrays so unions and differences over a range of scrapes are
+in-memory array operations instead of scans of every historical index.
+
+Scrape names (animal-humane-YYYYMMDD-HHMM) sort in time order, so a range of
+scrapes is just a range of names. A sidecar .npz file caches the sets between
+runs; a scrape's ids never change once it's been written, so only scrapes missing
+from the sidecar have to be read from Elasticsearch.
+"""
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIDECAR_PATH = str(Path(__file__).parent.parent / "analytics" / "scrape_id_sets.npz")
+
+_EMPTY = np.array([], dtype=np.int64)
+
+
+def day_start(day):
+    """Lowest scrape name on a day ("20260110" or a date/datetime), for use as a range bound."""
+    if hasattr(day, "strftime"):
+        day = day.strftime("%Y%m%d")
+    return f"animal-humane-{day}"
+
+
+def to_id_array(ids):
+    """Sorted, de-duplicated int64 array of dog ids."""
+    return np.unique(np.fromiter((int(i) for i in ids), dtype=np.int64))
+
+
+def difference(a, b):
+    """Ids in a but not in b (both sorted id arrays)."""
+    return np.setdiff1d(a, b, assume_unique=True)
+
+
+class ScrapeIdSets:
+    def __init__(self, sets=None):
+        self._sets = {}
+        for scrape, ids in (sets or {}).items():
+            self.add(scrape, ids)
+
+    def add(self, scrape, ids):
+        self._sets[scrape] = ids if isinstance(ids, np.ndarray) else to_id_array(ids)
+
+    def __contains__(self, scrape):
+        return scrape in self._sets
+
+    def __len__(self):
+        return len(self._sets)
+
+    @property
+    def scrapes(self):
+        return sorted(self._sets)
+
+    def latest_scrape(self):
+        return max(self._sets) if self._sets else None
+
+    def ids_at(self, scrape):
+        return self._sets.get(scrape, _EMPTY)
+
+    def union_of(self, scrapes):
+        arrays = [self._sets[s] for s in scrapes if s in self._sets]
+        return np.unique(np.concatenate(arrays)) if arrays else _EMPTY
+
+    def union(self, start=None, end=None):
+        """Ids listed at any scrape with start <= name < end (either bound optional)."""
+        return self.union_of(
+            s for s in self._sets
+            if (start is None or s >= start) and (end is None or s < end)
+        )
+
+    def seen_before(self, scrape):
+        """Ids listed at any scrape earlier than the given one."""
+        return self.union(end=scrape)
+
+    def save(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, **self._sets)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a sidecar file; a missing or unreadable one just means starting empty."""
+        try:
+            with np.load(path) as data:
+                return cls({scrape: data[scrape] for scrape in data.files})
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                logger.warning(f"Ignoring unreadable id set sidecar {path}: {e}")
+            return cls()
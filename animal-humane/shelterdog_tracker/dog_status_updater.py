@@ -6,20 +6,31 @@ class DogStatusUpdater:
     def update_dog_statuses(self, ids_to_process, indexA, indexB):
         print(f"update_dog_statuses called with ids: {ids_to_process}")
         print(f"and indices {indexA} and {indexB}")
+        # Every dog's latest document in one lookup, and the location changes in one bulk update
+        latest = self.es_handler.latest_docs(ids_to_process)
+        # Every dog's current location, fetched concurrently
+        urls = {dog_id: f'https://new.shelterluv.com/embed/animal/{dog_id}' for dog_id in ids_to_process}
+        locations = self.scraper.scrape_dog_locations(list(urls.values()))
+        corrections = []
         for dog_id in ids_to_process:
+            dog_doc = latest.get(int(dog_id))
+            if dog_doc is None:
+                print(f"No documents found for dog ID {dog_id}")
+                continue
             #Retrieve current location
-            url = f'https://new.shelterluv.com/embed/animal/{dog_id}'
-            current_location = self.scraper.scrape_dog_location(url)
+            if urls[dog_id] not in locations:
+                print(f"Couldn't read the live status of dog ID {dog_id}")
+                continue
+            current_location = locations[urls[dog_id]]
             #Compare current location with index location
-            dog_doc = get_dog_by_id(self, dog_id) 
-            index_location = dog_doc['location']
+            index_location = dog_doc.source.get('location')
             if current_location != index_location:
                 print(f"current_location in DogStatusUpdater class is: {current_location}")
                 # Example: new_status_info = {'status': 'Adopted', 'location': 'Foster'}
-                self.es_handler.update_dog_fields(indexA, dog_id, current_location)
+                corrections.append((dog_id, {"location": current_location}))
             elif current_location == index_location:
-                dog_data = dog_doc['_source']
-                self.es_handler.index_dog(self, indexB, id=dog_id, document=dog_data)
+                self.es_handler.es.index(index=indexB, id=dog_id, document=dog_doc.source)
+        self.es_handler.apply_corrections(corrections, latest=latest)
 
 
 #There are two (so far) cases to handle when dog is in indexA but not indexB:
@@ -1,5 +1,9 @@
+import copy
+from collections import namedtuple
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
 import json
+import os
 import pytz
 import re
 import requests
@@ -9,7 +13,341 @@ from typing import Dict, Any
 from elasticsearch import Elasticsearch, helpers, exceptions as es_exceptions
 from elasticsearch.helpers import scan
 
+from shelterdog_tracker.analytics_mirror import ELASTICSEARCH, SQLITE, AnalyticsMirror
+from shelterdog_tracker.bulk_ingest import bulk_ingest
 from shelterdog_tracker.dog import Dog
+from shelterdog_tracker.dog_history import DEFAULT_HISTORY_PATH, DogHistory, load_cached
+from shelterdog_tracker.dog_id_sets import DEFAULT_SIDECAR_PATH, ScrapeIdSets, day_start, difference
+from shelterdog_tracker.dog_events import (
+    DOG_EVENTS_INDEX, DOG_EVENTS_MAPPING, ADOPTED, INTAKE, EVENTS_TIME_ZONE,
+    advance_states, detect_events, event_doc_id, make_event
+)
+from shelterdog_tracker.index_catalog import get_catalog
+from shelterdog_tracker.index_compaction import COMPACTED_INDEX_PATTERN
+from shelterdog_tracker.index_template import ensure_snapshot_template
+from shelterdog_tracker.read_session import DEFAULT_KEEP_ALIVE, PitClient, ReadSession
+from shelterdog_tracker.snapshot_delta import (
+    DELTA, FULL, UNCHANGED, DELTA_INDEX_MAPPING, MANIFEST_INDEX, MANIFEST_MAPPING, VOLATILE_FIELDS,
+    build_manifest, content_hash, delta_index_for, is_unchanged, plan_delta, scrape_name_at
+)
+
+# One document per dog holding the dog's latest scraped record plus bookkeeping
+# (first/last sighting, the snapshot index the record came from, and whether the
+# dog was listed in the most recent scrape). Kept up to date at ingest so readers
+# don't have to scan every animal-humane-* snapshot to find each dog's latest record.
+DOG_STATE_INDEX = "dog-state"
+
+DOG_STATE_MAPPING = {
+    "mappings": {
+        "properties": {
+            "id": {"type": "long"},
+            "name": {"type": "text", "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}},
+            "status": {"type": "keyword"},
+            "location": {"type": "text", "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}},
+            "origin": {"type": "keyword"},
+            "intake_date": {"type": "date"},
+            "first_seen": {"type": "date"},
+            "last_seen": {"type": "date"},
+            "first_index": {"type": "keyword"},
+            "last_index": {"type": "keyword"},
+            "listed": {"type": "boolean"},
+            "content_hash": {"type": "keyword"}
+        }
+    }
+}
+
+# Index names are animal-humane-YYYYMMDD-HHMM, so comparing them as strings orders
+# them in time. That lets the upsert be replayed in any order (e.g. a backfill)
+# without an older snapshot overwriting a newer record.
+DOG_STATE_UPSERT_SCRIPT = """
+if (ctx._source.first_index == null || params.index.compareTo(ctx._source.first_index) < 0) {
+    ctx._source.first_index = params.index;
+    ctx._source.first_seen = params.seen;
+}
+if (ctx._source.last_index == null || params.index.compareTo(ctx._source.last_index) >= 0) {
+    for (entry in params.record.entrySet()) {
+        ctx._source[entry.getKey()] = entry.getValue();
+    }
+    ctx._source.last_index = params.index;
+    ctx._source.last_seen = params.seen;
+    ctx._source.listed = params.listed;
+    ctx._source.record_index = params.storage;
+}
+"""
+
+# Corrections (adoptions, location updates, metadata refreshes) are applied to a
+# dog's most recent snapshot document; mirror them into dog-state only when that
+# document is still the one the state was built from. record_index is the physical
+# index holding that document, which differs from last_index in delta storage mode.
+# The corrected state no longer matches the scraped record's content_hash, so drop it.
+DOG_STATE_SYNC_SCRIPT = """
+if (ctx._source.last_index == params.index || ctx._source.record_index == params.index) {
+    for (entry in params.fields.entrySet()) {
+        ctx._source[entry.getKey()] = entry.getValue();
+    }
+    ctx._source.remove('content_hash');
+} else {
+    ctx.op = 'noop';
+}
+"""
+
+# Dogs whose content_hash didn't change only need their sighting moved forward and
+# their volatile fields (timestamp, length_of_stay_days) refreshed, which one
+# update_by_query does for all of them instead of a scripted upsert per dog.
+DOG_STATE_TOUCH_SCRIPT = """
+if (ctx._source.last_index == null || params.index.compareTo(ctx._source.last_index) >= 0) {
+    def volatile = params.volatile[ctx._id];
+    if (volatile != null) {
+        for (entry in volatile.entrySet()) {
+            ctx._source[entry.getKey()] = entry.getValue();
+        }
+    }
+    ctx._source.last_index = params.index;
+    ctx._source.last_seen = params.seen;
+    ctx._source.listed = params.listed;
+    if (params.storage != null) {
+        ctx._source.record_index = params.storage;
+    }
+} else {
+    ctx.op = 'noop';
+}
+"""
+
+SNAPSHOT_INDEX_PATTERN = re.compile(r'^animal-humane-(\d{8})-(\d{4})$')
+
+# Every record carries the scrape it came from. Sorting on it (falling back to the
+# index name for records written before the field existed) finds a dog's newest
+# record even when one index holds several scrapes, as delta indices do.
+LATEST_FIRST_SORT = [
+    {"scrape.keyword": {"order": "desc", "unmapped_type": "keyword", "missing": "_last"}},
+    {"_index": {"order": "desc"}}
+]
+EARLIEST_FIRST_SORT = [
+    {"scrape.keyword": {"order": "asc", "unmapped_type": "keyword", "missing": "_first"}},
+    {"_index": {"order": "asc"}}
+]
+
+# Where a dog's document lives and what it holds, as returned by latest_docs/recent_docs
+LatestDoc = namedtuple("LatestDoc", ["index", "id", "source"])
+LATEST_DOCS_PAGE_SIZE = 1000
+
+# Everything a read session's point in time covers
+READ_SESSION_INDICES = ["animal-humane-*", DOG_STATE_INDEX, DOG_EVENTS_INDEX, MANIFEST_INDEX]
+
+# Query bodies and response parsing for the read paths, shared with
+# AsyncElasticsearchHandler so both clients answer the same way.
+
+AVAILABLE_DOG_FIELDS = ["id", "name", "url", "status", "location", "origin", "intake_date", "length_of_stay_days", "birthdate", "age_group", "breed", "secondary_breed", "weight_group", "color", "bite_quarantine", "returned", "latitude", "longitude"]
+FIRST_SEEN_STATE_FIELDS = ["id", "name", "first_seen", "first_index"]
+AGE_GROUPS_QUERY = {"query":{"bool":{"must":[{"match":{"status":"Available"}}]}},"aggs":{"age_groups":{"terms":{"field":"age_group.keyword"},"aggs": {"unique_dogs": {"cardinality":{"field": "id"}}}}}}
+AVG_LENGTH_OF_STAY_QUERY = {"size":0,"query":{"term":{"status.keyword":"adopted"}},"aggs": {"by_id": {"terms": {"field": "id","size": 100},"aggs": {"most_recent": {"top_hits":{"size":1,"sort":LATEST_FIRST_SORT,"_source": ["id", "length_of_stay_days", "status"]}}}}}}
+LONGEST_RESIDENT_FIELDS = ["id", "status", "name", "intake_date", "url"]
+
+
+def available_dogs_from_states(states):
+    """dog-state records -> the availables list the API and diff code expect."""
+    available_dogs = []
+    for dog_data in states.values():
+        # Filter for dogs with status "Available" from their most recent record
+        if dog_data.get("status") != "Available":
+            continue
+        available_dogs.append({
+            "name": dog_data.get("name"),
+            "dog_id": dog_data.get("id"),
+            "url": dog_data.get("url"),
+            "location": dog_data.get("location"),
+            "origin": dog_data.get("origin"),
+            "status": dog_data.get("status"),  # Make sure status is included
+            "intake_date": dog_data.get("intake_date"),
+            "length_of_stay_days": dog_data.get("length_of_stay_days"),
+            "birthdate": dog_data.get("birthdate"),
+            "age_group": dog_data.get("age_group"),
+            "breed": dog_data.get("breed"),
+            "secondary_breed": dog_data.get("secondary_breed"),
+            "weight_group": dog_data.get("weight_group"),
+            "color": dog_data.get("color"),
+            "bite_quarantine": dog_data.get("bite_quarantine"),
+            "returned": dog_data.get("returned"),
+            "latitude": dog_data.get("latitude"),
+            "longitude": dog_data.get("longitude")
+        })
+    return available_dogs
+
+
+def events_query(event_types=None, since=None, until=None, dog_ids=None):
+    filters = []
+    if event_types:
+        filters.append({"terms": {"event": list(event_types)}})
+    if dog_ids is not None:
+        filters.append({"terms": {"dog_id": [int(d) for d in dog_ids]}})
+    if since is not None or until is not None:
+        date_range = {"time_zone": EVENTS_TIME_ZONE}
+        if since is not None:
+            date_range["gte"] = since
+        if until is not None:
+            date_range["lte"] = until
+        filters.append({"range": {"timestamp": date_range}})
+    return {"query": {"bool": {"filter": filters}}}
+
+
+def sort_events(events):
+    return sorted(events, key=lambda e: (e.get("timestamp") or "", e.get("scrape") or ""))
+
+
+def first_seen_from_states(states):
+    return {
+        dog_id: {"id": state["id"], "name": state.get("name"),
+                 "first_seen": state.get("first_seen"), "first_index": state.get("first_index")}
+        for dog_id, state in states.items()
+    }
+
+
+def first_seen_body(ids):
+    """Composite aggregation finding each dog's earliest snapshot record (ids None for every dog)."""
+    return {
+        "size": 0,
+        "query": {"terms": {"id": ids}} if ids is not None else {"exists": {"field": "id"}},
+        "aggs": {
+            "dogs": {
+                "composite": {"size": 1000, "sources": [{"id": {"terms": {"field": "id"}}}]},
+                "aggs": {
+                    "earliest": {
+                        "top_hits": {"size": 1, "sort": EARLIEST_FIRST_SORT,
+                                     "_source": ["name", "scrape", "timestamp"]}
+                    }
+                }
+            }
+        }
+    }
+
+
+def collect_first_seen(buckets, first_seen):
+    for bucket in buckets:
+        hits = bucket["earliest"]["hits"]["hits"]
+        if not hits:
+            continue
+        dog_id = bucket["key"]["id"]
+        source = hits[0]["_source"]
+        first_seen[str(dog_id)] = {
+            "id": dog_id,
+            "name": source.get("name"),
+            "first_seen": source.get("timestamp"),
+            # The scrape name, not the (possibly compacted) index it's stored in
+            "first_index": source.get("scrape") or hits[0]["_index"]
+        }
+
+
+def recent_docs_body(batch, fields, size, pit_id, page_size):
+    """One page of the collapsed newest-documents-per-dog search (batch None for every dog)."""
+    source = True if fields is None else (list(fields) or False)
+    return {
+        "size": page_size,
+        "query": {"terms": {"id": batch}} if batch is not None else {"exists": {"field": "id"}},
+        "collapse": {
+            "field": "id",
+            "inner_hits": {"name": "latest", "size": size, "sort": LATEST_FIRST_SORT, "_source": source}
+        },
+        "sort": [{"id": {"order": "asc"}}],
+        "_source": False,
+        "pit": {"id": pit_id, "keep_alive": "1m"}
+    }
+
+
+def collect_recent_docs(hits, docs):
+    for hit in hits:
+        inner = hit["inner_hits"]["latest"]["hits"]["hits"]
+        docs[int(hit["fields"]["id"][0])] = [
+            LatestDoc(h["_index"], h["_id"], h.get("_source", {})) for h in inner
+        ]
+
+
+def id_batches(ids, page_size):
+    """Sorted, de-duplicated int ids in batches (a single None batch for "every dog")."""
+    if ids is None:
+        return [None]
+    ids = sorted({int(dog_id) for dog_id in ids})
+    return [ids[i:i + page_size] for i in range(0, len(ids), page_size)]
+
+
+def age_groups_from_response(response):
+    # Check if aggregations exist in response
+    if "aggregations" not in response or "age_groups" not in response["aggregations"]:
+        return None
+    return [
+        {
+            "age_group": bucket["key"],
+            "count": bucket["doc_count"],
+        }
+        for bucket in response["aggregations"]["age_groups"]["buckets"]
+    ]
+
+
+def age_groups_from_records(records):
+    """age_groups_from_response's shape, counted from a scrape's records (e.g. a delta scrape's view)."""
+    counts = {}
+    for record in records:
+        if record.get("status") == "Available" and record.get("age_group"):
+            counts[record["age_group"]] = counts.get(record["age_group"], 0) + 1
+    # Ordered like a terms aggregation: most dogs first, then by key
+    return [
+        {"age_group": age_group, "count": count}
+        for age_group, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
+def average_length_of_stay(response):
+    """Returns (average, number of dogs averaged)."""
+    total_los = 0
+    count = 0
+    for bucket in response["aggregations"]["by_id"]["buckets"]:
+        doc = bucket["most_recent"]["hits"]["hits"][0]["_source"]
+        los = doc.get("length_of_stay_days")
+        if los is not None:
+            total_los += los
+            count += 1
+    return (total_los / count) if count > 0 else 0, count
+
+
+def longest_resident_from_states(dogs_by_id, today=None):
+    """
+    The available dog with the longest stay, counted from intake_date to today.
+    """
+    # Filter to only dogs with current status "available" and valid intake_date
+    available_dogs = []
+    for dog_data in dogs_by_id.values():
+        if (dog_data.get("status", "").lower() == "available" and
+            dog_data.get("intake_date") and
+            dog_data.get("name")):  # Exclude euthanized dogs
+            available_dogs.append(dog_data)
+
+    if not available_dogs:
+        return {"name": None, "days": None, "url": None}
+
+    # Calculate length of stay for each available dog and find the maximum
+    longest_stay_dog = None
+    max_days = 0
+    today = today or datetime.now().date()
+
+    for dog_data in available_dogs:
+        intake_date_str = dog_data.get("intake_date")
+
+        try:
+            # Parse intake_date (assuming format like "2025-10-17")
+            intake_date = datetime.fromisoformat(intake_date_str.split('T')[0]).date()
+            days = (today - intake_date).days
+
+            if days > max_days:
+                max_days = days
+                longest_stay_dog = {
+                    "name": dog_data.get("name"),
+                    "days": days,
+                    "url": dog_data.get("url")
+                }
+        except (ValueError, AttributeError) as e:
+            # Skip dogs with invalid intake dates
+            continue
+
+    return longest_stay_dog if longest_stay_dog else {"name": None, "days": None, "url": None}
 
 class ElasticsearchHandler:
     origin_coordinates = {
@@ -58,17 +396,79 @@ class ElasticsearchHandler:
         "Tucumcari Animal Shelter":{"latitude":35.1927,"longitude":-103.7197},
         "Valencia County Animal Shelter":{"latitude":34.7945,"longitude":-106.7400}
     }
-    def __init__(self, host, index_name):
+    def __init__(self, host, index_name, client=None):
         self.host = host
         self.index_name = index_name
-        # Configure client for Elasticsearch 8.x compatibility
-        self.es = Elasticsearch(
+        # Configure client for Elasticsearch 8.x compatibility (or share one the caller manages)
+        self.es = client if client is not None else Elasticsearch(
             host,
             request_timeout=60,
             # Disable SSL verification for local development
             verify_certs=False,
             ssl_show_warn=False
         )
+        # Chart aggregations can be answered from the local SQLite mirror instead
+        self.analytics_backend = os.getenv('ANALYTICS_BACKEND', ELASTICSEARCH).lower()
+        self._analytics_mirror = None
+        # Memoized reads, only inside a read session (see read_session)
+        self._read_cache = None
+
+    @property
+    def index_catalog(self):
+        """The shared IndexCatalog for this host, reloaded if anything was written since."""
+        catalog = get_catalog(self.host)
+        catalog.sync(self.es)
+        return catalog
+
+    def read_session(self, keep_alive=DEFAULT_KEEP_ALIVE):
+        """
+        Context manager yielding a copy of this handler that reads from one point in
+        time and reads each scrape, manifest and dog-state query at most once:
+
+            with handler.read_session() as session:
+                availables = session.get_current_availables()
+                groups = session.get_dog_groups(availables, session.get_most_recent_index())
+        """
+        return ReadSession(self, READ_SESSION_INDICES, keep_alive)
+
+    def session_copy(self, es):
+        session = copy.copy(self)
+        session.es = es
+        session._read_cache = {}
+        return session
+
+    def _session_cached(self, key, compute):
+        if self._read_cache is None:
+            return compute()
+        if key not in self._read_cache:
+            self._read_cache[key] = compute()
+        return self._read_cache[key]
+
+    def _scan(self, index, query, _source=True):
+        if isinstance(self.es, PitClient):
+            return self.es.scan(index=index, query=query, _source=_source)
+        return scan(self.es, index=index, query=query, _source=_source)
+
+    @property
+    def analytics_mirror(self):
+        if self._analytics_mirror is None:
+            self._analytics_mirror = AnalyticsMirror()
+        return self._analytics_mirror
+
+    def sync_analytics_mirror(self, rebuild=False):
+        """Bring the local analytics mirror up to date with Elasticsearch."""
+        try:
+            return self.analytics_mirror.sync(self, rebuild=rebuild)
+        except Exception as e:
+            print(f"Failed to sync analytics mirror: {e}")
+            return 0
+
+    def ensure_index_template(self):
+        """Make sure new animal-humane-* indices get explicit mappings (see index_template.py)."""
+        try:
+            ensure_snapshot_template(self.es)
+        except Exception as e:
+            print(f"Failed to install index template: {e}")
 
     def create_index(self, index_name, mapping):
         print(f"index_name passed to create_index is: {index_name}")
@@ -80,60 +480,1012 @@ class ElasticsearchHandler:
     def push_doc_to_elastic(self, index_name, doc):
         self.es.index(index=index_name, body=doc)
 
-    def push_dogs_to_elasticsearch(self, dogs):
-        bulk_lines = []
+    def push_dogs_to_elasticsearch(self, dogs, skip_if_unchanged=False):
+        """
+        Write a full snapshot of the scrape into self.index_name.
+
+        With skip_if_unchanged, a scrape where no dog was added, changed or removed
+        since the previous one writes no index at all, just an "unchanged" manifest
+        pointing at that scrape, and returns None. Only use it when nothing has
+        pre-created self.index_name, or readers would find an empty snapshot.
+        Otherwise returns the BulkIngestResult of the write.
+        """
         #Convert dog objects to dictionaries for Elasticsearch all at once like this
         #dog_dicts = [dog.to_dict(include_attributes=False) for dog in all_dogs]
 
+        records = []
         for dog in dogs:
-            action = {"index": {"_index": self.index_name, "_id": dog.id}}
-            bulk_lines.append(json.dumps(action))
-            bulk_lines.append(json.dumps(dog.to_dict(include_attributes=False)))
-        bulk_data = "\n".join(bulk_lines) + "\n"
-        url = f"{self.host}/_bulk"
-        headers = {"Content-Type": "application/json"}
-
-        # ...send request to Elasticsearch...
-        response = requests.post(url, headers=headers, data=bulk_data)
+            record = dog.to_dict(include_attributes=False)
+            record["scrape"] = self.index_name
+            records.append(record)
+
+        previous_states = self._get_previous_states()
+        unchanged_ids = None
+        nothing_changed = False
+        if previous_states is not None:
+            _, added, changed, removed = plan_delta(previous_states, records)
+            unchanged_ids = self._unchanged_ids(records, added, changed)
+            nothing_changed = bool(records and previous_states) and is_unchanged(added, changed, removed)
+            if skip_if_unchanged and nothing_changed:
+                self._record_unchanged_scrape(records, previous_states)
+                return None
 
-        # Optional: Handle response
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('errors'):
-                print("Some documents failed to index.")
-            else:
-                print("All documents indexed successfully.")
+        # Streamed in chunks; the last one waits for a refresh so the scrape is readable on return
+        result = bulk_ingest(
+            self.es,
+            ({"_op_type": "index", "_index": self.index_name, "_id": record["id"], "_source": record}
+             for record in records)
+        )
+        if result.failed:
+            print(f"{len(result.failed)} documents failed to index, first error: {result.failed[0]}")
         else:
-            print(f"Failed to index documents. Status code: {response.status_code}")
-            print(response.text)
+            print(f"All {result.indexed} documents indexed successfully in {result.chunks} chunks.")
+
+        try:
+            self.write_scrape_manifest(build_manifest(self.index_name, FULL, records, self.index_name))
+        except Exception as e:
+            print(f"Failed to write scrape manifest: {e}")
 
-        print(f"Refreshing Elasticsearch to ensure doc availability")
-        refresh_url = f"{self.host}/{self.index_name}/_refresh"
-        response = requests.post(refresh_url)
+        self._update_derived_indices(records, self.index_name, previous_states=previous_states,
+                                     unchanged_ids=unchanged_ids, nothing_changed=nothing_changed)
+        return result
 
-        if response.status_code == 200:
-            print("Index refreshed successfully.")
+    def _get_previous_states(self):
+        """dog-state as {str(dog_id): state}, or None if it hasn't been built yet."""
+        if not self.es.indices.exists(index=DOG_STATE_INDEX):
+            return None
+        return self.get_dog_states()
+
+    @staticmethod
+    def _unchanged_ids(records, added, changed):
+        moved = {str(dog_id) for dog_id in list(added) + list(changed)}
+        return {str(r["id"]) for r in records if r.get("id") is not None and str(r["id"]) not in moved}
+
+    def record_unchanged_scrape(self):
+        """
+        Record self.index_name as identical to the previous scrape when the feeds
+        reported no change, so nothing was parsed: the previous scrape's records
+        stand in, stamped with this scrape. Writes the same "unchanged" manifest
+        push_dogs_to_elasticsearch(skip_if_unchanged=True) would. Returns False if
+        there's no previous scrape to point at.
+        """
+        previous_states = self._get_previous_states()
+        if not previous_states:
+            return False
+        previous = max(state.get("last_index") or "" for state in previous_states.values())
+        timestamp = datetime.now(pytz.timezone(EVENTS_TIME_ZONE)).isoformat(timespec="seconds")
+        records = [
+            dict(record, scrape=self.index_name, timestamp=timestamp)
+            for record in self.get_scrape_view(previous).values()
+        ]
+        if not records:
+            return False
+        self._record_unchanged_scrape(records, previous_states)
+        return True
+
+    def _record_unchanged_scrape(self, records, previous_states):
+        """Record a scrape identical to the previous one without writing any records."""
+        scrape = self.index_name
+        previous = max(state.get("last_index") or "" for state in previous_states.values())
+        previous_manifest = self.get_scrape_manifest(previous) or {}
+        storage_index = previous if self.es.indices.exists(index=previous) else previous_manifest.get("storage_index")
+        self.write_scrape_manifest(
+            build_manifest(scrape, UNCHANGED, records, storage_index, written_count=0, same_as=previous)
+        )
+        print(f"{scrape}: no dogs added, changed or removed since {previous}; nothing written")
+        # Just move every dog's sighting forward
+        self._update_derived_indices(
+            records, scrape, previous_states=previous_states,
+            unchanged_ids={str(r["id"]) for r in records}, unchanged_rewritten=False, nothing_changed=True
+        )
+
+    def _update_derived_indices(self, records, scrape, storage_index=None, previous_states=None,
+                                unchanged_ids=None, unchanged_rewritten=True, nothing_changed=False):
+        # Record status transitions against the previous state before it gets overwritten
+        # (a scrape where no dog was added, changed or removed can't have any)
+        if not nothing_changed:
+            try:
+                self.record_scrape_events(records, scrape, previous_states=previous_states)
+            except Exception as e:
+                print(f"Failed to record {DOG_EVENTS_INDEX}: {e}")
+
+        # Keep the per-dog state index in step with the scrape we just wrote
+        try:
+            self.upsert_dog_state(records, scrape, storage_index=storage_index,
+                                  unchanged_ids=unchanged_ids, unchanged_rewritten=unchanged_rewritten)
+        except Exception as e:
+            print(f"Failed to update {DOG_STATE_INDEX}: {e}")
+
+        self._update_dog_history(scrape, [r["id"] for r in records if r.get("id") is not None])
+
+    @property
+    def dog_history_path(self):
+        return os.getenv("DOG_HISTORY_PATH", DEFAULT_HISTORY_PATH)
+
+    def get_dog_history(self):
+        """
+        The DogHistory sidecar ("ever seen" / "ever adopted" ids). Ingest keeps it
+        current; if it's behind the newest scrape (e.g. written by another host) it's
+        rebuilt from dog-state and dog-events and saved.
+        """
+        history = load_cached(self.dog_history_path)
+        latest = self.index_catalog.latest_scrape()
+        if history.through is not None and (latest is None or history.through >= latest):
+            return history
+        history = self.rebuild_dog_history()
+        history.save(self.dog_history_path)
+        return load_cached(self.dog_history_path)
+
+    def rebuild_dog_history(self):
+        """Build a DogHistory from dog-state's first sightings and every adoption on record."""
+        through = self.index_catalog.latest_scrape()
+        first_seen = {
+            dog_id: entry.get("first_index")
+            for dog_id, entry in self.get_first_seen().items()
+        }
+        adoptions = self.get_events(event_types=[ADOPTED], source=["dog_id"])
+        if adoptions is not None:
+            adopted_ids = [event["dog_id"] for event in adoptions if event.get("dog_id") is not None]
         else:
-            print(f"Failed to refresh index. Status code: {response.status_code}")
-            print(response.text)
-        return response
+            adopted_ids = self._get_adopted_ids_from_snapshots()
+        return DogHistory.build(first_seen, adopted_ids, through=through)
+
+    def _get_adopted_ids_from_snapshots(self):
+        body = {
+            "size": 0,
+            "query": {"term": {"status": "adopted"}},
+            "aggs": {"dogs": {"composite": {"size": 1000, "sources": [{"id": {"terms": {"field": "id"}}}]}}}
+        }
+        adopted_ids = []
+        while True:
+            agg = self.es.search(index="animal-humane-*", body=body)["aggregations"]["dogs"]
+            adopted_ids.extend(bucket["key"]["id"] for bucket in agg["buckets"])
+            if not agg["buckets"] or "after_key" not in agg:
+                return adopted_ids
+            body["aggs"]["dogs"]["composite"]["after"] = agg["after_key"]
+
+    def _update_dog_history(self, scrape, ids):
+        """Fold a just-written scrape into the DogHistory sidecar (rebuilding it if it missed any)."""
+        try:
+            history = DogHistory.load(self.dog_history_path)
+            earlier = [name for name in self.index_catalog.scrapes if name < scrape]
+            if history.through is None or (earlier and history.through < earlier[-1]):
+                # dog-state and dog-events already include this scrape
+                history = self.rebuild_dog_history()
+            else:
+                history.add_scrape(scrape, ids)
+            history.save(self.dog_history_path)
+        except Exception as e:
+            print(f"Failed to update dog history: {e}")
+
+    def _add_adoptions_to_dog_history(self, dog_ids):
+        if not dog_ids:
+            return
+        try:
+            history = DogHistory.load(self.dog_history_path)
+            # Nothing to add to yet; the first read or scrape builds it with these included
+            if history.through is None:
+                return
+            history.add_adopted(dog_ids)
+            history.save(self.dog_history_path)
+        except Exception as e:
+            print(f"Failed to update dog history: {e}")
+
+    def push_scrape_delta(self, dogs):
+        """
+        Delta storage mode: write only the dogs added or changed since the previous
+        scrape into the month's delta index, plus a manifest listing every dog in
+        this scrape. self.index_name is used as the scrape name.
+        """
+        scrape = self.index_name
+        records = []
+        for dog in dogs:
+            record = dog.to_dict(include_attributes=False) if isinstance(dog, Dog) else dict(dog)
+            record["scrape"] = scrape
+            records.append(record)
+
+        delta_index = delta_index_for(scrape)
+        # Start each month's delta index with every dog so it can be rebuilt on its own
+        keyframe = not self.es.indices.exists(index=delta_index)
+        if keyframe:
+            self.ensure_index_template()
+            self.es.indices.create(index=delta_index, body=DELTA_INDEX_MAPPING)
+            print(f"Created index: {delta_index}")
+
+        previous_states = self._get_previous_states()
+        if previous_states is None:
+            keyframe = True
+
+        to_write, added, changed, removed = plan_delta(previous_states or {}, records, keyframe=keyframe)
+        if to_write:
+            actions = [
+                {"_op_type": "index", "_index": delta_index, "_id": f"{r['id']}-{scrape}", "_source": r}
+                for r in to_write
+            ]
+            success, errors = helpers.bulk(self.es, actions, raise_on_error=False, refresh="wait_for")
+            if errors:
+                print(f"{len(errors)} delta records failed to index, first error: {errors[0]}")
+
+        manifest = build_manifest(
+            scrape, DELTA, records, delta_index, added=added, changed=changed, removed=removed,
+            written_count=len(to_write), keyframe=keyframe
+        )
+        self.write_scrape_manifest(manifest)
+        print(f"{scrape}: wrote {len(to_write)} of {len(records)} dogs to {delta_index} "
+              f"({len(added)} added, {len(changed)} changed, {len(removed)} removed)")
+
+        # Outside a keyframe, unchanged dogs' records stay wherever they were last written
+        unchanged_ids = None if keyframe else self._unchanged_ids(records, added, changed)
+        self._update_derived_indices(records, scrape, storage_index=delta_index, previous_states=previous_states,
+                                     unchanged_ids=unchanged_ids, unchanged_rewritten=False,
+                                     nothing_changed=bool(previous_states) and is_unchanged(added, changed, removed))
+        return manifest
+
+    def write_scrape_manifest(self, manifest):
+        if not self.es.indices.exists(index=MANIFEST_INDEX):
+            self.es.indices.create(index=MANIFEST_INDEX, body=MANIFEST_MAPPING)
+        self.es.index(index=MANIFEST_INDEX, id=manifest["scrape"], document=manifest, refresh="wait_for")
+        get_catalog(self.host).invalidate()
+
+    def get_scrape_manifest(self, scrape):
+        def read():
+            try:
+                return self.es.get(index=MANIFEST_INDEX, id=scrape)["_source"]
+            except es_exceptions.NotFoundError:
+                return None
+        return self._session_cached(("manifest", scrape), read)
+
+    def list_scrapes(self):
+        """
+        Return every scrape name (animal-humane-YYYYMMDD-HHMM), oldest first, whether
+        it's stored as a full snapshot index or as a delta manifest.
+        """
+        return self.index_catalog.scrapes
+
+    def get_scrape_view(self, scrape, source=None):
+        """
+        Return {dog_id: record} for every dog listed at the given scrape, the same
+        as reading a full snapshot index, regardless of how the scrape was stored.
+        """
+        if source and "id" not in source:
+            source = ["id"] + list(source)
+        if self._read_cache is not None and ("view", scrape, ()) in self._read_cache:
+            # Already read in full during this session
+            return self._read_cache[("view", scrape, ())]
+        return self._session_cached(("view", scrape, tuple(source or ())),
+                                    lambda: self._read_scrape_view(scrape, source))
+
+    def _read_scrape_view(self, scrape, source):
+        if self.es.indices.exists(index=scrape):
+            return {
+                hit["_source"]["id"]: hit["_source"]
+                for hit in self._scan(index=scrape, query={"query": {"match_all": {}}},
+                                _source=source if source else True)
+                if hit["_source"].get("id") is not None
+            }
+
+        manifest = self.get_scrape_manifest(scrape)
+        if manifest and manifest.get("mode") == UNCHANGED and manifest.get("same_as"):
+            return self.get_scrape_view(manifest["same_as"], source=source)
+        if not manifest or not manifest.get("storage_index"):
+            return {}
+
+        if manifest.get("mode") != DELTA:
+            # Compacted: the scrape's documents sit in a daily/monthly index, tagged with their scrape
+            return {
+                hit["_source"]["id"]: hit["_source"]
+                for hit in self._scan(index=manifest["storage_index"],
+                                query={"query": {"term": {"scrape.keyword": scrape}}},
+                                _source=source if source else True)
+                if hit["_source"].get("id") is not None
+            }
+        if not manifest.get("dog_ids"):
+            return {}
+
+        # Newest record per listed dog at or before this scrape
+        body = {
+            "size": len(manifest["dog_ids"]),
+            "query": {
+                "bool": {
+                    "filter": [
+                        {"terms": {"id": manifest["dog_ids"]}},
+                        {"range": {"scrape.keyword": {"lte": scrape}}}
+                    ]
+                }
+            },
+            "collapse": {"field": "id"},
+            "sort": [{"scrape.keyword": {"order": "desc"}}]
+        }
+        if source:
+            body["_source"] = source
+        resp = self.es.search(index=manifest["storage_index"], body=body)
+        return {hit["_source"]["id"]: hit["_source"] for hit in resp["hits"]["hits"]}
+
+    def find_scrape_at(self, at):
+        """Newest scrape taken at or before `at` (datetime or ISO string), or None."""
+        latest_name = scrape_name_at(at, EVENTS_TIME_ZONE)
+        candidates = []
+        try:
+            resp = self.es.search(index=MANIFEST_INDEX, body={
+                "size": 1,
+                "query": {"range": {"scrape": {"lte": latest_name}}},
+                "sort": [{"scrape": {"order": "desc"}}],
+                "_source": ["scrape"]
+            })
+            candidates += [hit["_source"]["scrape"] for hit in resp["hits"]["hits"]]
+        except es_exceptions.NotFoundError:
+            pass
+        # Snapshots from before manifests existed only show up as indices
+        candidates += [index for index in self.get_snapshot_indices() if index <= latest_name][-1:]
+        return max(candidates) if candidates else None
+
+    def state_at(self, at, source=None):
+        """
+        Every dog listed on the site as of `at`: the newest scrape at or before that
+        moment, rebuilt however it's stored (a full snapshot, a compacted index, or a
+        delta manifest over its month's keyframe). One manifest lookup plus one read
+        of that scrape, so the cost doesn't grow with history.
+
+        Returns:
+            {"at", "scrape", "dog_count", "dogs": [records sorted by id]} or None if
+            no scrape is that old.
+        """
+        scrape = self.find_scrape_at(at)
+        if scrape is None:
+            return None
+        dogs = self.get_scrape_view(scrape, source=source)
+        return {
+            "at": at if isinstance(at, str) else at.isoformat(),
+            "scrape": scrape,
+            "dog_count": len(dogs),
+            "dogs": [dogs[dog_id] for dog_id in sorted(dogs)]
+        }
+
+    def get_scrape_ids(self, scrape):
+        """Ids listed at one scrape, from its manifest when it has one."""
+        manifest = self.get_scrape_manifest(scrape) if SNAPSHOT_INDEX_PATTERN.match(scrape) else None
+        if manifest and manifest.get("dog_ids") is not None:
+            return list(manifest["dog_ids"])
+        return list(self.get_scrape_view(scrape, source=["id"]))
+
+    def get_scrape_id_sets(self, sidecar_path=None):
+        """
+        Return a ScrapeIdSets covering every scrape. Sets are cached in a sidecar
+        file, so only scrapes written since the last call are read from Elasticsearch.
+        Scrapes from before manifests existed get one written so this is a one-off.
+        """
+        sidecar_path = sidecar_path or os.getenv("DOG_ID_SETS_PATH", DEFAULT_SIDECAR_PATH)
+        id_sets = ScrapeIdSets.load(sidecar_path)
+        scrapes = self.list_scrapes()
+        missing = [scrape for scrape in scrapes if scrape not in id_sets]
+        if not missing:
+            return id_sets
+
+        manifests = {}
+        try:
+            for start in range(0, len(missing), 500):
+                resp = self.es.mget(index=MANIFEST_INDEX, ids=missing[start:start + 500], _source=["dog_ids"])
+                for doc in resp["docs"]:
+                    if doc.get("found") and doc["_source"].get("dog_ids") is not None:
+                        manifests[doc["_id"]] = doc["_source"]["dog_ids"]
+        except es_exceptions.NotFoundError:
+            pass
+
+        in_progress = None
+        for scrape in missing:
+            if scrape in manifests:
+                id_sets.add(scrape, manifests[scrape])
+                continue
+            view = self.get_scrape_view(scrape, source=["id", "timestamp"])
+            if scrape == scrapes[-1]:
+                # The manifest is written after the records, so the newest scrape may
+                # still be mid-ingest: use its ids now but don't cache or record them
+                in_progress = (scrape, view)
+                continue
+            id_sets.add(scrape, view)
+            try:
+                if self.es.indices.exists(index=scrape):
+                    self.write_scrape_manifest(build_manifest(scrape, FULL, list(view.values()), scrape))
+                else:
+                    self.es.update(index=MANIFEST_INDEX, id=scrape,
+                                   body={"doc": {"dog_ids": list(view), "dog_count": len(view)}})
+            except Exception as e:
+                print(f"Failed to record dog ids in manifest for {scrape}: {e}")
+
+        print(f"Loaded dog id sets for {len(missing)} new scrapes ({len(id_sets)} total)")
+        try:
+            id_sets.save(sidecar_path)
+        except OSError as e:
+            print(f"Failed to save id set sidecar {sidecar_path}: {e}")
+        if in_progress:
+            id_sets.add(*in_progress)
+        return id_sets
 
     def push_dog_to_elasticsearch(self, dog: Dog, index_name: str):
         doc = dog.to_dict()
         response = self.es.index(index=index_name, id=dog.id, document=doc)
         return response
 
+    def ensure_dog_state_index(self):
+        # Only rebuild_dog_state creates it: built from a single scrape it would lose
+        # every earlier dog and first sighting, and readers would stop falling back to snapshots
+        if not self.es.indices.exists(index=DOG_STATE_INDEX):
+            self.es.indices.create(index=DOG_STATE_INDEX, body=DOG_STATE_MAPPING)
+            print(f"Created index: {DOG_STATE_INDEX}")
+
+    def upsert_dog_state(self, dogs, index_name, listed=True, mark_delisted=True, storage_index=None,
+                         unchanged_ids=None, unchanged_rewritten=True):
+        """
+        Upsert one dog-state document per dog from a scrape written to index_name.
+
+        Args:
+            dogs: Dog objects (or dicts shaped like Dog.to_dict) from a single scrape.
+            index_name: The snapshot index (scrape name) the records were written to.
+            listed: Whether these dogs were on the site in this scrape.
+            mark_delisted: Flag dogs missing from this scrape as no longer listed.
+            storage_index: Physical index holding the records, when it isn't index_name (delta mode).
+            unchanged_ids: str ids whose content_hash matches their state; only their sighting
+                and volatile fields are updated.
+            unchanged_rewritten: Whether the unchanged dogs' records were written to storage this
+                scrape (full snapshots) or left where they were (delta / unchanged scrapes).
+
+        Does nothing until dog-state has been built by rebuild_dog_state.py.
+        """
+        if not self.es.indices.exists(index=DOG_STATE_INDEX):
+            print(f"{DOG_STATE_INDEX} hasn't been built yet; run rebuild_dog_state.py. Skipping the update for {index_name}")
+            return 0
+        unchanged_ids = unchanged_ids or set()
+
+        actions = []
+        current_ids = []
+        touched = {}
+        for dog in dogs:
+            record = dog.to_dict(include_attributes=False) if isinstance(dog, Dog) else dict(dog)
+            dog_id = record.get("id")
+            if dog_id is None:
+                continue
+            current_ids.append(dog_id)
+            seen = record.get("timestamp") or datetime.now(timezone.utc).isoformat()
+            if str(dog_id) in unchanged_ids:
+                touched[str(dog_id)] = {field: record[field] for field in VOLATILE_FIELDS if field in record}
+                continue
+            record["content_hash"] = content_hash(record)
+            actions.append({
+                "_op_type": "update",
+                "_index": DOG_STATE_INDEX,
+                "_id": str(dog_id),
+                "scripted_upsert": True,
+                "script": {
+                    "source": DOG_STATE_UPSERT_SCRIPT,
+                    "params": {
+                        "record": record, "index": index_name, "seen": seen, "listed": listed,
+                        "storage": storage_index or index_name
+                    }
+                },
+                "upsert": {}
+            })
+
+        if not current_ids:
+            return 0
+
+        if touched:
+            seen = next((v["timestamp"] for v in touched.values() if v.get("timestamp")),
+                        datetime.now(timezone.utc).isoformat())
+            self.es.update_by_query(
+                index=DOG_STATE_INDEX,
+                body={
+                    "script": {
+                        "source": DOG_STATE_TOUCH_SCRIPT,
+                        "lang": "painless",
+                        "params": {
+                            "index": index_name, "seen": seen, "listed": listed, "volatile": touched,
+                            "storage": (storage_index or index_name) if unchanged_rewritten else None
+                        }
+                    },
+                    "query": {"ids": {"values": list(touched)}}
+                },
+                conflicts="proceed",
+                refresh=not actions
+            )
+            print(f"Moved {len(touched)} unchanged dogs in {DOG_STATE_INDEX} forward to {index_name}")
+
+        success = len(touched)
+        if actions:
+            upserted, errors = helpers.bulk(self.es, actions, raise_on_error=False, refresh="wait_for")
+            if errors:
+                print(f"{len(errors)} dog-state upserts failed, first error: {errors[0]}")
+            print(f"Upserted {upserted} dogs into {DOG_STATE_INDEX} from {index_name}")
+            success += upserted
+
+        if mark_delisted:
+            # Anything still flagged as listed but absent from this scrape has left the site
+            self.es.update_by_query(
+                index=DOG_STATE_INDEX,
+                body={
+                    "script": {"source": "ctx._source.listed = false", "lang": "painless"},
+                    "query": {
+                        "bool": {
+                            "filter": [
+                                {"term": {"listed": True}},
+                                {"range": {"last_index": {"lt": index_name}}}
+                            ],
+                            "must_not": [{"terms": {"id": current_ids}}]
+                        }
+                    }
+                },
+                conflicts="proceed",
+                refresh=True
+            )
+        return success
+
+    def sync_dog_state(self, dog_id, index_name, fields):
+        """Mirror a correction made to a dog's latest snapshot document into dog-state."""
+        if str(fields.get("status", "")).lower() == "adopted":
+            self.record_adoption_event(dog_id, index_name, fields)
+        try:
+            self.es.update(
+                index=DOG_STATE_INDEX,
+                id=str(dog_id),
+                script={
+                    "source": DOG_STATE_SYNC_SCRIPT,
+                    "params": {"index": index_name, "fields": fields}
+                }
+            )
+        except es_exceptions.NotFoundError:
+            # No state yet for this dog (or the index hasn't been built); nothing to mirror
+            pass
+        except Exception as e:
+            print(f"Error syncing {DOG_STATE_INDEX} for dog {dog_id}: {e}")
+
+    def sync_dog_states(self, updates):
+        """
+        Bulk version of sync_dog_state.
+
+        Args:
+            updates: {dog_id: (index_name, fields)} of corrections already applied.
+        """
+        if not updates:
+            return
+        adopted = {
+            dog_id: update for dog_id, update in updates.items()
+            if str(update[1].get("status", "")).lower() == "adopted"
+        }
+        if adopted:
+            self.record_adoption_events(adopted)
+
+        actions = [
+            {"_op_type": "update", "_index": DOG_STATE_INDEX, "_id": str(dog_id),
+             "script": {"source": DOG_STATE_SYNC_SCRIPT, "params": {"index": index_name, "fields": fields}}}
+            for dog_id, (index_name, fields) in updates.items()
+        ]
+        try:
+            _, errors = helpers.bulk(self.es, actions, raise_on_error=False)
+        except Exception as e:
+            print(f"Error syncing {DOG_STATE_INDEX}: {e}")
+            return
+        # No state yet for a dog (or the index hasn't been built) just means nothing to mirror
+        errors = [error for error in errors if error.get("update", {}).get("status") != 404]
+        if errors:
+            print(f"{len(errors)} {DOG_STATE_INDEX} syncs failed, first error: {errors[0]}")
+
+    def ensure_dog_events_index(self):
+        if not self.es.indices.exists(index=DOG_EVENTS_INDEX):
+            self.es.indices.create(index=DOG_EVENTS_INDEX, body=DOG_EVENTS_MAPPING)
+            print(f"Created index: {DOG_EVENTS_INDEX}")
+
+    def write_events(self, events):
+        """Index event documents; ids are deterministic so re-running a scrape doesn't duplicate them."""
+        if not events:
+            return 0
+        self.ensure_dog_events_index()
+        actions = [
+            {"_op_type": "index", "_index": DOG_EVENTS_INDEX, "_id": event_doc_id(event), "_source": event}
+            for event in events
+        ]
+        success, errors = helpers.bulk(self.es, actions, raise_on_error=False, refresh="wait_for")
+        if errors:
+            print(f"{len(errors)} events failed to index, first error: {errors[0]}")
+        self._add_adoptions_to_dog_history([e["dog_id"] for e in events if e.get("event") == ADOPTED])
+        return success
+
+    def record_scrape_events(self, dogs, index_name, previous_states=None):
+        """
+        Compare a scrape with dog-state (before it's updated) and write the resulting
+        intake/delisted/trial_started/adopted/returned/relisted events.
+        """
+        if not self.es.indices.exists(index=DOG_STATE_INDEX):
+            # Without prior state every dog would look like an intake; rebuild_dog_state.py replays history instead
+            print(f"{DOG_STATE_INDEX} not built yet, skipping event detection for {index_name}")
+            return []
+
+        records = [
+            dog.to_dict(include_attributes=False) if isinstance(dog, Dog) else dict(dog)
+            for dog in dogs
+        ]
+        if previous_states is None:
+            previous_states = self.get_dog_states(
+                source=["id", "name", "status", "location", "listed", "last_index",
+                        "age_group", "origin", "url", "length_of_stay_days"]
+            )
+        # dog-state already reflects this (or a later) scrape, so its events were written then
+        latest_applied = max((state.get("last_index") or "" for state in previous_states.values()), default="")
+        if latest_applied >= index_name:
+            print(f"{DOG_STATE_INDEX} is already at {latest_applied}, skipping event detection for {index_name}")
+            return []
+
+        events = detect_events(previous_states, records, index_name)
+        self.write_events(events)
+        print(f"Recorded {len(events)} events for {index_name}")
+        return events
+
+    def record_adoption_event(self, dog_id, index_name, fields):
+        """Write an adopted event for a status correction, unless dog-state already had the dog as adopted."""
+        events = self.record_adoption_events({dog_id: (index_name, fields)})
+        return events[0] if events else None
+
+    def record_adoption_events(self, updates):
+        """
+        Write adopted events for {dog_id: (index_name, fields)} status corrections,
+        skipping dogs dog-state already had as adopted.
+        """
+        try:
+            if self.es.indices.exists(index=DOG_STATE_INDEX):
+                docs = self.es.mget(index=DOG_STATE_INDEX, body={"ids": [str(d) for d in updates]})["docs"]
+            else:
+                docs = []
+        except Exception as e:
+            print(f"Error reading {DOG_STATE_INDEX} for adoption events: {e}")
+            return []
+        states = {doc["_id"]: doc["_source"] for doc in docs if doc.get("found")}
+
+        now = datetime.now(timezone.utc).isoformat()
+        events = []
+        for dog_id, (index_name, fields) in updates.items():
+            state = states.get(str(dog_id), {"id": dog_id})
+            if str(state.get("status", "")).lower() == "adopted":
+                continue
+            record = {**state, **fields, "id": dog_id}
+            events.append(make_event(ADOPTED, record, index_name, now, previous=state))
+        try:
+            self.write_events(events)
+        except Exception as e:
+            print(f"Error recording adoption events for {len(events)} dogs: {e}")
+            return []
+        return events
+
+    def get_events(self, event_types=None, since=None, until=None, dog_ids=None, source=None):
+        """
+        Return events (oldest first) matching the given filters, or None if the
+        events index hasn't been built yet so callers can fall back to snapshot queries.
+
+        since/until accept anything an ES date range does, including date math like
+        "now/d" or "now-7d/d" (rounded in shelter local time).
+        """
+        try:
+            events = [
+                hit["_source"]
+                for hit in self._scan(
+                    index=DOG_EVENTS_INDEX,
+                    query=events_query(event_types, since, until, dog_ids),
+                    _source=source if source else True
+                )
+            ]
+        except es_exceptions.NotFoundError:
+            return None
+        return sort_events(events)
+
+    def rebuild_dog_state(self, with_events=True):
+        """
+        Build (or repair) dog-state from every existing scrape (full snapshot
+        indices and delta manifests), replaying them oldest-first to backfill
+        dog-events along the way. Safe to re-run: the upsert script ignores records
+        older than what's stored and event ids are deterministic.
+        """
+        snapshot_indices = self.list_scrapes()
+        if not snapshot_indices:
+            print("No animal-humane snapshot indices found")
+            return 0
+
+        self.ensure_dog_state_index()
+        full_indices = set(self.get_snapshot_indices())
+        states = {}
+        event_count = 0
+        for index in snapshot_indices:
+            records = list(self.get_scrape_view(index).values())
+            if with_events:
+                event_count += self.write_events(detect_events(states, records, index))
+                advance_states(states, records, index)
+            storage_index = None if index in full_indices else (self.get_scrape_manifest(index) or {}).get("storage_index")
+            self.upsert_dog_state(records, index, mark_delisted=False, storage_index=storage_index)
+
+        # Only dogs present in the newest snapshot are currently listed
+        latest = snapshot_indices[-1]
+        self.es.update_by_query(
+            index=DOG_STATE_INDEX,
+            body={
+                "script": {
+                    "source": "ctx._source.listed = ctx._source.last_index == params.latest",
+                    "lang": "painless",
+                    "params": {"latest": latest}
+                },
+                "query": {"match_all": {}}
+            },
+            conflicts="proceed",
+            refresh=True
+        )
+        print(f"Rebuilt {DOG_STATE_INDEX} from {len(snapshot_indices)} snapshot indices")
+        if with_events:
+            print(f"Replayed {event_count} events into {DOG_EVENTS_INDEX}")
+        return len(snapshot_indices)
+
+    def get_snapshot_indices(self):
+        """Return the animal-humane-YYYYMMDD-HHMM snapshot indices, oldest first."""
+        return self.index_catalog.snapshot_indices
+
+    def get_dog_states(self, query=None, source=None):
+        """
+        Return {dog_id: latest record} from dog-state.
+
+        Falls back to scanning animal-humane-* (most recent record per id) when
+        dog-state hasn't been built yet.
+        """
+        key = ("states", json.dumps(query, sort_keys=True), tuple(source or ()))
+        return self._session_cached(key, lambda: self._read_dog_states(query, source))
+
+    def _read_dog_states(self, query, source):
+        try:
+            states = {}
+            for hit in self._scan(
+                index=DOG_STATE_INDEX,
+                query={"query": query or {"match_all": {}}},
+                _source=source if source else True
+            ):
+                dog_data = hit["_source"]
+                if dog_data.get("id") is not None:
+                    states[str(dog_data["id"])] = dog_data
+            return states
+        except es_exceptions.NotFoundError:
+            print(f"{DOG_STATE_INDEX} not found, falling back to full snapshot scan (run rebuild_dog_state.py)")
+            return self._get_latest_records_from_snapshots(source)
+
+    def get_first_seen(self, dog_ids=None):
+        """
+        Return {str(dog_id): {"id", "name", "first_seen", "first_index"}} for the given
+        dogs (or every dog): when and in which scrape each was first listed.
+
+        dog-state maintains first_seen/first_index at ingest, so this is normally a
+        single read of it; before it's built, one composite aggregation over the
+        snapshots finds each dog's earliest record.
+        """
+        ids = [int(dog_id) for dog_id in dog_ids] if dog_ids is not None else None
+        if ids is not None and not ids:
+            return {}
+
+        if self.es.indices.exists(index=DOG_STATE_INDEX):
+            states = self.get_dog_states(
+                query={"terms": {"id": ids}} if ids is not None else None,
+                source=FIRST_SEEN_STATE_FIELDS
+            )
+            return first_seen_from_states(states)
+
+        body = first_seen_body(ids)
+        first_seen = {}
+        while True:
+            response = self.es.search(index="animal-humane-*", body=body)
+            agg = response["aggregations"]["dogs"]
+            collect_first_seen(agg["buckets"], first_seen)
+            if not agg["buckets"] or "after_key" not in agg:
+                break
+            body["aggs"]["dogs"]["composite"]["after"] = agg["after_key"]
+        return first_seen
+
+    def _get_latest_records_from_snapshots(self, source=None, index_pattern="animal-humane-*"):
+        # Fallback path: newest record per id worked out by Elasticsearch, one page of
+        # dogs at a time, instead of pulling every snapshot document into Python.
+        top_hit = {"size": 1, "sort": LATEST_FIRST_SORT}
+        if source:
+            top_hit["_source"] = source
+        body = {
+            "size": 0,
+            "query": {"exists": {"field": "id"}},
+            "aggs": {
+                "dogs": {
+                    "composite": {"size": 1000, "sources": [{"id": {"terms": {"field": "id"}}}]},
+                    "aggs": {"latest": {"top_hits": top_hit}}
+                }
+            }
+        }
+
+        dogs_by_id = {}
+        while True:
+            response = self.es.search(index=index_pattern, body=body)
+            agg = response["aggregations"]["dogs"]
+            for bucket in agg["buckets"]:
+                hits = bucket["latest"]["hits"]["hits"]
+                if hits:
+                    dogs_by_id[str(bucket["key"]["id"])] = hits[0]["_source"]
+            if not agg["buckets"] or "after_key" not in agg:
+                break
+            body["aggs"]["dogs"]["composite"]["after"] = agg["after_key"]
+        return dogs_by_id
+
+    def recent_docs(self, ids=None, fields=None, size=1, index_pattern="animal-humane-*"):
+        """
+        Return {dog_id: [LatestDoc, ...]}: up to `size` of each dog's newest documents,
+        newest first, for the given ids (or every dog).
+
+        Collapsing on id with an inner hit per dog does the "newest record" part in
+        Elasticsearch; pages of dogs are walked with search_after over a point in
+        time, so any number of ids takes one request per 1000 dogs.
+
+        Args:
+            fields: _source fields to return (None for everything, [] for none).
+        """
+        batches = id_batches(ids, LATEST_DOCS_PAGE_SIZE)
+        if not batches:
+            return {}
+        page_size = LATEST_DOCS_PAGE_SIZE
+
+        if isinstance(self.es, PitClient):
+            return self._session_recent_docs(batches, fields, size, page_size, index_pattern)
+
+        pit_id = self.es.open_point_in_time(index=index_pattern, keep_alive="1m")["id"]
+        docs = {}
+        try:
+            for batch in batches:
+                body = recent_docs_body(batch, fields, size, pit_id, page_size)
+                while True:
+                    resp = self.es.search(body=body)
+                    pit_id = resp.get("pit_id", pit_id)
+                    body["pit"]["id"] = pit_id
+                    hits = resp["hits"]["hits"]
+                    collect_recent_docs(hits, docs)
+                    if len(hits) < page_size:
+                        break
+                    body["search_after"] = hits[-1]["sort"]
+        finally:
+            try:
+                self.es.close_point_in_time(body={"id": pit_id})
+            except Exception as e:
+                print(f"Failed to close point in time: {e}")
+        return docs
+
+    def _session_recent_docs(self, batches, fields, size, page_size, index_pattern):
+        # Inside a read session: page over the session's point in time (PitClient adds it
+        # and the _index filter) so these reads agree with the session's other sections
+        docs = {}
+        for batch in batches:
+            body = recent_docs_body(batch, fields, size, None, page_size)
+            del body["pit"]
+            while True:
+                hits = self.es.search(index=index_pattern, body=body)["hits"]["hits"]
+                collect_recent_docs(hits, docs)
+                if len(hits) < page_size:
+                    break
+                body["search_after"] = hits[-1]["sort"]
+        return docs
+
+    def latest_docs(self, ids=None, fields=None, index_pattern="animal-humane-*"):
+        """Return {dog_id: LatestDoc(index, id, source)} for each dog's newest document."""
+        return {
+            dog_id: found[0]
+            for dog_id, found in self.recent_docs(ids, fields=fields, index_pattern=index_pattern).items()
+            if found
+        }
+
+    @contextmanager
+    def writable_snapshots(self, indices):
+        """
+        Lift the write block on the compacted indices among `indices` for the
+        duration of the block (see index_compaction.py), then put it back.
+
+        Yields {index: error} for compacted indices that couldn't be made
+        writable; writes to those would fail with cluster_block_exception.
+        """
+        compacted = sorted(index for index in indices if COMPACTED_INDEX_PATTERN.match(index))
+        lifted = []
+        blocked = {}
+        for index in compacted:
+            try:
+                self.es.indices.put_settings(index=index, body={"index.blocks.write": False})
+                lifted.append(index)
+            except Exception as e:
+                print(f"Error making {index} writable: {e}")
+                blocked[index] = str(e)
+        try:
+            yield blocked
+        finally:
+            for index in lifted:
+                try:
+                    self.es.indices.put_settings(index=index, body={"index.blocks.write": True})
+                except Exception as e:
+                    print(f"Error restoring the write block on {index}: {e}")
+
+    def apply_corrections(self, corrections, latest=None, max_retries=3):
+        """
+        Apply partial updates to dogs' latest snapshot documents in bulk.
+
+        Target documents are found with one latest_docs lookup and updated with
+        helpers.bulk; rejected (429) requests are retried with backoff and version
+        conflicts retried per item. Documents in compacted (read-only) indices are
+        written with the block lifted; if it can't be, those dogs are reported as
+        failed and the rest still go through. The corrections are then mirrored
+        into dog-state (and adopted events) the same way sync_dog_state does for a
+        single dog.
+
+        Args:
+            corrections: Iterable of (dog_id, partial_doc); several for one dog are merged.
+            latest: {dog_id: LatestDoc} the caller already looked up, if any.
+
+        Returns:
+            {"updated": {dog_id: (index, doc)}, "missing": [dog_id], "failed": {dog_id: error}}
+        """
+        merged = {}
+        for dog_id, doc in corrections:
+            if doc:
+                merged.setdefault(int(dog_id), {}).update(doc)
+        result = {"updated": {}, "missing": [], "failed": {}}
+        if not merged:
+            return result
+
+        if latest is None:
+            latest = self.latest_docs(merged, fields=[])
+        targets = {}
+        for dog_id in merged:
+            found = latest.get(dog_id)
+            if found is None:
+                result["missing"].append(dog_id)
+            else:
+                targets[(found.index, found.id)] = dog_id
+
+        with self.writable_snapshots({index for index, _ in targets}) as blocked:
+            # A compacted index that stayed read-only fails just its own dogs
+            for (index, doc_id), dog_id in list(targets.items()):
+                if index in blocked:
+                    result["failed"][dog_id] = blocked[index]
+                    print(f"Skipping correction for dog ID {dog_id}: {index} is read-only")
+                    del targets[(index, doc_id)]
+            actions = [
+                {"_op_type": "update", "_index": index, "_id": doc_id,
+                 "doc": merged[dog_id], "retry_on_conflict": max_retries}
+                for (index, doc_id), dog_id in targets.items()
+            ]
+            _, errors = helpers.bulk(
+                self.es, actions, raise_on_error=False, max_retries=max_retries, refresh="wait_for"
+            ) if actions else (0, [])
+        for error in errors:
+            item = error.get("update", {})
+            dog_id = targets.get((item.get("_index"), item.get("_id")))
+            if dog_id is not None:
+                result["failed"][dog_id] = item.get("error", item.get("status"))
+                print(f"Error updating dog ID {dog_id} in index {item.get('_index')}: {result['failed'][dog_id]}")
+
+        for (index, _), dog_id in targets.items():
+            if dog_id not in result["failed"]:
+                result["updated"][dog_id] = (index, merged[dog_id])
+        self.sync_dog_states(result["updated"])
+        return result
+
     def update_dogs(self, results):
         from shelterdog_tracker.shelter_scraper import ShelterScraper
         scraper = ShelterScraper()
-        for group_name in ['adopted_dogs', 'trial_adoption_dogs', 'other_unlisted_dogs']:
+        groups = ['adopted_dogs', 'trial_adoption_dogs', 'other_unlisted_dogs']
+        # Every dog's page is checked in one concurrent batch
+        locations = scraper.scrape_dog_locations(
+            [dog['url'] for group_name in groups for dog in results.get(group_name, []) if dog.get('url')]
+        )
+        corrections = []
+        names = {}
+        for group_name in groups:
             for dog in results.get(group_name, []):
-                index_pattern = "animal-humane-*"
                 dog_id = dog.get('dog_id')
                 url = dog.get('url', None)
 
                 if url:
-                    new_location = scraper.scrape_dog_location(url) or ''
+                    if url not in locations:
+                        print(f"Skipping dog {dog.get('name')}: couldn't read {url}")
+                        continue
+                    new_location = locations[url] or ''
                 else:
                     new_location = ''  # fallback if no URL is present
                 if group_name == 'adopted_dogs':
@@ -142,28 +1494,16 @@ class ElasticsearchHandler:
                 else:
                     doc_update = {"location": new_location}
 
-                query_body = {
-                    "query": {"term": {"id": dog_id}},
-                    "sort": [{"_index": {"order": "desc"}}]
-                }
-                response = self.es.search(index=index_pattern,body=query_body,size=1)
-                hits = response['hits']['hits']
+                if dog_id is not None:
+                    corrections.append((dog_id, doc_update))
+                    names[int(dog_id)] = dog.get('name')
 
-                if hits:
-                    hit = hits[0]
-                    index_name = hit['_index']
-                    document_id = hit['_id']
-
-                    update_response = self.es.update(
-                        index=index_name,
-                        id=document_id,
-                        body={
-                            "doc": doc_update   #{"location": new_location}
-                        }
-                    )
-                    print(f"Updated dog {dog.get('name')} in index {index_name}: {update_response}")
-                else:
-                    print(f"No documents found for dog {dog.get('name')} with dog_id {dog_id}")
+        # All the updates go out in one bulk request once every location is known
+        outcome = self.apply_corrections(corrections)
+        for dog_id, (index_name, doc_update) in outcome["updated"].items():
+            print(f"Updated dog {names.get(dog_id)} in index {index_name}: {doc_update}")
+        for dog_id in outcome["missing"]:
+            print(f"No documents found for dog {names.get(dog_id)} with dog_id {dog_id}")
 
     def update_metadata_from_location_info(self, dog_ids=None):
         """
@@ -204,59 +1544,53 @@ class ElasticsearchHandler:
 
         print(f"Updating metadata for {len(origin_lookup)} dogs from location_info.jsonl")
 
-        # Update each dog in Elasticsearch
-        index_pattern = "animal-humane-*"
-        updated_count = 0
+        # Find the most recent document for every dog at once
+        try:
+            latest = self.latest_docs(
+                origin_lookup, fields=["id", "bite_quarantine", "returned", "origin", "latitude", "longitude"]
+            )
+        except Exception as e:
+            print(f"Error finding latest documents: {e}")
+            return
 
+        # Work out each dog's changes, then send them all in one bulk request
+        corrections = []
         for dog_id, metadata in origin_lookup.items():
-            # Find the most recent document for this dog
-            query_body = {
-                "query": {"term": {"id": dog_id}},
-                "sort": [{"_index": {"order": "desc"}}],
-                "size": 1
-            }
-
-            try:
-                response = self.es.search(index=index_pattern, body=query_body)
-                hits = response['hits']['hits']
-
-                if hits:
-                    hit = hits[0]
-                    index_name = hit['_index']
-                    document_id = hit['_id']
-                    current_doc = hit['_source']
-
-                    # Prepare update document with metadata fields
-                    doc_update = {}
-
-                    # Only update if values are different or missing
-                    if current_doc.get('bite_quarantine', 0) != metadata['bite_quarantine']:
-                        doc_update['bite_quarantine'] = metadata['bite_quarantine']
-                    if current_doc.get('returned', 0) != metadata['returned']:
-                        doc_update['returned'] = metadata['returned']
-                    if current_doc.get('origin', 'Unknown') != metadata['origin']:
-                        doc_update['origin'] = metadata['origin']
-                    if metadata['latitude'] is not None and current_doc.get('latitude', 0) != metadata['latitude']:
-                        doc_update['latitude'] = metadata['latitude']
-                    if metadata['longitude'] is not None and current_doc.get('longitude', 0) != metadata['longitude']:
-                        doc_update['longitude'] = metadata['longitude']
-
-                    # Only update if there are changes
-                    if doc_update:
-                        update_response = self.es.update(
-                            index=index_name,
-                            id=document_id,
-                            body={"doc": doc_update}
-                        )
-                        print(f"Updated dog ID {dog_id} in index {index_name}: {doc_update}")
-                        updated_count += 1
-                    else:
-                        print(f"Dog ID {dog_id} already has correct metadata")
-                else:
-                    print(f"No documents found for dog ID {dog_id}")
+            found = latest.get(int(dog_id))
+            if not found:
+                print(f"No documents found for dog ID {dog_id}")
+                continue
+            current_doc = found.source
+
+            # Prepare update document with metadata fields
+            doc_update = {}
+
+            # Only update if values are different or missing
+            if current_doc.get('bite_quarantine', 0) != metadata['bite_quarantine']:
+                doc_update['bite_quarantine'] = metadata['bite_quarantine']
+            if current_doc.get('returned', 0) != metadata['returned']:
+                doc_update['returned'] = metadata['returned']
+            if current_doc.get('origin', 'Unknown') != metadata['origin']:
+                doc_update['origin'] = metadata['origin']
+            if metadata['latitude'] is not None and current_doc.get('latitude', 0) != metadata['latitude']:
+                doc_update['latitude'] = metadata['latitude']
+            if metadata['longitude'] is not None and current_doc.get('longitude', 0) != metadata['longitude']:
+                doc_update['longitude'] = metadata['longitude']
+
+            # Only update if there are changes
+            if doc_update:
+                corrections.append((dog_id, doc_update))
+            else:
+                print(f"Dog ID {dog_id} already has correct metadata")
 
-            except Exception as e:
-                print(f"Error updating dog ID {dog_id}: {e}")
+        try:
+            outcome = self.apply_corrections(corrections, latest=latest)
+        except Exception as e:
+            print(f"Error updating metadata: {e}")
+            return
+        for dog_id, (index_name, doc_update) in outcome["updated"].items():
+            print(f"Updated dog ID {dog_id} in index {index_name}: {doc_update}")
+        updated_count = len(outcome["updated"])
 
         print(f"Metadata update complete. Updated {updated_count} documents.")
 
@@ -312,7 +1646,7 @@ class ElasticsearchHandler:
 
     def get_docs_by_key(self, index, key_field):
         docs = {}
-        for doc in scan(self.es, index=index, query={"query": {"match_all": {}}}):
+        for doc in self._scan(index=index, query={"query": {"match_all": {}}}):
             key = doc['_source'][key_field]
             docs[key] = doc['_source']
         return docs
@@ -344,17 +1678,22 @@ class ElasticsearchHandler:
 
     def update_dog_fields(self, index_to_update, dog_id, fields_to_update):
         #print(f"{index_to_update} will be updated with {fields_to_update} for dog {dog_id}")
-        self.es.update(
-            index=index_to_update,
-            id=dog_id,
-            doc=fields_to_update
-        )
+        with self.writable_snapshots([index_to_update]) as blocked:
+            if blocked:
+                print(f"Skipping update for dog ID {dog_id}: {index_to_update} is read-only")
+                return
+            self.es.update(
+                index=index_to_update,
+                id=dog_id,
+                doc=fields_to_update
+            )
+        self.sync_dog_state(dog_id, index_to_update, fields_to_update)
         print(f"******************  updated doc  ******************")
         self.get_dog_by_id(dog_id)
 
     #This function gets dog by id from Elastic.
     def get_dog_by_id(self, dog_id):
-        body = {"query":{"match":{"id":dog_id}},"sort":{"_index":{"order":"desc"}}}
+        body = {"query":{"match":{"id":dog_id}},"sort":LATEST_FIRST_SORT}
         response = self.es.search(index="animal-humane-*", body=body, size=1)
         hits = response.get("hits",{}).get("hits",[])
         if hits:
@@ -403,76 +1742,16 @@ class ElasticsearchHandler:
         pass
 
     def get_current_availables(self):
-        # This returns ALL available dogs from recent indices, not just recent ones
-        # Modified to avoid aggregation issues with mixed field types by using direct query
-
-        # Query all indices to get complete picture, avoiding mixed type issues by processing in Python
-        try:
-            # Use all animal-humane indices but sort by recency for deduplication
-            index_pattern = "animal-humane-*"
-        except Exception as e:
-            print(f"Error getting indices, falling back to wildcard: {e}")
-            index_pattern = "animal-humane-*"
-
-        # Use a simpler query without aggregations to avoid mixed type issues
-        query = {
-            "size": 10000,  # Get up to 10k documents
-            "sort": [{"_index": {"order": "desc"}}],  # Sort by index name (most recent first)
-            "_source": ["id", "name", "url", "status", "location", "origin", "intake_date", "length_of_stay_days", "birthdate", "age_group", "breed", "secondary_breed", "weight_group", "color", "bite_quarantine", "returned", "latitude", "longitude"],
-            "query": {
-                "match_all": {}  # Get all dogs from recent indices
-            }
-        }
-
-        # Run the search on recent indices only
-        response = self.es.search(index=index_pattern, body=query)
-
-        # Process results to get unique dogs (most recent record for each ID)
-        dogs_by_id = {}
-        for hit in response['hits']['hits']:
-            dog_data = hit['_source']
-            dog_id = str(dog_data['id'])  # Ensure ID is string for consistency
-
-            # Keep the most recent record for each dog (first in sorted results)
-            if dog_id not in dogs_by_id:
-                dogs_by_id[dog_id] = {
-                    "name": dog_data.get("name"),
-                    "dog_id": dog_data.get("id"),
-                    "url": dog_data.get("url"),
-                    "location": dog_data.get("location"),
-                    "origin": dog_data.get("origin"),
-                    "status": dog_data.get("status"),  # Make sure status is included
-                    "intake_date": dog_data.get("intake_date"),
-                    "length_of_stay_days": dog_data.get("length_of_stay_days"),
-                    "birthdate": dog_data.get("birthdate"),
-                    "age_group": dog_data.get("age_group"),
-                    "breed": dog_data.get("breed"),
-                    "secondary_breed": dog_data.get("secondary_breed"),
-                    "weight_group": dog_data.get("weight_group"),
-                    "color": dog_data.get("color"),
-                    "bite_quarantine": dog_data.get("bite_quarantine"),
-                    "returned": dog_data.get("returned"),
-                    "latitude": dog_data.get("latitude"),
-                    "longitude": dog_data.get("longitude")
-                }
-
-        # Filter for dogs with status "Available" from their most recent record
-        available_dogs = [
-            dog for dog in dogs_by_id.values() 
-            if dog.get("status") == "Available"  # Only include dogs currently available
-        ]
+        # This returns ALL available dogs (latest record per dog), not just those in the latest scrape.
+        # Reads one document per dog from dog-state rather than every snapshot of every dog.
+        states = self.get_dog_states(query={"term": {"status": "Available"}}, source=AVAILABLE_DOG_FIELDS)
 
         # Return list of unique available dogs
-        return available_dogs
+        return available_dogs_from_states(states)
 
     def get_all_ids(self, index_name):
-        ids = []
-        # Use scan helper for efficient iteration through all docs
-        for hit in helpers.scan(self.es, index=index_name, query={"query": {"match_all": {}}}, _source=["id"]):
-            id_value = hit['_source'].get('id')
-            if id_value is not None:
-                ids.append(id_value)
-        return ids
+        # Scrapes record their ids in a manifest at ingest; only ones without get scanned
+        return self.get_scrape_ids(index_name)
 
     def get_unlisted_availables(self, availables, most_recent_index):
         index_ids = self.get_all_ids(most_recent_index)
@@ -489,99 +1768,54 @@ class ElasticsearchHandler:
         return unmatched_dogs
 
     def get_most_recent_index(self):
+        # The newest scrape, however it's stored: delta and unchanged scrapes have no
+        # index of their own, so read it with get_scrape_view / get_scrape_ids
         try:
-            resp = self.es.cat.indices(format="json")
-
-            # Extract index names (filtering for your pattern, if desired)
-            indices = [item["index"] for item in resp if item["index"].startswith("animal-humane-")]
-
-            if not indices:
-                print("No animal-humane indices found")
-                return None
-
-            pattern = re.compile(r'animal-humane-(\d{8})-(\d{4})')
-
-            # Build a list of tuples: (datetime-str, index-name)
-            index_dates = []
-            for index in indices:
-                match = pattern.match(index)
-                if match:
-                    dt_str = match.group(1) + match.group(2)  # 'YYYYMMDDHHMM'
-                    index_dates.append((dt_str, index))
-
-            if not index_dates:
+            most_recent = self.index_catalog.latest_scrape()
+            if most_recent is None:
                 print("No valid animal-humane indices found with proper date format")
                 return None
-
-            # Sort by datetime string
-            most_recent = max(index_dates)[1]
             print(f"Most recent index: {most_recent}")
             return most_recent
         except Exception as e:
             print(f"Error getting most recent index: {e}")
             return None
+
     def get_new_dogs(self):
-        indices_info = self.es.cat.indices(format='json')
-        all_indices = [index['index'] for index in indices_info if index.get('status') == 'open']
+        id_sets = self.get_scrape_id_sets()
 
         # Get today's date in YYYYMMDD format
         current_date = datetime.now().strftime('%Y%m%d')
-        indices_today = [idx for idx in all_indices if f"-{current_date}-" in idx]
+        today_start = day_start(current_date)
+        indices_today = [scrape for scrape in id_sets.scrapes if scrape >= today_start]
         print(f"[DEBUG] Indices for today ({current_date}): {indices_today}")
 
-        # Get all unique ids from 'indices_today'
-        unique_ids_today = set()
-        for doc in scan(self.es, index=indices_today, query={"_source":False}):
-            unique_ids_today.add(doc['_id'])
-        print(f"[DEBUG] Unique IDs in today's indices: {unique_ids_today}")
-
-        # Exclude system indices and today's indices
-        indices_not_today = [
-            idx for idx in all_indices
-            if not idx.startswith('.') and f"-{current_date}-" not in idx
-        ]
-        print(f"[DEBUG] Indices NOT today: {indices_not_today}")
-
-        # Retrieve all unique _id values from each index (or all at once)
-        previous_unique_ids = set()
-        for idx in indices_not_today:
-            for doc in scan(self.es, index=idx, query={"_source": False}):
-                previous_unique_ids.add(doc['_id'])
-        print(f"[DEBUG] Unique IDs in previous indices: {previous_unique_ids}")
+        # Dogs listed today that no earlier scrape (compacted or not) listed
+        unique_ids_today = id_sets.union(start=today_start)
+        previous_unique_ids = id_sets.union(end=today_start)
+        print(f"[DEBUG] {len(unique_ids_today)} unique IDs today, {len(previous_unique_ids)} in earlier scrapes")
 
-        new_ids_today = unique_ids_today - previous_unique_ids
+        new_ids_today = {str(dog_id) for dog_id in difference(unique_ids_today, previous_unique_ids)}
         print(f"[DEBUG] New IDs today (should be reported as new dogs): {new_ids_today}")
 
+        # One terms lookup for every new dog's name (and when it was first listed)
+        first_seen = self.get_first_seen(new_ids_today) if new_ids_today else {}
+
         #Put new dogs in the format expected by the output_utils.py
         new_dogs_list = []
-        for doc_id in new_ids_today:
-            resp = self.es.search(
-                index=indices_today,
-                body={"query": {"ids": {"values": [doc_id]}} ,"_source": ["name"]}
-            )
-            hits = resp.get('hits', {}).get('hits', [])
-            if hits:
-                doc = hits[0]
-                source = doc.get('_source', {})
-                dog_name = source.get('name')
-
-                if dog_name:
-                    new_dogs_list.append({
-                        "name": dog_name,
-                        "url": f"https://new.shelterluv.com/embed/animal/{doc_id}"
-                    })
-                else:
-                    # Handle missing name field gracefully if needed
-                    new_dogs_list.append({
-                        "name": "(no name found)",
-                        "url": f"https://new.shelterluv.com/embed/animal/{doc_id}"
-                    })
-            else:
+        for doc_id in sorted(new_ids_today, key=int):
+            seen = first_seen.get(doc_id)
+            if seen is None:
                 # Handle missing document gracefully if needed
-                new_dogs_list.append({
-                    "name": "(document not found)",
-                    "url": f"https://new.shelterluv.com/embed/animal/{doc_id}"
-                })
+                dog_name = "(document not found)"
+            else:
+                # Handle missing name field gracefully if needed
+                dog_name = seen.get("name") or "(no name found)"
+            new_dogs_list.append({
+                "name": dog_name,
+                "url": f"https://new.shelterluv.com/embed/animal/{doc_id}",
+                "first_seen": seen.get("first_seen") if seen else None
+            })
         result = {"new_dogs": new_dogs_list}
         print(f"[DEBUG] Final new_dogs_list: {new_dogs_list}")
         return result
@@ -590,76 +1824,54 @@ class ElasticsearchHandler:
         """
         Returns a set of unique IDs from all provided indices.
 
-        :param es: Elasticsearch client instance
-        :param index_names: List of Elasticsearch index names
-        :param id_field: The field name to extract (default 'dog_id')
+        :param index_names: List of scrape (or other) index names
+        :param id_field: Unused; kept for existing callers
         :return: Set of unique IDs
         """
-        unique_ids = set()
         print(f"Index names passed to gather_unique_ids: {index_names}")
+        id_sets = self.get_scrape_id_sets()
+        unique_ids = {int(dog_id) for dog_id in id_sets.union_of(index_names)}
         for index in index_names:
-            # Use a query that gets only the ID field for efficiency
-            resp = self.es.search(
-                index=index,
-                size=1000,  # adjust size if you expect more docs; for >10k use scroll API
-                _source=False,
-                fields=[id],
-                body={
-                    "query": { "match_all": {} }
-                }
-            )
-            hits = resp.get('hits', {}).get('hits', [])
-            for hit in hits:
-                # Try both 'fields' and fallback to '_source' if needed
-                id_value = None
-                if 'fields' in hit and id in hit['fields']:
-                    id_value = hit['fields'][id][0]
-                elif '_source' in hit and id in hit['_source']:
-                    id_value = hit['_source'][id]
-                if id_value is not None:
-                    unique_ids.add(id_value)
+            if index not in id_sets:
+                unique_ids.update(int(dog_id) for dog_id in self.get_all_ids(index))
         return unique_ids
     #TODO: Finish the get_unlisted_dogs function
     def get_unlisted_dogs(self):
         #Unlisted dogs are those that are not on the site and have a non-empty location.
-        #Retrieve all unique ids where status is not "adopted"
+        #Latest record of every dog listed today (however today's scrapes were stored) with a location
         current_date = datetime.now().strftime("%Y%m%d")
-        index_pattern = f"animal-humane-{current_date}-*"
-        query = {
-            "size": 0,
-            "aggs": {
-                "unique_dogs": {
-                    "terms": {
-                        "field": "id",
-                        "size": 1000
-                    },
-                    "aggs": {
-                        "latest_doc": {
-                            "top_hits": {
-                                "size": 1,
-                                "sort": [{"_index": {"order": "desc"}}],
-                                "_source": ["name", "id"]
-                            }
-                        }
-                    }
-                }
-            },
-            "query": {
-                "bool": {
-                    "must_not": [{"term": {"location": ""}}]
-                }
-            }
-        }
-        response = self.es.search(index=index_pattern, body=query, size=100)
         #This gets you all the available dogs. You still need to compare with dogs on the site
-        dogs = []
-        if "aggregations" in response:
-            for bucket in response["aggregations"]["unique_dogs"]["buckets"]:
-                hits = bucket["latest_doc"]["hits"]["hits"]
-                if hits:
-                    source = hits[0]["_source"]
-                    dogs.append(source)
-        return dogs
+        return [
+            {"name": source.get("name"), "id": source["id"]}
+            for source in self.get_listed_on(current_date, ["name", "id", "location"])
+            if source.get("location") != ""
+        ]
+
+    def latest_scrape_name(self, most_recent_index=None):
+        """
+        The newest scrape on record. Unchanged and delta scrapes (see snapshot_delta)
+        don't get an index of their own, so this can be newer than the newest
+        animal-humane-YYYYMMDD-HHMM index; most_recent_index is the fallback.
+        """
+        try:
+            latest = self.index_catalog.latest_scrape()
+        except Exception as e:
+            print(f"Error getting latest scrape: {e}")
+            latest = None
+        candidates = [name for name in (latest, most_recent_index) if name and SNAPSHOT_INDEX_PATTERN.match(name)]
+        return max(candidates) if candidates else most_recent_index
+
+    def get_listed_on(self, day, fields=None):
+        """
+        Latest record of every dog listed at any scrape on `day` (YYYYMMDD). Ids come
+        from the scrapes' id sets, so days whose scrapes wrote no index are covered.
+        """
+        next_day = datetime.strptime(day, "%Y%m%d") + timedelta(days=1)
+        listed = self.get_scrape_id_sets().union(start=day_start(day), end=day_start(next_day))
+        if not len(listed):
+            return []
+        docs = self.latest_docs([int(dog_id) for dog_id in listed], fields=fields)
+        return [doc.source for _, doc in sorted(docs.items())]
 
     def get_current_listed_count(self):
         #current count includes all unique ids for the day + unlisted but available dogs
@@ -684,7 +1896,7 @@ class ElasticsearchHandler:
 
         query_today = {"query":{"range":{"timestamp":{"gte":today_start_str,"lte": now_str}}},"_source":["id","status"]}
 
-        for doc in scan(self.es, index="animal-humane-*", query=query_today):
+        for doc in self._scan(index="animal-humane-*", query=query_today):
             src = doc["_source"]
             dog_id = src.get("id")
             if dog_id:
@@ -707,7 +1919,7 @@ class ElasticsearchHandler:
         unique_ids_yesterday = set()
         adopted_ids_yesterday = set()
 
-        for doc in scan(self.es, index="animal-humane-*", query=query_yesterday):
+        for doc in self._scan(index="animal-humane-*", query=query_yesterday):
             src = doc["_source"]
             dog_id = src.get("id")
             if dog_id:
@@ -739,19 +1951,7 @@ class ElasticsearchHandler:
     def get_unique_ids_from_indices(self,indices):
         if not indices:
             return set()
-        body = {
-            "size": 0,
-            "aggs": {
-                "all_ids": {
-                    "terms": {
-                        "field": "id",
-                        "size": 100000  # adjust as needed
-                    }
-                }
-            }
-        }
-        resp = self.es.search(index=",".join(indices), body=body)
-        return set(bucket["key"] for bucket in resp["aggregations"]["all_ids"]["buckets"])
+        return self.gather_unique_ids(indices)
 
     def get_new_dog_count_this_week(self):
         """
@@ -765,20 +1965,27 @@ class ElasticsearchHandler:
             # Get indices from the last 7 days
             cutoff_date = seven_days_ago.strftime("%Y%m%d")
 
-            # Get all indices and filter for recent ones
-            indices_response = self.es.cat.indices(index="animal-humane-*", format="json")
-            all_indices = [idx['index'] for idx in indices_response]
+            # Scrape indices from the last 7 days, plus the compacted ones that may hold some
+            catalog = self.index_catalog
+            recent_indices = catalog.snapshot_indices_between(start=datetime.strptime(cutoff_date, "%Y%m%d"))
+            compacted_indices = catalog.compacted_indices
 
-            # Filter for indices from the last 7 days
-            recent_indices = []
-            for index in all_indices:
-                try:
-                    # Extract date from index name (animal-humane-YYYYMMDD-...)
-                    date_str = index.split('-')[2]  # YYYYMMDD
-                    if date_str >= cutoff_date:
-                        recent_indices.append(index)
-                except:
-                    continue
+            # Compacted indices can hold recent scrapes; their documents say which scrape they came from
+            recent_query = {"terms": {"_index": recent_indices}}
+            if compacted_indices:
+                recent_query = {
+                    "bool": {
+                        "should": [
+                            recent_query,
+                            {"bool": {"filter": [
+                                {"terms": {"_index": compacted_indices}},
+                                {"range": {"scrape.keyword": {"gte": f"animal-humane-{cutoff_date}"}}}
+                            ]}}
+                        ],
+                        "minimum_should_match": 1
+                    }
+                }
+                recent_indices = recent_indices + compacted_indices
 
             if not recent_indices:
                 return []
@@ -788,7 +1995,7 @@ class ElasticsearchHandler:
             # Query for all dogs in recent indices with aggregation to get names
             query = {
                 "size": 0,
-                "query": {"match_all": {}},
+                "query": recent_query,
                 "aggs": {
                     "unique_dogs": {
                         "terms": {
@@ -827,8 +2034,8 @@ class ElasticsearchHandler:
 
     def get_new_dog_count_this_week_accurate(self):
         """
-        Return the count of dogs that first appeared in the last 7 days.
-        This checks each current dog's first appearance date by finding their earliest index.
+        Return the names of current dogs that first appeared in the last 7 days
+        (from intake events, or each dog's first_seen scrape without them).
         """
         now = datetime.utcnow().replace(microsecond=0)
         seven_days_ago = now - timedelta(days=7)
@@ -841,37 +2048,23 @@ class ElasticsearchHandler:
             current_dogs = self.get_current_availables()
             current_dog_ids = set(dog.get('dog_id') for dog in current_dogs if dog.get('dog_id'))
 
-            new_dog_count = 0
-            new_dog_names = []
-
-            for dog_id in current_dog_ids:
-                try:
-                    # Query for this dog's earliest appearance
-                    query = {
-                        "query": {"match": {"id": dog_id}},
-                        "size": 1,
-                        "_source": ["name"],
-                        "sort": [{"_index": {"order": "asc"}}]
-                    }
-
-                    resp = self.es.search(index="animal-humane-*", body=query, request_timeout=10)
-
-                    if resp["hits"]["hits"]:
-                        earliest_index = resp["hits"]["hits"][0]["_index"]
-                        dog_name = resp["hits"]["hits"][0]["_source"].get("name", f"ID:{dog_id}")
-
-                        # Extract date from index name (animal-humane-YYYYMMDD-...)
-                        try:
-                            date_str = earliest_index.split('-')[2]  # YYYYMMDD
-                            if date_str >= cutoff_date:
-                                new_dog_count += 1
-                                new_dog_names.append(dog_name)
-                        except:
-                            continue
+            # A dog's first appearance is its intake event
+            intakes = self.get_events(event_types=[INTAKE], since="now-7d/d", source=["dog_id", "name"])
+            if intakes is not None:
+                new_dog_names = [
+                    event.get("name") or f"ID:{event['dog_id']}"
+                    for event in intakes if event.get("dog_id") in current_dog_ids
+                ]
+                print(f"Found {len(new_dog_names)} dogs that first appeared on or after {seven_days_ago.date()}")
+                return sorted(new_dog_names)
 
-                except Exception as e:
-                    print(f"Error checking dog {dog_id}: {e}")
-                    continue
+            new_dog_names = []
+            for dog_id, seen in self.get_first_seen(current_dog_ids).items():
+                # The scrape name, not the (possibly compacted) index it's stored in
+                match = SNAPSHOT_INDEX_PATTERN.match(seen.get("first_index") or "")
+                if match and match.group(1) >= cutoff_date:
+                    new_dog_names.append(seen.get("name") or f"ID:{dog_id}")
+            new_dog_count = len(new_dog_names)
 
             print(f"Found {new_dog_count} dogs that first appeared on or after {seven_days_ago.date()}")
             return sorted(new_dog_names)
@@ -898,10 +2091,19 @@ class ElasticsearchHandler:
         adopted_los = []
 
         try:
-            resp = self.es.search( index="animal-humane-*", body=query_body, request_timeout=30)
+            adoptions = self.get_events(
+                event_types=[ADOPTED],
+                since=seven_days_ago.isoformat(),
+                until=now.isoformat(),
+                source=["dog_id", "name", "url", "length_of_stay_days", "timestamp"]
+            )
+            if adoptions is not None:
+                sources = [{**event, "id": event.get("dog_id")} for event in adoptions]
+            else:
+                resp = self.es.search( index="animal-humane-*", body=query_body, request_timeout=30)
+                sources = [hit.get("_source", {}) for hit in resp["hits"]["hits"]]
 
-            for hit in resp["hits"]["hits"]:
-                source = hit.get("_source", {})
+            for source in sources:
                 dog_id = source.get("id")
 
                 # Ensure each unique dog only appears once
@@ -923,121 +2125,106 @@ class ElasticsearchHandler:
         #For all dogs with "status":"adopted", calculate the average length of
         #stay.
 
-        query_body = {"size":0,"query":{"term":{"status.keyword":"adopted"}},"aggs": {"by_id": {"terms": {"field": "id","size": 100},"aggs": {"most_recent": {"top_hits":{"size":1,"sort":[{"_index":{"order":"desc"}}],"_source": ["id", "length_of_stay_days", "status"]}}}}}}
-
-        res = self.es.search(index="animal-humane-*", body=query_body)
-        total_los = 0
-        count = 0
-        for bucket in res["aggregations"]["by_id"]["buckets"]:
-            doc = bucket["most_recent"]["hits"]["hits"][0]["_source"]
-            los = doc.get("length_of_stay_days")
-            if los is not None:
-                total_los += los
-                count += 1
-        average_los = (total_los / count) if count > 0 else 0
+        res = self.es.search(index="animal-humane-*", body=AVG_LENGTH_OF_STAY_QUERY)
+        average_los, count = average_length_of_stay(res)
         print(f"Average length_of_stay_days for adopted dogs: {average_los:.2f} days based on {count} dogs")
         return round(average_los)
 
     def has_been_seen_before(self, dog_id: str) -> bool:
-        # Only check indices from the last 3 months to avoid excessive queries
-        # Use a simpler query that just checks if the dog exists in historical data
-        from datetime import datetime, timedelta
-        three_months_ago = datetime.now() - timedelta(days=90)
-        date_pattern = three_months_ago.strftime('%Y%m%d')
-
-        # Use index pattern for recent indices only (current year)
-        current_year = datetime.now().strftime('%Y')
-        index_pattern = f"animal-humane-{current_year}*"
-        query = {
-            "size": 0,
-            "query": {
-                "bool": {
-                    "must": [
-                        {"range": {"timestamp": {"lt": "now/d"}}},
-                        {"term": {"id": dog_id}}
-                    ]
-                }
-            }
-        }
-
+        """Whether the dog was listed at any scrape before today (see dog_history)."""
         try:
-            response = self.es.search(index=index_pattern, body=query)
-            total_hits = response.get("hits", {}).get("total", {}).get("value", 0)
-            return total_hits > 0
+            return self.get_dog_history().seen_before(dog_id, datetime.now())
         except Exception as e:
             print(f"Error checking if dog {dog_id} has been seen before: {e}")
             return False
 
     def get_returned_dogs(self, availables, most_recent_index):
+        """
+        Available dogs adopted before today whose first Available record after that
+        adoption is from today. One aggregation over every available id returns each
+        dog's first adoption and the days it had Available records (with the last
+        such record per day), so the timeline is worked out without a search per dog.
+        """
         # Extract current date from most_recent_index (e.g., "20251227" from "animal-humane-20251227-1500")
-        import re
         date_match = re.search(r'animal-humane-(\d{8})-', most_recent_index)
         if not date_match:
             # Fallback if date extraction fails
             return []
         current_date = date_match.group(1)
-        # Convert to YYYY-MM-DD format for timestamp comparison
+        # Convert to YYYY-MM-DD format for comparison with the day buckets
         formatted_today = f"{current_date[:4]}-{current_date[4:6]}-{current_date[6:]}"
+        shelter_tz = pytz.timezone(EVENTS_TIME_ZONE)
 
+        availables_by_id = {int(d['dog_id']): d for d in availables if d.get('dog_id') is not None}
+        ids = list(availables_by_id)
         returned_dogs = []
-
-        # For each available dog, check if they were previously adopted AND returned today
-        for available_dog in availables:
-            dog_id = available_dog['dog_id']
-
-            # First check if this dog has "status":"adopted" in historical indices (before today)
-            historical_query = {
-                "query": {
-                    "bool": {
-                        "must": [
-                            {"term": {"id": dog_id}},
-                            {"term": {"status": "adopted"}},
-                            {"range": {"timestamp": {"lt": formatted_today}}}  # Before today
-                        ]
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            body = {
+                "size": 0,
+                "query": {"terms": {"id": batch}},
+                "aggs": {
+                    "dogs": {
+                        "terms": {"field": "id", "size": len(batch)},
+                        "aggs": {
+                            "adopted": {
+                                "filter": {"term": {"status.keyword": "adopted"}},
+                                "aggs": {"first": {"min": {"field": "timestamp"}}}
+                            },
+                            "ever_adopted": {
+                                "bucket_selector": {
+                                    "buckets_path": {"adoptions": "adopted._count"},
+                                    "script": "params.adoptions > 0"
+                                }
+                            },
+                            "available": {
+                                "filter": {"term": {"status.keyword": "Available"}},
+                                "aggs": {
+                                    "days": {
+                                        "date_histogram": {
+                                            "field": "timestamp",
+                                            "calendar_interval": "day",
+                                            "format": "yyyy-MM-dd",
+                                            "time_zone": EVENTS_TIME_ZONE,
+                                            "min_doc_count": 1
+                                        },
+                                        "aggs": {"last": {"max": {"field": "timestamp"}}}
+                                    }
+                                }
+                            }
+                        }
                     }
-                },
-                "_source": ["name", "id", "status", "timestamp"]
+                }
             }
-
             try:
-                response = self.es.search(index="animal-humane-*", body=historical_query)
-                if response['hits']['total']['value'] > 0:
-                    # This dog was previously adopted, now check if they returned TODAY
-                    # Get all records for this dog to find the return date
-                    all_records_query = {
-                        "query": {"term": {"id": dog_id}},
-                        "_source": ["status", "timestamp"],
-                        "sort": [{"timestamp": {"order": "asc"}}],
-                        "size": 1000
-                    }
-                    all_response = self.es.search(index="animal-humane-*", body=all_records_query)
-
-                    # Find the return date (first "Available" status after adoption)
-                    adoption_found = False
-                    return_date = None
-
-                    for record in all_response['hits']['hits']:
-                        status = record['_source'].get('status')
-                        timestamp = record['_source'].get('timestamp')
-
-                        if status == 'adopted':
-                            adoption_found = True
-                        elif status == 'Available' and adoption_found and not return_date:
-                            # This is the return date
-                            return_date = timestamp[:10] if timestamp else None  # YYYY-MM-DD
-                            break
-
-                    # Only include if the return date is today
-                    if return_date == formatted_today:
-                        returned_dogs.append({
-                            'name': available_dog.get('name', 'Unknown'),
-                            'dog_id': dog_id,
-                            'url': available_dog.get('url', ''),
-                            'location': available_dog.get('location', '')
-                        })
-
+                response = self.es.search(index="animal-humane-*", body=body)
             except Exception as e:
-                print(f"Error checking returned dog {dog_id}: {e}")
+                print(f"Error checking returned dogs: {e}")
+                continue
+
+            for bucket in response["aggregations"]["dogs"]["buckets"]:
+                first_adopted = bucket["adopted"]["first"]["value"]
+                if first_adopted is None:
+                    continue
+                adopted_day = datetime.fromtimestamp(first_adopted / 1000, tz=timezone.utc).astimezone(shelter_tz)
+                # Only dogs whose adoption predates today
+                if adopted_day.strftime("%Y-%m-%d") >= formatted_today:
+                    continue
+
+                # The return is the first day with an Available record after the adoption
+                return_date = next(
+                    (day["key_as_string"] for day in bucket["available"]["days"]["buckets"]
+                     if day["last"]["value"] is not None and day["last"]["value"] > first_adopted),
+                    None
+                )
+                if return_date == formatted_today:
+                    available_dog = availables_by_id[int(bucket["key"])]
+                    returned_dogs.append({
+                        'name': available_dog.get('name', 'Unknown'),
+                        'dog_id': available_dog['dog_id'],
+                        'url': available_dog.get('url', ''),
+                        'location': available_dog.get('location', '')
+                    })
 
         return returned_dogs
 
@@ -1048,8 +2235,11 @@ class ElasticsearchHandler:
         # For diff analysis, use existing location data instead of scraping
         # to avoid seleniumwire dependency
 
+        # Scrapes where nothing changed write no index, so "today" comes from the
+        # newest scrape on record rather than the newest physical index
+        most_recent_index = self.latest_scrape_name(most_recent_index)
+
         # Extract current date from most_recent_index (e.g., "20251227" from "animal-humane-20251227-1500")
-        import re
         date_match = re.search(r'animal-humane-(\d{8})-', most_recent_index)
         if not date_match:
             # Fallback to just using the most recent index if date extraction fails
@@ -1059,22 +2249,14 @@ class ElasticsearchHandler:
 
         available_ids = [dog['dog_id'] for dog in availables]
 
-        # Find adopted dogs: dogs with status "adopted" in today's indices but not in current availables
+        # Find adopted dogs: dogs listed today whose latest record says "adopted" and that aren't in current availables
         adopted_dogs = []
         if current_date:
-            # Query all indices from today for adopted dogs
-            today_index_pattern = f"animal-humane-{current_date}-*"
-            query = {
-                "query": {"term": {"status": "adopted"}},
-                "_source": ["name", "id", "url", "location", "status"]
-            }
             try:
-                response = self.es.search(index=today_index_pattern, body=query)
-                for hit in response['hits']['hits']:
-                    dog_data = hit['_source']
+                for dog_data in self.get_listed_on(current_date, ["name", "id", "url", "location", "status"]):
                     dog_id = dog_data['id']
                     # Only include if not in current available dogs
-                    if dog_id not in available_ids:
+                    if dog_data.get('status') == 'adopted' and dog_id not in available_ids:
                         adopted_dogs.append({
                             'name': dog_data.get('name', 'Unknown'),
                             'dog_id': dog_id,
@@ -1087,13 +2269,11 @@ class ElasticsearchHandler:
                 index_ids = self.get_all_ids(most_recent_index)
                 adopted_dog_ids = [dog_id for dog_id in index_ids if dog_id not in available_ids]
                 if adopted_dog_ids:
-                    query = {
-                        "query": {"terms": {"id": adopted_dog_ids}},
-                        "_source": ["name", "id", "url", "location", "status"]
-                    }
-                    response = self.es.search(index=most_recent_index, body=query)
-                    for hit in response['hits']['hits']:
-                        dog_data = hit['_source']
+                    view = self.get_scrape_view(most_recent_index, source=["name", "id", "url", "location", "status"])
+                    for dog_id in adopted_dog_ids:
+                        dog_data = view.get(dog_id)
+                        if dog_data is None:
+                            continue
                         adopted_dogs.append({
                             'name': dog_data.get('name', 'Unknown'),
                             'dog_id': dog_data['id'],
@@ -1105,13 +2285,11 @@ class ElasticsearchHandler:
             index_ids = self.get_all_ids(most_recent_index)
             adopted_dog_ids = [dog_id for dog_id in index_ids if dog_id not in available_ids]
             if adopted_dog_ids:
-                query = {
-                    "query": {"terms": {"id": adopted_dog_ids}},
-                    "_source": ["name", "id", "url", "location", "status"]
-                }
-                response = self.es.search(index=most_recent_index, body=query)
-                for hit in response['hits']['hits']:
-                    dog_data = hit['_source']
+                view = self.get_scrape_view(most_recent_index, source=["name", "id", "url", "location", "status"])
+                for dog_id in adopted_dog_ids:
+                    dog_data = view.get(dog_id)
+                    if dog_data is None:
+                        continue
                     adopted_dogs.append({
                         'name': dog_data.get('name', 'Unknown'),
                         'dog_id': dog_data['id'],
@@ -1144,6 +2322,9 @@ class ElasticsearchHandler:
             'other_unlisted_dogs': other_unlisted_dogs
         }
     def get_adoptions_per_day(self):
+        if self.analytics_backend == SQLITE:
+            return self.analytics_mirror.adoptions_per_day()
+
         query = {"size":0, "query":{"term":{"status":"adopted"}},"aggs":{"adoptions_over_time":{"date_histogram":{"field":"timestamp","calendar_interval":"day","format":"MM/dd/yyyy","time_zone":"-07:00"},"aggs":{"dog_names":{"terms":{"field":"name.keyword","size":100}}}}}}
         # Use index pattern that includes all years
         response = self.es.search(index="animal-humane-*", body=query)
@@ -1168,67 +2349,14 @@ class ElasticsearchHandler:
         as the difference between intake_date and today's date.
         Only considers dogs that are currently available (most recent status is "available").
         """
-        from datetime import datetime
-
-        # First, get all dogs that are currently available by finding their most recent status
-        # We'll query all documents and group by dog ID, keeping only those with latest status = "available"
-        current_available_query = {
-            "size": 10000,  # Need to get all available dogs
-            "query": {"match_all": {}},  # Get all documents
-            "_source": ["id", "status", "name", "intake_date", "url"],
-            "sort": [{"_index": {"order": "desc"}}]  # Most recent index first
-        }
-
-        response = self.es.search(index="animal-humane-*", body=current_available_query)
-
-        # Group by dog ID and keep only the most recent record for each dog
-        dogs_by_id = {}
-        for hit in response["hits"]["hits"]:
-            dog_data = hit["_source"]
-            dog_id = str(dog_data.get("id"))
-
-            # Only keep the first (most recent) record for each dog
-            if dog_id not in dogs_by_id:
-                dogs_by_id[dog_id] = dog_data
-
-        # Filter to only dogs with current status "available" and valid intake_date
-        available_dogs = []
-        for dog_data in dogs_by_id.values():
-            if (dog_data.get("status", "").lower() == "available" and
-                dog_data.get("intake_date") and
-                dog_data.get("name")):  # Exclude euthanized dogs
-                available_dogs.append(dog_data)
-
-        if not available_dogs:
-            return {"name": None, "days": None, "url": None}
-
-        # Calculate length of stay for each available dog and find the maximum
-        longest_stay_dog = None
-        max_days = 0
-        today = datetime.now().date()
-
-        for dog_data in available_dogs:
-            intake_date_str = dog_data.get("intake_date")
-
-            try:
-                # Parse intake_date (assuming format like "2025-10-17")
-                intake_date = datetime.fromisoformat(intake_date_str.split('T')[0]).date()
-                days = (today - intake_date).days
-
-                if days > max_days:
-                    max_days = days
-                    longest_stay_dog = {
-                        "name": dog_data.get("name"),
-                        "days": days,
-                        "url": dog_data.get("url")
-                    }
-            except (ValueError, AttributeError) as e:
-                # Skip dogs with invalid intake dates
-                continue
-
-        return longest_stay_dog if longest_stay_dog else {"name": None, "days": None, "url": None}
+        # Latest record per dog comes straight from dog-state
+        dogs_by_id = self.get_dog_states(source=LONGEST_RESIDENT_FIELDS)
+        return longest_resident_from_states(dogs_by_id)
 
     def get_weekly_age_group_adoptions(self):
+        if self.analytics_backend == SQLITE:
+            return self.analytics_mirror.weekly_age_group_adoptions()
+
         # Only search indices from 2025 onwards to avoid timestamp mapping conflicts
         query_body = {
             "size": 0,
@@ -1249,8 +2377,14 @@ class ElasticsearchHandler:
                 }
             }
         }
-        # Use index pattern that includes all years
-        response = self.es.search(index="animal-humane-*", body=query_body)
+        # One adopted event per adoption; snapshots can hold several adopted docs per dog
+        if self.es.indices.exists(index=DOG_EVENTS_INDEX):
+            query_body["query"] = {"term": {"event": ADOPTED}}
+            query_body["aggs"]["weekly"]["aggs"]["by_age_group"]["terms"]["field"] = "age_group"
+            response = self.es.search(index=DOG_EVENTS_INDEX, body=query_body)
+        else:
+            # Use index pattern that includes all years
+            response = self.es.search(index="animal-humane-*", body=query_body)
         print("[DEBUG] Raw ES response for weekly_age_group_adoptions:")
         print(json.dumps(response, indent=2))
         weekly_buckets=response['aggregations']['weekly']['buckets']
@@ -1275,23 +2409,31 @@ class ElasticsearchHandler:
         return result[-10:]
 
     def get_adoption_percentages_per_origin(self):
-        query_body={"size":0,"aggs":{"origins":{"terms":{"field":"origin.keyword","size":10000},"aggs": {"total_count": {"cardinality": {"field": "id","precision_threshold": 10000}},"adopted_count": {"filter": {"term": {"status.keyword": "adopted"}},"aggs": {"unique_adopted": {"cardinality": {"field": "id","precision_threshold": 10000}}}},"adoption_rate": {"bucket_script": {"buckets_path": {"adopted": "adopted_count>unique_adopted","total": "total_count"},"script": "params.total > 0 ? (params.adopted / params.total) * 100 : 0"}}}}}}
-        response = self.es.search(index="animal-humane-*", body=query_body)
-        origin_buckets=response['aggregations']['origins']['buckets']
+        if self.analytics_backend == SQLITE:
+            rates = self.analytics_mirror.adoption_rates_per_origin()
+        else:
+            rates = self._get_adoption_rates_per_origin_from_es()
+
         transformed_data = []
-        for bucket in origin_buckets:
-            coords = self.origin_coordinates.get(bucket["key"])
+        for origin, adoption_rate in rates:
+            coords = self.origin_coordinates.get(origin)
             if coords:
                 transformed_data.append({
                     "latitude": coords["latitude"],
                     "longitude": coords["longitude"],
-                    "locationName": bucket["key"],
-                    "adoptionRate": bucket["adoption_rate"]["value"]
+                    "locationName": origin,
+                    "adoptionRate": adoption_rate
                 })
             else:
-                print(f"Warning: Coordinates missing for origin '{bucket['key']}'")
+                print(f"Warning: Coordinates missing for origin '{origin}'")
         return transformed_data
 
+    def _get_adoption_rates_per_origin_from_es(self):
+        query_body={"size":0,"aggs":{"origins":{"terms":{"field":"origin.keyword","size":10000},"aggs": {"total_count": {"cardinality": {"field": "id","precision_threshold": 10000}},"adopted_count": {"filter": {"term": {"status.keyword": "adopted"}},"aggs": {"unique_adopted": {"cardinality": {"field": "id","precision_threshold": 10000}}}},"adoption_rate": {"bucket_script": {"buckets_path": {"adopted": "adopted_count>unique_adopted","total": "total_count"},"script": "params.total > 0 ? (params.adopted / params.total) * 100 : 0"}}}}}}
+        response = self.es.search(index="animal-humane-*", body=query_body)
+        origin_buckets=response['aggregations']['origins']['buckets']
+        return [(bucket["key"], bucket["adoption_rate"]["value"]) for bucket in origin_buckets]
+
     def get_origins(self):
         # Query ALL dogs from shelters (both available and adopted)
         # Exclude only Unknown, Stray, and Owner Surrender (also status:Euthanized)
@@ -1460,7 +2602,7 @@ class ElasticsearchHandler:
                                 "latest_status": {
                                     "top_hits": {
                                         "size": 1,
-                                        "sort": [{"_index": {"order": "desc"}}],  # Most recent index first
+                                        "sort": LATEST_FIRST_SORT,  # Most recent scrape first
                                         "_source": ["status"]
                                     }
                                 }
@@ -1561,24 +2703,20 @@ class ElasticsearchHandler:
         try:
             # Check if index exists first
             if not self.es.indices.exists(index=idx):
+                if SNAPSHOT_INDEX_PATTERN.match(idx or ""):
+                    # A delta, unchanged or compacted scrape: count its rebuilt records
+                    return age_groups_from_records(
+                        self.get_scrape_view(idx, source=["status", "age_group"]).values()
+                    )
                 print(f"Index {idx} does not exist, returning empty age groups")
                 return []
 
-            query_body = {"query":{"bool":{"must":[{"match":{"status":"Available"}}]}},"aggs":{"age_groups":{"terms":{"field":"age_group.keyword"},"aggs": {"unique_dogs": {"cardinality":{"field": "id"}}}}}}
-            response = self.es.search(index=idx, body=query_body)
+            response = self.es.search(index=idx, body=AGE_GROUPS_QUERY)
 
-            # Check if aggregations exist in response
-            if "aggregations" not in response or "age_groups" not in response["aggregations"]:
+            age_group_data = age_groups_from_response(response)
+            if age_group_data is None:
                 print(f"No aggregations found in response for index {idx}, returning empty age groups")
                 return []
-
-            age_group_data = [
-                {
-                    "age_group": bucket["key"],
-                    "count": bucket["doc_count"],
-                }
-                for bucket in response["aggregations"]["age_groups"]["buckets"]
-            ]
             print(f"returning age_group_data: {age_group_data}")
             return age_group_data
         except Exception as e:
@@ -1590,15 +2728,15 @@ class ElasticsearchHandler:
         Uses fixed 30-day intervals for bin calculation.
         Returns bins with dog lists containing minimal fields.
 
-        Uses the same logic as get_current_availables() to get all currently available dogs
-        from all indices, deduplicating by ID and keeping the most recent record for each dog.
+        Uses the same logic as get_current_availables() to get all currently available dogs:
+        the most recent record for each dog, read from dog-state.
         
         For visualization purposes, length_of_stay_days is dynamically calculated as the 
         number of days between intake_date and current date, rather than using the stored value.
 
         Args:
             status: Optional status filter ('available', 'adopted', etc.). If None, defaults to 'available'.
-            index_pattern: Optional index pattern to search. If None, uses all animal-humane indices.
+            index_pattern: Optional index pattern to search. If None, uses dog-state.
         """
         from datetime import datetime
 
@@ -1607,39 +2745,25 @@ class ElasticsearchHandler:
         
         # Use the same logic as get_current_availables() to get all current available dogs
         try:
-            # Use all animal-humane indices but sort by recency for deduplication
-            index_pattern = index_pattern or "animal-humane-*"
-
-            # Use a simpler query without aggregations to avoid mixed type issues
-            query = {
-                "size": 10000,  # Get up to 10k documents
-                "sort": [{"_index": {"order": "desc"}}],  # Sort by index name (most recent first)
-                "_source": ["id", "name", "breed", "age_group", "length_of_stay_days", "intake_date", "status"],
-                "query": {
-                    "match_all": {}  # Get all dogs from recent indices
-                }
-            }
-
-            # Run the search on all indices
-            response = self.es.search(index=index_pattern, body=query)
+            fields = ["id", "name", "breed", "age_group", "length_of_stay_days", "intake_date", "status"]
+            if index_pattern:
+                # Explicit pattern: dedupe that pattern's snapshots directly
+                latest_records = self._get_latest_records_from_snapshots(fields, index_pattern=index_pattern)
+            else:
+                index_pattern = DOG_STATE_INDEX
+                latest_records = self.get_dog_states(source=fields)
 
-            # Process results to get unique dogs (most recent record for each ID)
             dogs_by_id = {}
-            for hit in response['hits']['hits']:
-                dog_data = hit['_source']
-                dog_id = str(dog_data['id'])  # Ensure ID is string for consistency
-
-                # Keep the most recent record for each dog (first in sorted results)
-                if dog_id not in dogs_by_id:
-                    dogs_by_id[dog_id] = {
-                        "id": dog_data.get("id"),
-                        "name": dog_data.get("name", "Unknown"),
-                        "breed": dog_data.get("breed"),
-                        "age_group": dog_data.get("age_group"),
-                        "length_of_stay_days": dog_data.get("length_of_stay_days"),
-                        "intake_date": dog_data.get("intake_date"),
-                        "status": dog_data.get("status")
-                    }
+            for dog_id, dog_data in latest_records.items():
+                dogs_by_id[dog_id] = {
+                    "id": dog_data.get("id"),
+                    "name": dog_data.get("name", "Unknown"),
+                    "breed": dog_data.get("breed"),
+                    "age_group": dog_data.get("age_group"),
+                    "length_of_stay_days": dog_data.get("length_of_stay_days"),
+                    "intake_date": dog_data.get("intake_date"),
+                    "status": dog_data.get("status")
+                }
 
             # Filter for dogs with the target status and calculate dynamic length of stay
             from datetime import datetime
@@ -1728,7 +2852,7 @@ class ElasticsearchHandler:
                 "metadata": {
                     "n": 0,
                     "bin_algorithm": "30_day_intervals_all_indices_deduplicated_dynamic_los",
-                    "index_used": index_pattern or "animal-humane-*",
+                    "index_used": index_pattern or DOG_STATE_INDEX,
                     "generated_at": datetime.now().isoformat(),
                     "calculation_method": "dynamic_from_intake_date",
                     "error": str(e)
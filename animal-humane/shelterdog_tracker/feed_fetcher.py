@@ -0,0 +1,160 @@
+"""
+Concurrent fetching of ShelterLuv saved-query feeds.
+
+A scrape reads one available-animals feed per saved query on the adoptable-dogs
+page. ShelterScraper.scrape_dogs_from_urls used to fetch them one after another
+with a bare requests.get (no session, no timeout), so a scrape took the sum of
+every feed's latency and a stalled connection hung it. FeedFetcher fetches them
+in parallel on one keep-alive aiohttp session:
+
+- at most `concurrency` requests are open at once
+- each request has its own timeout
+- timeouts, connection errors, 429s and 5xx responses are retried up to
+  `max_retries` times, with exponential backoff and full jitter
+- results come back in the order the URLs were given, so the Dog list matches
+  what the sequential loop produced
+
+A feed that still fails raises FeedFetchError rather than being left out. A
+partial scrape would make every dog on the missing feed look adopted.
+
+The host can be swapped with `base_url` (or the SHELTERLUV_BASE_URL environment
+variable). Feed URLs keep their path and query but are sent to that host, so a
+local stand-in server can serve canned feeds in tests and development.
+
+Given a FeedValidators store, requests are conditional and fetch_changes also
+reports whether anything changed since the last committed scrape (see
+feed_validators.py).
+"""
+import asyncio
+import os
+import random
+from urllib.parse import urlsplit, urlunsplit
+
+SHELTERLUV_BASE_URL = "https://new.shelterluv.com"
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 20
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 8
+
+FEED_HEADERS = {
+    'Accept': 'application/json',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0 Safari/537.36'
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FeedFetchError(Exception):
+    pass
+
+
+def rebase_url(url, base_url):
+    """url with its scheme and host replaced by base_url's (path and query kept)."""
+    if not base_url:
+        return url
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    path = base.path.rstrip("/") + parts.path
+    return urlunsplit((base.scheme, base.netloc, path, parts.query, parts.fragment))
+
+
+def backoff_delay(attempt, backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF):
+    """Full jitter: anywhere from 0 to the exponential backoff for this attempt."""
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+
+class FeedFetcher:
+    def __init__(self, base_url=None, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF,
+                 session_factory=None, validators=None):
+        self.base_url = base_url if base_url is not None else os.getenv("SHELTERLUV_BASE_URL")
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # Callable returning an aiohttp.ClientSession-like object; tests pass a stand-in
+        self.session_factory = session_factory or self._open_session
+        # FeedValidators for conditional requests and change detection, or None to always fetch in full
+        self.validators = validators
+
+    def _open_session(self):
+        import aiohttp  # installed with elasticsearch[async]
+
+        return aiohttp.ClientSession(
+            headers=FEED_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        )
+
+    async def _fetch(self, session, semaphore, url):
+        """(parsed feed, whether it changed since the committed validators)"""
+        target = rebase_url(url, self.base_url)
+        headers = self.validators.request_headers(url) if self.validators is not None else {}
+        attempt = 0
+        while True:
+            async with semaphore:
+                try:
+                    async with session.get(target, headers=headers) as response:
+                        if response.status == 304 and headers:
+                            return self.validators.cached_feed(url), False
+                        if response.status == 200:
+                            feed = await response.json(content_type=None)
+                            if self.validators is None:
+                                return feed, True
+                            changed = self.validators.record(url, feed, response.headers.get("ETag"),
+                                                             response.headers.get("Last-Modified"))
+                            return feed, changed
+                        error = f"HTTP {response.status}"
+                        if response.status not in RETRY_STATUSES:
+                            raise FeedFetchError(f"{target}: {error}")
+                except FeedFetchError:
+                    raise
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+            if attempt >= self.max_retries:
+                raise FeedFetchError(f"{target}: {error} (gave up after {attempt + 1} attempts)")
+            delay = backoff_delay(attempt, self.backoff, self.max_backoff)
+            print(f"Retrying feed {target} in {delay:.1f}s after {error}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def fetch_all(self, urls):
+        """Parsed JSON for each feed URL, in the order given."""
+        feeds, _ = await self.fetch_changes(urls)
+        return feeds
+
+    async def fetch_changes(self, urls):
+        """
+        (feeds in url order, whether any feed or the url set changed). Without
+        validators every fetch counts as a change.
+        """
+        urls = list(urls)
+        if not urls:
+            return [], True
+        semaphore = asyncio.Semaphore(self.concurrency)
+        session = self.session_factory()
+        tasks = [asyncio.ensure_future(self._fetch(session, semaphore, url)) for url in urls]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # One feed failed for good; the scrape is unusable, so stop the rest
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            await session.close()
+        changed = any(feed_changed for _, feed_changed in results)
+        if self.validators is not None:
+            # Always staged, so a changed url set is committed along with the feeds
+            changed = self.validators.record_urls(urls) or changed
+        return [feed for feed, _ in results], changed
+
+    def fetch_all_sync(self, urls):
+        """fetch_all for synchronous callers (not from inside a running event loop)."""
+        return asyncio.run(self.fetch_all(urls))
+
+    def fetch_changes_sync(self, urls):
+        return asyncio.run(self.fetch_changes(urls))
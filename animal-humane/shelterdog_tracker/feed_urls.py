@@ -0,0 +1,80 @@
+"""
+Persisted ShelterLuv feed URLs.
+
+The adoptable-dogs page embeds one ShelterLuv widget per saved query, and each
+widget loads an available-animals feed for the shelter's GID. Finding those URLs
+meant starting headless Chromium, capturing its requests with selenium-wire and
+sleeping a fixed 60 seconds, on every scrape, though the GID and the saved-query
+set almost never change.
+
+ShelterScraper.fetch_feeds now keeps the last URLs that worked in a small JSON
+sidecar (gitignored under analytics/, like dog_history.npz). Each scrape
+fetches them straight away, and validating a feed is just checking that it
+came back as a JSON object with an `animals` list. Only when the cached set is
+missing, too old or fails validation does the scraper rediscover. It tries
+fetch_iframe_urls_fallback (a plain page fetch and parse) first and Selenium
+last. The age limit means a saved query added to the page is picked up within
+MAX_AGE_DAYS even though the old set still validates.
+"""
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+DEFAULT_FEED_URLS_PATH = str(Path(__file__).parent.parent / "analytics" / "feed_urls.json")
+MAX_AGE_DAYS = 7
+
+FEED_URL = re.compile(r"/available-animals/(\d+)")
+SAVED_QUERY = re.compile(r"[?&]saved_query=(\d+)")
+
+
+def feed_urls_path():
+    return os.getenv("FEED_URLS_PATH", DEFAULT_FEED_URLS_PATH)
+
+
+def describe_feeds(urls):
+    """The GID(s) and saved queries a set of feed URLs covers."""
+    gids = sorted({m.group(1) for m in map(FEED_URL.search, urls) if m})
+    saved_queries = sorted({m.group(1) for m in map(SAVED_QUERY.search, urls) if m}, key=int)
+    return gids, saved_queries
+
+
+def valid_feed(feed):
+    return isinstance(feed, dict) and isinstance(feed.get("animals"), list)
+
+
+def load_feed_urls(path=None, max_age=timedelta(days=MAX_AGE_DAYS), now=None):
+    """The persisted URLs, or None when there are none or they're older than max_age."""
+    path = path or feed_urls_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        discovered_at = datetime.fromisoformat(record["discovered_at"])
+        urls = [url for url in record["urls"] if isinstance(url, str)]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Ignoring unreadable feed URL cache {path}: {e}")
+        return None
+    if (now or datetime.now()) - discovered_at > max_age:
+        print(f"Feed URL cache {path} is older than {max_age.days} days; rediscovering")
+        return None
+    return urls or None
+
+
+def save_feed_urls(urls, path=None, now=None):
+    path = path or feed_urls_path()
+    gids, saved_queries = describe_feeds(urls)
+    record = {
+        "urls": list(urls),
+        "gids": gids,
+        "saved_queries": saved_queries,
+        "discovered_at": (now or datetime.now()).isoformat()
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    os.replace(tmp_path, path)
+    print(f"Saved {len(urls)} feed URLs (GID {', '.join(gids) or '?'}, saved queries {saved_queries}) to {path}")
@@ -0,0 +1,98 @@
+"""
+Per-feed validators for spotting scrapes where nothing changed.
+
+Every scrape used to download and parse each feed in full and write a complete
+new index, even when nothing at the shelter had changed since the last window.
+FeedValidators keeps what the last successful scrape saw for each feed URL:
+
+- the ETag and Last-Modified headers, when ShelterLuv sends them, which
+  FeedFetcher sends back as If-None-Match / If-Modified-Since
+- a hash of the normalized body (keys sorted, animals ordered by nid), so a feed
+  that re-serializes the same animals in a different order still counts as
+  unchanged
+- the body itself, so a 304 can be answered from here when another feed did
+  change and the scrape needs every dog
+
+A feed counts as changed when it returned 200 with a different hash. A scrape
+counts as changed when any feed did, or when the set of feed URLs isn't the one
+last committed, e.g. a saved query was retired.
+
+Updates are staged during a fetch and only written out by commit(), which the
+scheduler calls once the scrape has been indexed. If indexing fails, the next
+scrape still sees the change and retries it instead of skipping it as
+unchanged. The sidecar lives next to feed_urls.json under analytics/.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+DEFAULT_VALIDATORS_PATH = str(Path(__file__).parent.parent / "analytics" / "feed_validators.json")
+
+
+def normalized_hash(feed):
+    """sha256 of the feed with keys sorted and animals in nid order."""
+    if isinstance(feed, dict) and isinstance(feed.get("animals"), list):
+        feed = dict(feed, animals=sorted(feed["animals"], key=lambda a: str(a.get("nid") if isinstance(a, dict) else a)))
+    canonical = json.dumps(feed, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class FeedValidators:
+    def __init__(self, path=None):
+        self.path = path or os.getenv("FEED_VALIDATORS_PATH", DEFAULT_VALIDATORS_PATH)
+        self.feeds, self.urls = self._load()
+        self._pending = {}
+        self._pending_urls = None
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                record = json.load(f)
+            return dict(record["feeds"]), list(record["urls"])
+        except FileNotFoundError:
+            return {}, []
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable feed validators {self.path}: {e}")
+            return {}, []
+
+    def request_headers(self, url):
+        """Conditional request headers for url (only when its body is kept to answer a 304)."""
+        entry = self.feeds.get(url)
+        if not entry or "body" not in entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def cached_feed(self, url):
+        entry = self.feeds.get(url)
+        return entry.get("body") if entry else None
+
+    def record(self, url, feed, etag=None, last_modified=None):
+        """Stage a fetched feed; returns whether it differs from the committed one."""
+        digest = normalized_hash(feed)
+        self._pending[url] = {"etag": etag, "last_modified": last_modified, "hash": digest, "body": feed}
+        return (self.feeds.get(url) or {}).get("hash") != digest
+
+    def record_urls(self, urls):
+        """Stage the scrape's URL set; returns whether it differs from the committed one."""
+        self._pending_urls = list(urls)
+        return set(self._pending_urls) != set(self.urls)
+
+    def commit(self):
+        """Keep the staged feeds as the new baseline and save them."""
+        if self._pending_urls is not None:
+            self.urls = self._pending_urls
+        self.feeds.update(self._pending)
+        # Drop retired feeds
+        self.feeds = {url: entry for url, entry in self.feeds.items() if url in set(self.urls)}
+        self._pending, self._pending_urls = {}, None
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"urls": self.urls, "feeds": self.feeds}, f)
+        os.replace(tmp_path, self.path)
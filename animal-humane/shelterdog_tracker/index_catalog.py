@@ -0,0 +1,215 @@
+"""
+Shared catalog of the animal-humane-* indices and scrapes.
+
+Most readers start by working out which scrapes exist: the most recent one, the
+ones before today, the last seven days. IndexCatalog lists the indices (and the
+scrape manifests) once, parses every scrape name into a datetime and keeps them
+sorted, so those questions are lookups rather than a _cat/indices call and a
+regex pass each.
+
+It only reloads when something has been written: the animal-humane-latest alias
+moved, or a newer scrape manifest appeared (delta and unchanged scrapes don't
+move the alias). Checking that costs two tiny requests and is itself throttled to
+once per check_interval. Compaction moves scrapes between indices without doing
+either, so a catalog is also reloaded at least every max_age seconds, and
+compact_indices callers invalidate it in-process. Every reload bumps
+`generation`, which caches can use as part of their key.
+
+Catalogs are shared per Elasticsearch host within a process (get_catalog), and
+can be kept fresh from either client: sync() for Elasticsearch, async_sync() for
+AsyncElasticsearch.
+"""
+import bisect
+import threading
+import time
+from datetime import datetime
+
+from elasticsearch import exceptions as es_exceptions
+from elasticsearch.helpers import async_scan, scan
+
+from shelterdog_tracker.index_compaction import COMPACTED_INDEX_PATTERN, SNAPSHOT_NAME
+from shelterdog_tracker.snapshot_delta import MANIFEST_INDEX
+
+LATEST_ALIAS = "animal-humane-latest"
+DEFAULT_CHECK_INTERVAL = 10
+DEFAULT_MAX_AGE = 300
+NEWEST_MANIFEST_QUERY = {"size": 1, "sort": [{"scrape": {"order": "desc"}}], "_source": ["scrape"]}
+
+
+def parse_scrape_time(name):
+    """datetime of an animal-humane-YYYYMMDD-HHMM scrape name, or None for any other name."""
+    match = SNAPSHOT_NAME.match(name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1) + match.group(2), "%Y%m%d%H%M")
+
+
+def _newest_manifest(response):
+    hits = response["hits"]["hits"]
+    return hits[0]["_source"]["scrape"] if hits else None
+
+
+class IndexCatalog:
+    def __init__(self, alias=LATEST_ALIAS, check_interval=DEFAULT_CHECK_INTERVAL, max_age=DEFAULT_MAX_AGE):
+        self.alias = alias
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.generation = 0
+        self._signature = None
+        self._checked_at = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        # Replaced wholesale on reload, so readers never see a half-built catalog
+        self._indices = ()
+        self._snapshot_indices = ()
+        self._scrapes = ()
+        self._times = ()
+
+    # --- Loading ----------------------------------------------------------
+
+    def _current_signature(self, es):
+        try:
+            alias_targets = tuple(sorted(es.indices.get_alias(name=self.alias)))
+        except es_exceptions.NotFoundError:
+            alias_targets = ()
+        try:
+            newest_manifest = _newest_manifest(es.search(index=MANIFEST_INDEX, body=NEWEST_MANIFEST_QUERY))
+        except es_exceptions.NotFoundError:
+            newest_manifest = None
+        return alias_targets, newest_manifest
+
+    async def _async_current_signature(self, es):
+        try:
+            alias_targets = tuple(sorted(await es.indices.get_alias(name=self.alias)))
+        except es_exceptions.NotFoundError:
+            alias_targets = ()
+        try:
+            newest_manifest = _newest_manifest(await es.search(index=MANIFEST_INDEX, body=NEWEST_MANIFEST_QUERY))
+        except es_exceptions.NotFoundError:
+            newest_manifest = None
+        return alias_targets, newest_manifest
+
+    def _load(self, es):
+        resp = es.cat.indices(index="animal-humane-*", format="json", h="index,status")
+        manifest_scrapes = []
+        try:
+            for hit in scan(es, index=MANIFEST_INDEX, query={"query": {"match_all": {}}}, _source=["scrape"]):
+                manifest_scrapes.append(hit["_source"]["scrape"])
+        except es_exceptions.NotFoundError:
+            pass
+        self._apply(resp, manifest_scrapes)
+
+    async def _async_load(self, es):
+        resp = await es.cat.indices(index="animal-humane-*", format="json", h="index,status")
+        manifest_scrapes = []
+        try:
+            async for hit in async_scan(es, index=MANIFEST_INDEX, query={"query": {"match_all": {}}},
+                                        _source=["scrape"]):
+                manifest_scrapes.append(hit["_source"]["scrape"])
+        except es_exceptions.NotFoundError:
+            pass
+        self._apply(resp, manifest_scrapes)
+
+    def _apply(self, cat_indices, manifest_scrapes):
+        indices = sorted(item["index"] for item in cat_indices if item.get("status", "open") == "open")
+        snapshot_indices = [name for name in indices if SNAPSHOT_NAME.match(name)]
+        scrapes = sorted(name for name in set(snapshot_indices) | set(manifest_scrapes) if SNAPSHOT_NAME.match(name))
+
+        self._indices = tuple(indices)
+        self._snapshot_indices = tuple(snapshot_indices)
+        self._scrapes = tuple(scrapes)
+        self._times = tuple(parse_scrape_time(name) for name in scrapes)
+
+    def sync(self, es, force=False):
+        """Reload if anything was written since the last load; returns the generation."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return self.generation
+            signature = self._current_signature(es)
+            self._checked_at = now
+            stale = self._loaded_at is None or now - self._loaded_at >= self.max_age
+            if force or stale or signature != self._signature:
+                self._load(es)
+                self._signature = signature
+                self._loaded_at = now
+                self.generation += 1
+            return self.generation
+
+    async def async_sync(self, es, force=False):
+        """sync() for an AsyncElasticsearch client.
+
+        The lock isn't held across the awaits, so two coroutines may both reload;
+        each replaces the catalog wholesale, so that only costs a request.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return self.generation
+            stale = self._loaded_at is None or now - self._loaded_at >= self.max_age
+            known_signature = self._signature
+        signature = await self._async_current_signature(es)
+        if force or stale or signature != known_signature:
+            await self._async_load(es)
+        with self._lock:
+            self._checked_at = now
+            if force or stale or signature != known_signature:
+                self._signature = signature
+                self._loaded_at = now
+                self.generation += 1
+            return self.generation
+
+    def invalidate(self):
+        """Make the next sync reload (after this process wrote or moved indices)."""
+        with self._lock:
+            self._checked_at = None
+            self._loaded_at = None
+
+    # --- Lookups ----------------------------------------------------------
+
+    @property
+    def indices(self):
+        """Every open animal-humane-* index, sorted by name."""
+        return list(self._indices)
+
+    @property
+    def snapshot_indices(self):
+        """Per-scrape animal-humane-YYYYMMDD-HHMM indices, oldest first."""
+        return list(self._snapshot_indices)
+
+    @property
+    def compacted_indices(self):
+        return [name for name in self._indices if COMPACTED_INDEX_PATTERN.match(name)]
+
+    @property
+    def scrapes(self):
+        """Every scrape name, oldest first, however it's stored."""
+        return list(self._scrapes)
+
+    def latest_snapshot_index(self):
+        return self._snapshot_indices[-1] if self._snapshot_indices else None
+
+    def latest_scrape(self):
+        return self._scrapes[-1] if self._scrapes else None
+
+    def scrapes_between(self, start=None, end=None):
+        """Scrapes taken at start <= time < end (datetimes, either bound optional), oldest first."""
+        lo = bisect.bisect_left(self._times, start) if start is not None else 0
+        hi = bisect.bisect_left(self._times, end) if end is not None else len(self._times)
+        return list(self._scrapes[lo:hi])
+
+    def snapshot_indices_between(self, start=None, end=None):
+        physical = set(self._snapshot_indices)
+        return [name for name in self.scrapes_between(start, end) if name in physical]
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(host):
+    """The process-wide catalog for an Elasticsearch host."""
+    with _catalogs_lock:
+        if host not in _catalogs:
+            _catalogs[host] = IndexCatalog()
+        return _catalogs[host]
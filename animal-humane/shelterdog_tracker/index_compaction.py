@@ -0,0 +1,203 @@
+"""
+Compaction of per-scrape snapshot indices.
+
+Closed days are reindexed into animal-humane-daily-YYYYMMDD and, once a month is
+old enough, its daily (and any leftover per-scrape) indices are reindexed into
+animal-humane-monthly-YYYYMM. Every document keeps the scrape it came from in its
+`scrape` field, which is what the handler sorts and filters on, so queries return
+the same results before and after. Compacted indices are force-merged, made
+read-only, and the originals deleted.
+"""
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from elasticsearch import exceptions as es_exceptions
+
+from shelterdog_tracker.index_template import ensure_snapshot_template
+from shelterdog_tracker.snapshot_delta import MANIFEST_INDEX, MANIFEST_MAPPING
+
+SNAPSHOT_NAME = re.compile(r'^animal-humane-(\d{8})-(\d{4})$')
+DAILY_NAME = re.compile(r'^animal-humane-daily-(\d{8})$')
+MONTHLY_NAME = re.compile(r'^animal-humane-monthly-(\d{6})$')
+COMPACTED_INDEX_PATTERN = re.compile(r'^animal-humane-(daily-\d{8}|monthly-\d{6})$')
+
+# Per-scrape indices from the last few days stay as they are: corrections
+# (adoptions, location updates) are still being applied to them.
+DEFAULT_KEEP_DAYS = 7
+DEFAULT_MONTHLY_AFTER_DAYS = 60
+
+# Several scrapes share a compacted index, and per-scrape documents use the dog id
+# as _id, so prefix it with the scrape. Already-compacted documents keep their id.
+REINDEX_SCRIPT = """
+if (ctx._source.scrape == null) {
+    ctx._source.scrape = ctx._index;
+}
+if (!ctx._id.startsWith(ctx._source.scrape)) {
+    ctx._id = ctx._source.scrape + '-' + ctx._id;
+}
+"""
+
+
+def plan_compaction(index_names, today=None, keep_days=DEFAULT_KEEP_DAYS,
+                    monthly_after_days=DEFAULT_MONTHLY_AFTER_DAYS):
+    """
+    Decide which indices to merge where.
+
+    Returns:
+        List of (target_index, [source_indices]), monthly targets after daily ones.
+    """
+    today = today or datetime.now()
+    day_cutoff = (today - timedelta(days=keep_days)).strftime('%Y%m%d')
+    month_cutoff = (today - timedelta(days=monthly_after_days)).strftime('%Y%m')
+
+    by_month = defaultdict(list)
+    by_day = defaultdict(list)
+    for name in index_names:
+        snapshot = SNAPSHOT_NAME.match(name)
+        daily = DAILY_NAME.match(name)
+        day = snapshot.group(1) if snapshot else daily.group(1) if daily else None
+        if day is None:
+            continue
+        if day[:6] < month_cutoff:
+            by_month[day[:6]].append(name)
+        elif snapshot and day < day_cutoff:
+            by_day[day].append(name)
+
+    plan = [(f"animal-humane-daily-{day}", sorted(sources)) for day, sources in sorted(by_day.items())]
+    plan += [(f"animal-humane-monthly-{month}", sorted(sources)) for month, sources in sorted(by_month.items())]
+    return plan
+
+
+def _count(es, index):
+    return es.count(index=index)["count"]
+
+
+def compact_into(es, target, sources, request_timeout=3600):
+    """Reindex sources into target, verify, force-merge, make read-only and delete sources."""
+    existed = es.indices.exists(index=target)
+    if existed:
+        # Adding to an earlier compaction (e.g. a day's leftovers into a month)
+        es.indices.put_settings(index=target, body={"index.blocks.write": False})
+        before = _count(es, target)
+    else:
+        es.indices.create(index=target, body={"settings": {"number_of_shards": 1}})
+        before = 0
+
+    try:
+        expected = sum(_count(es, source) for source in sources)
+        es.options(request_timeout=request_timeout).reindex(
+            body={
+                "source": {"index": ",".join(sources)},
+                "dest": {"index": target},
+                "script": {"source": REINDEX_SCRIPT, "lang": "painless"}
+            },
+            wait_for_completion=True,
+            refresh=True
+        )
+        after = _count(es, target)
+        if after - before != expected:
+            raise RuntimeError(
+                f"Compaction into {target} copied {after - before} documents, expected {expected}; "
+                f"leaving {len(sources)} source indices in place"
+            )
+    except Exception:
+        _discard_partial_copy(es, target, sources, existed)
+        raise
+
+    _point_manifests_at(es, target, sources)
+
+    es.options(request_timeout=request_timeout).indices.forcemerge(index=target, max_num_segments=1)
+    es.indices.put_settings(index=target, body={"index.blocks.write": True})
+    es.indices.delete(index=",".join(sources))
+    return expected
+
+
+def _copied_from(sources):
+    """Query for the documents a reindex of sources adds to a compacted index."""
+    clauses = []
+    scrapes = [source for source in sources if SNAPSHOT_NAME.match(source)]
+    if scrapes:
+        clauses.append({"terms": {"scrape.keyword": scrapes}})
+    for source in sources:
+        daily = DAILY_NAME.match(source)
+        if daily:
+            clauses.append({"prefix": {"scrape.keyword": f"animal-humane-{daily.group(1)}-"}})
+    return {"bool": {"should": clauses, "minimum_should_match": 1}}
+
+
+def _discard_partial_copy(es, target, sources, existed):
+    """Undo a failed compaction so a partly filled target never looks like a finished one."""
+    try:
+        if not existed:
+            es.indices.delete(index=target)
+            return
+        # Earlier compactions' documents stay; only what this run copied goes
+        es.delete_by_query(index=target, body={"query": _copied_from(sources)},
+                           conflicts="proceed", refresh=True)
+        es.indices.put_settings(index=target, body={"index.blocks.write": True})
+    except es_exceptions.ApiError as e:
+        print(f"Error cleaning up partial compaction into {target}: {e}")
+
+
+def _point_manifests_at(es, target, sources):
+    """Keep list_scrapes/get_scrape_view able to find every scrape that moved into target."""
+    if not es.indices.exists(index=MANIFEST_INDEX):
+        es.indices.create(index=MANIFEST_INDEX, body=MANIFEST_MAPPING)
+
+    for source in sources:
+        if SNAPSHOT_NAME.match(source):
+            es.update(
+                index=MANIFEST_INDEX,
+                id=source,
+                body={"doc": {"scrape": source, "mode": "compacted", "storage_index": target},
+                      "doc_as_upsert": True}
+            )
+
+    # Covers scrapes already compacted into a source and "unchanged" scrapes stored in one
+    if sources:
+        es.update_by_query(
+            index=MANIFEST_INDEX,
+            body={
+                "script": {
+                    "source": "ctx._source.storage_index = params.target",
+                    "lang": "painless",
+                    "params": {"target": target}
+                },
+                "query": {"terms": {"storage_index": list(sources)}}
+            },
+            conflicts="proceed"
+        )
+    es.indices.refresh(index=MANIFEST_INDEX)
+
+
+def compact_indices(es, today=None, keep_days=DEFAULT_KEEP_DAYS,
+                    monthly_after_days=DEFAULT_MONTHLY_AFTER_DAYS, dry_run=False):
+    """
+    Compact every eligible snapshot/daily index.
+
+    Returns:
+        List of (target_index, [source_indices]) that were (or, with dry_run, would be) compacted.
+    """
+    resp = es.cat.indices(index="animal-humane-*", format="json")
+    open_indices = [item["index"] for item in resp if item.get("status", "open") == "open"]
+    plan = plan_compaction(open_indices, today=today, keep_days=keep_days,
+                           monthly_after_days=monthly_after_days)
+
+    if plan and not dry_run:
+        # Compacted indices pick up the explicit mappings as they're created
+        ensure_snapshot_template(es)
+
+    done = []
+    for target, sources in plan:
+        if dry_run:
+            print(f"Would compact {len(sources)} indices into {target}")
+            done.append((target, sources))
+            continue
+        try:
+            count = compact_into(es, target, sources)
+            print(f"Compacted {len(sources)} indices ({count} documents) into {target}")
+            done.append((target, sources))
+        except (es_exceptions.ApiError, RuntimeError) as e:
+            print(f"Error compacting into {target}: {e}")
+    return done
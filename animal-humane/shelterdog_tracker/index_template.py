@@ -0,0 +1,91 @@
+"""
+Index template for animal-humane-* indices.
+
+Without it every scrape index got its mapping from dynamic mapping, so the same
+field could be text in one index and keyword/long in another. That's why queries
+alternate between `status` and `status.keyword` and why several methods pulled
+raw hits into Python to dedupe. With explicit types, "latest record per dog" can
+be worked out by Elasticsearch (collapse / composite + top_hits).
+
+The `.keyword` sub-fields that dynamic mapping used to create are kept on the
+keyword fields, so existing queries against either name keep matching in old
+and new indices alike.
+
+Bump SNAPSHOT_TEMPLATE_VERSION whenever the template changes; ensure_snapshot_template
+only overwrites an installed template with an older version.
+"""
+
+SNAPSHOT_TEMPLATE_NAME = "animal-humane-snapshots"
+SNAPSHOT_TEMPLATE_VERSION = 1
+
+_KEYWORD_WITH_LEGACY_SUBFIELD = {
+    "type": "keyword",
+    "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}
+}
+
+_TEXT_WITH_KEYWORD = {
+    "type": "text",
+    "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}
+}
+
+SNAPSHOT_TEMPLATE = {
+    "index_patterns": ["animal-humane-*"],
+    "version": SNAPSHOT_TEMPLATE_VERSION,
+    "priority": 100,
+    "_meta": {"description": "Scrape snapshots of adoptable dogs"},
+    "template": {
+        "settings": {
+            # Keeps each dog's records together on disk, which helps collapse/terms on id
+            "index.sort.field": "id",
+            "index.sort.order": "asc"
+        },
+        "mappings": {
+            "_meta": {"template_version": SNAPSHOT_TEMPLATE_VERSION},
+            "properties": {
+                "id": {"type": "long"},
+                "name": _TEXT_WITH_KEYWORD,
+                "status": _KEYWORD_WITH_LEGACY_SUBFIELD,
+                "location": _KEYWORD_WITH_LEGACY_SUBFIELD,
+                "origin": _KEYWORD_WITH_LEGACY_SUBFIELD,
+                "age_group": _KEYWORD_WITH_LEGACY_SUBFIELD,
+                "url": {"type": "keyword"},
+                "timestamp": {"type": "date"},
+                "intake_date": {"type": "date"},
+                "birthdate": {"type": "date"},
+                "length_of_stay_days": {"type": "integer"},
+                "returned": {"type": "integer"},
+                "latitude": {"type": "float"},
+                "longitude": {"type": "float"},
+                # Sorted on as scrape.keyword everywhere, so mapped the way dynamic mapping did
+                "scrape": _TEXT_WITH_KEYWORD
+            }
+        }
+    }
+}
+
+
+def installed_template_version(es):
+    """Version of the installed template, or None if it isn't installed."""
+    if not es.indices.exists_index_template(name=SNAPSHOT_TEMPLATE_NAME):
+        return None
+    resp = es.indices.get_index_template(name=SNAPSHOT_TEMPLATE_NAME)
+    templates = resp.get("index_templates", [])
+    if not templates:
+        return None
+    return templates[0]["index_template"].get("version")
+
+
+def ensure_snapshot_template(es):
+    """Install or upgrade the template. Returns True if it was (re)installed."""
+    installed = installed_template_version(es)
+    if installed is not None and installed >= SNAPSHOT_TEMPLATE_VERSION:
+        return False
+    es.indices.put_index_template(name=SNAPSHOT_TEMPLATE_NAME, body=SNAPSHOT_TEMPLATE)
+    print(f"Installed index template {SNAPSHOT_TEMPLATE_NAME} v{SNAPSHOT_TEMPLATE_VERSION} (was {installed})")
+    return True
+
+
+def index_template_version(es, index):
+    """Template version an existing index was created with (None for dynamically mapped indices)."""
+    resp = es.indices.get_mapping(index=index)
+    return resp[index]["mappings"].get("_meta", {}).get("template_version")
@@ -0,0 +1,226 @@
+"""
+Batch live-status checks against ShelterLuv's per-animal pages.
+
+Deciding whether an unlisted dog was adopted, went on a trial adoption or just
+moved kennels means loading its embed page (/embed/animal/<id>) and reading the
+location out of the JSON in the page's `:animal` attribute. That used to happen
+in several places (DiffAnalyzer.check_live_status, ShelterScraper's
+scrape_dog_location / scrape_shelterluv, ElasticsearchHandler.update_dogs,
+DogStatusUpdater), one page at a time, each re-parsing the whole page with
+BeautifulSoup or a list of regexes. LiveStatusChecker replaces them:
+
+- check_many takes a batch of ids and fetches their pages concurrently on one
+  keep-alive session. A process-wide rate limit (requests per second, shared by
+  every batch on the checker) keeps bursts polite, and failed requests are
+  retried with jittered backoff like the feed fetches (see feed_fetcher.py).
+- parse_animal finds the `:animal` attribute with one regex and json-decodes
+  just that value.
+- Results are LiveStatus tuples, cached per id for `ttl` seconds. A scheduler
+  run and the API checking the same unlisted dogs minutes apart fetch each page
+  once. Failed checks aren't cached.
+
+get_live_status_checker() returns one shared checker per process, so callers
+share its cache and rate limit. The host follows SHELTERLUV_BASE_URL, like the
+feeds.
+"""
+import asyncio
+import html
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from shelterdog_tracker.feed_fetcher import RETRY_STATUSES, SHELTERLUV_BASE_URL, backoff_delay, rebase_url
+
+ANIMAL_PAGE_URL = SHELTERLUV_BASE_URL + "/embed/animal/{}"
+
+DEFAULT_RATE = 10  # requests per second
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_TTL = 300
+
+PAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0 Safari/537.36'
+}
+
+# The attribute value is HTML-escaped JSON, so it can't contain a raw quote of its own kind
+ANIMAL_ATTR = re.compile(r''':animal\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+ANIMAL_ID = re.compile(r"/animal/(\d+)")
+
+# Only consulted when a page has no :animal data at all
+ADOPTION_INDICATORS = ('not available', 'no longer available', 'has been adopted', 'adopted', 'unavailable')
+
+
+class LiveStatus(namedtuple("LiveStatus", ["dog_id", "location", "is_adopted", "is_trial_adoption", "error", "animal"])):
+    """
+    location is None when the page couldn't be read (error says why) or had no
+    :animal data; "" means ShelterLuv lists no location, i.e. adopted.
+    """
+
+    def as_dict(self):
+        """The {'location', 'is_adopted', 'is_trial_adoption'} shape DiffAnalyzer reports."""
+        if self.error:
+            location = "error"
+        elif self.location is None:
+            location = "" if self.is_adopted else "unknown"
+        else:
+            location = self.location
+        return {'location': location, 'is_adopted': self.is_adopted, 'is_trial_adoption': self.is_trial_adoption}
+
+
+def parse_animal(page):
+    """The page's :animal JSON as a dict, or None if it has none."""
+    match = ANIMAL_ATTR.search(page)
+    if not match:
+        return None
+    try:
+        animal = json.loads(html.unescape(match.group(1) if match.group(1) is not None else match.group(2)))
+    except ValueError:
+        return None
+    return animal if isinstance(animal, dict) else None
+
+
+def status_from_page(dog_id, page):
+    animal = parse_animal(page)
+    if animal is None:
+        lowered = page.lower()
+        adopted = any(indicator in lowered for indicator in ADOPTION_INDICATORS)
+        return LiveStatus(dog_id, None, adopted, False, None, None)
+    location = (animal.get("location") or "").strip()
+    return LiveStatus(dog_id, location, location == "", "trial adoption" in location.lower(), None, animal)
+
+
+def dog_id_from_url(url):
+    match = ANIMAL_ID.search(url or "")
+    return int(match.group(1)) if match else None
+
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart across every task using it."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    async def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class LiveStatusChecker:
+    def __init__(self, rate=DEFAULT_RATE, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, ttl=DEFAULT_TTL, base_url=None, session_factory=None):
+        self.rate_limiter = RateLimiter(rate)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.ttl = ttl
+        self.base_url = base_url if base_url is not None else os.getenv("SHELTERLUV_BASE_URL")
+        # Callable returning an aiohttp.ClientSession-like object; tests pass a stand-in
+        self.session_factory = session_factory or self._open_session
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def _open_session(self):
+        import aiohttp  # installed with elasticsearch[async]
+
+        return aiohttp.ClientSession(
+            headers=PAGE_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        )
+
+    def cached(self, dog_id):
+        with self._cache_lock:
+            entry = self._cache.get(int(dog_id))
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def invalidate(self, dog_ids=None):
+        with self._cache_lock:
+            if dog_ids is None:
+                self._cache.clear()
+            for dog_id in dog_ids or ():
+                self._cache.pop(int(dog_id), None)
+
+    async def _check(self, session, semaphore, dog_id):
+        url = rebase_url(ANIMAL_PAGE_URL.format(dog_id), self.base_url)
+        attempt = 0
+        while True:
+            await self.rate_limiter.wait()
+            async with semaphore:
+                try:
+                    async with session.get(url) as response:
+                        if response.status == 200:
+                            return status_from_page(dog_id, await response.text())
+                        error = f"HTTP {response.status}"
+                        retry = response.status in RETRY_STATUSES
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    retry = True
+            if not retry or attempt >= self.max_retries:
+                print(f"Live status check failed for dog {dog_id}: {error}")
+                return LiveStatus(dog_id, None, False, False, error, None)
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    async def check_many(self, dog_ids):
+        """{dog_id (int): LiveStatus} for every id, from the cache where it's fresh."""
+        results = {}
+        to_fetch = []
+        for dog_id in dict.fromkeys(int(dog_id) for dog_id in dog_ids):
+            status = self.cached(dog_id)
+            if status is not None:
+                results[dog_id] = status
+            else:
+                to_fetch.append(dog_id)
+        if not to_fetch:
+            return results
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        session = self.session_factory()
+        try:
+            fetched = await asyncio.gather(*(self._check(session, semaphore, dog_id) for dog_id in to_fetch))
+        finally:
+            await session.close()
+
+        expires = time.monotonic() + self.ttl
+        with self._cache_lock:
+            for status in fetched:
+                results[status.dog_id] = status
+                if not status.error:
+                    self._cache[status.dog_id] = (expires, status)
+        return results
+
+    def check_many_sync(self, dog_ids):
+        """check_many for synchronous callers; code already on an event loop must await check_many."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.check_many(dog_ids))
+        raise RuntimeError("check_many_sync can't run inside a running event loop; await check_many instead")
+
+    def check(self, dog_id):
+        return self.check_many_sync([dog_id])[int(dog_id)]
+
+
+_checker = None
+_checker_lock = threading.Lock()
+
+
+def get_live_status_checker():
+    """The process-wide checker (shared cache and rate limit)."""
+    global _checker
+    with _checker_lock:
+        if _checker is None:
+            _checker = LiveStatusChecker()
+        return _checker
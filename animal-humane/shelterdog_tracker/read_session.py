@@ -0,0 +1,114 @@
+"""
+Point-in-time read sessions for computations that take several queries.
+
+The diff analysis reads the available dogs, the newest scrape's ids, today's
+adoptions, the returned-dog aggregation and the new dogs in separate requests. A
+scrape or a correction landing between two of them made the sections contradict
+each other. ElasticsearchHandler.read_session() opens one point in time (PIT)
+over every index those reads touch and hands back a copy of the handler whose
+`es` is a PitClient. Searches and scans made through that copy all see the
+cluster as it was when the session opened. The copy also memoizes scrape views,
+manifests and dog-state reads (see ElasticsearchHandler._session_cached), so a
+sub-computation that needs a scrape another one already fetched doesn't read it
+again.
+
+Searches are restricted to the index they asked for with an _index filter, so
+pass concrete index names or wildcard patterns (aliases aren't resolved).
+Everything other than search and scan (get, mget, indices.*, writes) goes
+straight to the underlying client.
+"""
+from elasticsearch import exceptions as es_exceptions
+
+DEFAULT_KEEP_ALIVE = "2m"
+SCAN_PAGE_SIZE = 1000
+
+# Search parameters the handler passes as keyword arguments; in a PIT search they belong in the body
+_BODY_PARAMS = ("size", "sort", "_source", "from_", "aggs", "query", "collapse")
+
+
+def index_filter(index):
+    patterns = [name.strip() for name in index.split(",") if name.strip()]
+    if len(patterns) == 1:
+        return {"wildcard": {"_index": patterns[0]}}
+    return {"bool": {"should": [{"wildcard": {"_index": p}} for p in patterns], "minimum_should_match": 1}}
+
+
+class PitClient:
+    """Stands in for an Elasticsearch client inside a read session."""
+
+    def __init__(self, es, pit_id, keep_alive=DEFAULT_KEEP_ALIVE):
+        self._es = es
+        self.pit_id = pit_id
+        self.keep_alive = keep_alive
+        self._exists = {}
+
+    def __getattr__(self, name):
+        return getattr(self._es, name)
+
+    def _check_exists(self, index):
+        # A plain search on a missing index raises NotFoundError, which readers use
+        # to fall back (e.g. before dog-state is built); a PIT search would just
+        # return nothing, so keep that behaviour for concrete names
+        if "*" in index or "," in index:
+            return
+        if index not in self._exists:
+            self._exists[index] = bool(self._es.indices.exists(index=index))
+        if not self._exists[index]:
+            raise es_exceptions.NotFoundError(404, "index_not_found_exception", {"index": index})
+
+    def search(self, index=None, body=None, **kwargs):
+        body = dict(body or {})
+        if "pit" in body:
+            # The caller manages its own point in time
+            return self._es.search(body=body, **kwargs)
+        for param in _BODY_PARAMS:
+            if param in kwargs:
+                body["from" if param == "from_" else param] = kwargs.pop(param)
+        if index:
+            self._check_exists(index)
+            body["query"] = {"bool": {"filter": [index_filter(index)],
+                                      "must": [body.get("query") or {"match_all": {}}]}}
+        body["pit"] = {"id": self.pit_id, "keep_alive": self.keep_alive}
+        resp = self._es.search(body=body, **kwargs)
+        self.pit_id = resp.get("pit_id", self.pit_id)
+        return resp
+
+    def scan(self, index, query=None, _source=True):
+        """Every matching hit, paged with search_after on _shard_doc instead of a scroll."""
+        body = dict(query or {})
+        body.update({"size": SCAN_PAGE_SIZE, "sort": ["_shard_doc"], "_source": _source})
+        while True:
+            hits = self.search(index=index, body=body)["hits"]["hits"]
+            yield from hits
+            if len(hits) < SCAN_PAGE_SIZE:
+                return
+            body["search_after"] = hits[-1]["sort"]
+
+
+class ReadSession:
+    """Context manager behind ElasticsearchHandler.read_session()."""
+
+    def __init__(self, handler, indices, keep_alive=DEFAULT_KEEP_ALIVE):
+        self._parent = handler
+        self.indices = indices
+        self.keep_alive = keep_alive
+        self.handler = None
+
+    def __enter__(self):
+        es = self._parent.es
+        # Settle which scrapes exist before pinning the view
+        self._parent.index_catalog.latest_scrape()
+        pit_id = es.open_point_in_time(
+            index=",".join(self.indices),
+            keep_alive=self.keep_alive,
+            ignore_unavailable=True
+        )["id"]
+        self.handler = self._parent.session_copy(PitClient(es, pit_id, self.keep_alive))
+        return self.handler
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._parent.es.close_point_in_time(body={"id": self.handler.es.pit_id})
+        except Exception as e:
+            print(f"Failed to close point in time: {e}")
+        return False
@@ -15,10 +15,19 @@ from selenium.webdriver.support.ui import WebDriverWait
 from seleniumwire import webdriver  # pip install selenium-wire
 import time
 from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+from shelterdog_tracker.feed_fetcher import FeedFetcher, FeedFetchError
+from shelterdog_tracker.feed_urls import load_feed_urls, save_feed_urls, valid_feed
+from shelterdog_tracker.feed_validators import FeedValidators
+from shelterdog_tracker.live_status import dog_id_from_url, get_live_status_checker
 # Encapsulates all scraping and data extraction logic.
 class ShelterScraper:
-    def __init__(self, main_url=None):
+    def __init__(self, main_url=None, fetcher=None, feed_urls_path=None):
         self.main_url = main_url
+        # Fetches the saved-query feeds concurrently (see feed_fetcher.py)
+        # Validators make the requests conditional and let unchanged scrapes be skipped (see feed_validators.py)
+        self.fetcher = fetcher or FeedFetcher(validators=FeedValidators())
+        # Where the last working feed URLs are kept; None means FEED_URLS_PATH or the default (see feed_urls.py)
+        self.feed_urls_path = feed_urls_path
 
     #TODO move this to test/ directory
     def verify_dogs_complete(self, dogs):
@@ -31,9 +40,60 @@ class ShelterScraper:
 
         
 
-    def scrape_all_dogs(self):
-        urls = self.fetch_iframe_urls()
-        return self.scrape_dogs_from_urls(urls)
+    def scrape_all_dogs(self, skip_if_unchanged=False):
+        """
+        Every dog on the saved-query feeds. With skip_if_unchanged, returns None
+        when no feed changed since the last commit_feed_validators().
+        """
+        feeds, changed = self.fetch_feeds()
+        if skip_if_unchanged and not changed:
+            print("No feed changed since the last committed scrape")
+            return None
+        return self.dogs_from_feeds(feeds)
+
+    def commit_feed_validators(self):
+        """Make this scrape's feeds the baseline for change detection; call once it's stored."""
+        if self.fetcher.validators is not None:
+            self.fetcher.validators.commit()
+
+    def _fetch_valid_feeds(self, urls):
+        """(parsed feeds, whether anything changed) if every URL returned a feed, else None."""
+        try:
+            feeds, changed = self.fetcher.fetch_changes_sync(urls)
+        except FeedFetchError as e:
+            print(f"Feed fetch failed: {e}")
+            return None
+        if not all(valid_feed(feed) for feed in feeds):
+            print("A feed didn't return an animals list")
+            return None
+        return feeds, changed
+
+    def fetch_feeds(self):
+        """
+        (parsed saved-query feeds, whether any changed). Reuses the persisted feed URLs
+        while they validate; otherwise rediscovers them from the page (then Selenium)
+        and persists the new set.
+        """
+        urls = load_feed_urls(self.feed_urls_path)
+        if urls:
+            fetched = self._fetch_valid_feeds(urls)
+            if fetched is not None:
+                return fetched
+            print("Cached feed URLs failed validation; rediscovering")
+
+        for discover in (self.fetch_iframe_urls_fallback, self.fetch_iframe_urls):
+            try:
+                urls = discover()
+            except Exception as e:
+                print(f"{discover.__name__} failed: {e}")
+                continue
+            if not urls:
+                continue
+            fetched = self._fetch_valid_feeds(urls)
+            if fetched is not None:
+                save_feed_urls(urls, self.feed_urls_path)
+                return fetched
+        raise RuntimeError("Could not find any working ShelterLuv feed URLs")
             
     def fetch_iframe_urls(self):
         """
@@ -164,20 +224,6 @@ class ShelterScraper:
             print(f"Fallback scraping also failed: {e}")
             return []
 
-    def scrape_dog_location(self, url):
-        headers = {
-            'Accept': 'application/json',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, "html.parser")
-        iframe_animal = soup.find('iframe-animal')
-        animal_attr = iframe_animal.get(':animal')
-        animal_data = json.loads(animal_attr)
-        location = animal_data.get('location')
-        print(f"location returned from scrape_dog_status is: {location}")
-        return location 
-
     #This function may be a duplicate attempt at a function that's already 
     #been created called scrape_shelter_luv.
     def scrape_shelterluv_from_url_list(self, url_list):
@@ -242,10 +288,11 @@ class ShelterScraper:
 
     def scrape_dogs_from_urls(self, urls):
         #print(f"urls passed to scrape_dogs_from_urls are: {urls}")
-        headers = {
-            'Accept': 'application/json',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0 Safari/537.36'
-        }
+        # Every feed is fetched at once; the responses come back in url order
+        return self.dogs_from_feeds(self.fetcher.fetch_all_sync(urls))
+
+    def dogs_from_feeds(self, feeds):
+        """Dog objects for every animal in the parsed feeds."""
         mountain_tz = pytz.timezone('US/Mountain')
         now_utc = datetime.utcnow()
         now_mt = now_utc.replace(tzinfo=pytz.utc).astimezone(mountain_tz)
@@ -275,9 +322,7 @@ class ShelterScraper:
                 
                 if 'longitude' in data and data['longitude'] not in (None, ''):
                     origin_lookup[data['id']]["longitude"] = float(data['longitude'])
-        for url in urls:
-            response = requests.get(url, headers=headers)
-            parsed_data = response.json()
+        for parsed_data in feeds:
             for dog_dict in parsed_data['animals']:
                 dog_dict['timestamp'] = timestamp_mt_iso
                 dog_id = dog_dict['nid'] 
@@ -366,50 +411,36 @@ class ShelterScraper:
         """
         Scrape location from public url and update
         """
-        base_url = "https://new.shelterluv.com/embed/animal/"
-
         #Declare a handler so you can call functions in the ElasticsearchHandler class
         handler = ElasticsearchHandler("http://localhost:9200", idxA) 
-        #dog_doc = handler.get_dog_by_id(dog_id) 
-        #print(f"document returned from Elastic is: {dog_doc}")
-
-        url = f"{base_url}{delisted_dog_id}"
-        try: 
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-        except Exception as e:
-            print(f"Failed to fetch {url}: {e}")
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        iframe_animal_tag = soup.find("iframe-animal")
+        status = get_live_status_checker().check(delisted_dog_id)
+        if status.error or (status.location is None and not status.is_adopted):
+            print(f"Couldn't read the live status of dog {delisted_dog_id}")
+            return
 
-        if iframe_animal_tag and ":animal" in iframe_animal_tag.attrs:
-            animal_attr = iframe_animal_tag[":animal"]
-            animal_json_str = html.unescape(animal_attr)
-            animal_data = json.loads(animal_json_str)
-            location = animal_data.get("location","")
-            #print(f"extracted location: {location}")
-            
-        if not location:
+        if status.is_adopted:
             fields_to_update = {"status":"adopted", "location":""}
             handler.update_dog_fields(idxA, delisted_dog_id, fields_to_update)
         else:
-            fields_to_update = {"location":location}
+            fields_to_update = {"location":status.location}
             handler.update_dog_fields(idxA, delisted_dog_id, fields_to_update)
 
     def scrape_dog_location(self, url):
-        try: 
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-        except Exception as e:
-            print(f"Failed to fetch {url}: {e}")
-        
-        soup = BeautifulSoup(response.text, "html.parser")
-        iframe_animal_tag = soup.find("iframe-animal")
-    
-        if iframe_animal_tag and ":animal" in iframe_animal_tag.attrs:
-            animal_attr = iframe_animal_tag[":animal"]
-            animal_json_str = html.unescape(animal_attr)
-            animal_data = json.loads(animal_json_str)
-            location = animal_data.get("location","")
-        return location
+        """The dog's current location from its page ("" once adopted, None if it couldn't be read)."""
+        return self.scrape_dog_locations([url]).get(url)
+
+    def scrape_dog_locations(self, urls):
+        """{url: location} for many dog pages at once (see live_status.py); pages without a readable location are left out."""
+        ids = {url: dog_id_from_url(url) for url in urls}
+        statuses = get_live_status_checker().check_many_sync(dog_id for dog_id in ids.values() if dog_id is not None)
+        locations = {}
+        for url, dog_id in ids.items():
+            status = statuses.get(dog_id)
+            if status is None or status.error:
+                continue
+            # No :animal data and no adoption wording: we don't know where the dog is
+            if status.location is None and not status.is_adopted:
+                continue
+            locations[url] = "" if status.is_adopted else status.location
+        return locations
@@ -0,0 +1,177 @@
+"""
+Delta snapshot storage.
+
+In delta mode a scrape only writes the dogs that were added or changed since the
+previous scrape, into a monthly animal-humane-deltas-YYYYMM index, plus a small
+manifest document listing every dog on the site at that scrape. The full view of
+any scrape is rebuilt from its manifest and the newest delta record per dog at or
+before that scrape (see ElasticsearchHandler.get_scrape_view).
+
+The first delta scrape of each month writes every dog (a keyframe), so each
+monthly delta index can be rebuilt on its own.
+
+Whether a dog changed is decided by a hash of its record without the volatile
+fields (content_hash), stored in dog-state alongside the record. A scrape where
+nothing changed can be recorded as an "unchanged" manifest pointing at the scrape
+it repeats, with no records written at all.
+"""
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+
+import pytz
+
+FULL = "full"
+DELTA = "delta"
+STORAGE_MODES = (FULL, DELTA)
+# Manifest mode for a scrape identical to an earlier one (see ElasticsearchHandler.push_dogs_to_elasticsearch)
+UNCHANGED = "unchanged"
+
+DELTA_INDEX_PREFIX = "animal-humane-deltas-"
+MANIFEST_INDEX = "dog-snapshot-manifests"
+
+# Fields that change every scrape without anything about the dog changing
+VOLATILE_FIELDS = ("timestamp", "length_of_stay_days", "scrape")
+_NOT_CONTENT = VOLATILE_FIELDS + ("content_hash",)
+
+_SCRAPE_NAME = re.compile(r'^animal-humane-(\d{8})-(\d{4})$')
+
+DELTA_INDEX_MAPPING = {
+    "mappings": {
+        "properties": {
+            "id": {"type": "long"},
+            # Mapped the way dynamic mapping maps it in full snapshot indices, so
+            # sorts on scrape.keyword work across both kinds of index
+            "scrape": {"type": "text", "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}},
+            "timestamp": {"type": "date"}
+        }
+    }
+}
+
+MANIFEST_MAPPING = {
+    "mappings": {
+        "properties": {
+            "scrape": {"type": "keyword"},
+            "mode": {"type": "keyword"},
+            "timestamp": {"type": "date"},
+            "storage_index": {"type": "keyword"},
+            "same_as": {"type": "keyword"},
+            "keyframe": {"type": "boolean"},
+            "dog_ids": {"type": "long"},
+            "added": {"type": "long"},
+            "changed": {"type": "long"},
+            "removed": {"type": "long"},
+            "dog_count": {"type": "integer"},
+            "written_count": {"type": "integer"}
+        }
+    }
+}
+
+
+def delta_index_for(scrape):
+    """animal-humane-20260110-0900 -> animal-humane-deltas-202601"""
+    match = _SCRAPE_NAME.match(scrape)
+    if not match:
+        raise ValueError(f"Not a scrape name: {scrape}")
+    return f"{DELTA_INDEX_PREFIX}{match.group(1)[:6]}"
+
+
+def scrape_name_at(moment, time_zone="America/Denver"):
+    """
+    Name a scrape taken at `moment` would have (animal-humane-YYYYMMDD-HHMM). Scrape
+    names use shelter local time, so aware datetimes are converted first; naive ones
+    are taken as already local.
+    """
+    if isinstance(moment, str):
+        moment = datetime.fromisoformat(moment.replace("Z", "+00:00"))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(pytz.timezone(time_zone)).replace(tzinfo=None)
+    return f"animal-humane-{moment.strftime('%Y%m%d-%H%M')}"
+
+
+def content_hash(record):
+    """Hash of everything in a record except the volatile fields."""
+    content = {key: value for key, value in record.items() if key not in _NOT_CONTENT}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def record_changed(record, previous):
+    """True if anything other than the volatile fields differs from the previous record."""
+    if previous is None:
+        return True
+    if previous.get("content_hash"):
+        return content_hash(record) != previous["content_hash"]
+    # States written before hashes existed (or since edited by a correction)
+    for key, value in record.items():
+        if key in _NOT_CONTENT:
+            continue
+        if previous.get(key) != value:
+            return True
+    return False
+
+
+def plan_delta(previous_states, records, keyframe=False):
+    """
+    Work out what a delta scrape has to write.
+
+    Args:
+        previous_states: {str(dog_id): latest record} (dog-state).
+        records: Records from the new scrape.
+        keyframe: Write every record regardless of changes.
+
+    Returns:
+        (records_to_write, added_ids, changed_ids, removed_ids)
+    """
+    to_write, added, changed = [], [], []
+    current_ids = set()
+    for record in records:
+        dog_id = record.get('id')
+        if dog_id is None:
+            continue
+        current_ids.add(str(dog_id))
+        previous = previous_states.get(str(dog_id))
+        if previous is None or previous.get('listed') is False:
+            added.append(dog_id)
+            to_write.append(record)
+        elif record_changed(record, previous):
+            changed.append(dog_id)
+            to_write.append(record)
+        elif keyframe:
+            to_write.append(record)
+
+    removed = [
+        state.get('id', int(dog_id)) for dog_id, state in previous_states.items()
+        if dog_id not in current_ids and state.get('listed')
+    ]
+    return to_write, added, changed, removed
+
+
+def is_unchanged(added, changed, removed):
+    """True when a scrape's plan_delta result shows nothing happened since the previous scrape."""
+    return not (added or changed or removed)
+
+
+def build_manifest(scrape, mode, records, storage_index, added=None, changed=None, removed=None,
+                   written_count=None, keyframe=False, same_as=None):
+    dog_ids = [r['id'] for r in records if r.get('id') is not None]
+    timestamp = next(
+        (r.get('timestamp') for r in records if r.get('timestamp')),
+        datetime.now(timezone.utc).isoformat()
+    )
+    manifest = {
+        "scrape": scrape,
+        "mode": mode,
+        "timestamp": timestamp,
+        "storage_index": storage_index,
+        "keyframe": keyframe,
+        "dog_ids": dog_ids,
+        "added": added or [],
+        "changed": changed or [],
+        "removed": removed or [],
+        "dog_count": len(dog_ids),
+        "written_count": len(dog_ids) if written_count is None else written_count
+    }
+    if same_as:
+        manifest["same_as"] = same_as
+    return manifest
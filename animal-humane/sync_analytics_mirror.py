@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Copy scrape history from Elasticsearch into the local SQLite analytics mirror.
+The scheduler keeps it current after each scrape when ANALYTICS_BACKEND=sqlite;
+run this once to build it from scratch, or with --rebuild to start over.
+"""
+import argparse
+import os
+
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rebuild', action='store_true', help='Re-copy every scrape and event')
+    args = parser.parse_args()
+
+    es_host = os.getenv('ELASTICSEARCH_HOST', 'http://localhost:9200')
+    handler = ElasticsearchHandler(host=es_host, index_name="animal-humane-latest")
+
+    print(f"📊 Syncing analytics mirror {handler.analytics_mirror.path} from {es_host}")
+    synced = handler.sync_analytics_mirror(rebuild=args.rebuild)
+    print(f"✅ {synced} scrapes copied")
+
+if __name__ == "__main__":
+    main()
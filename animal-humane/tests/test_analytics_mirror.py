@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from shelterdog_tracker.analytics_mirror import AnalyticsMirror
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+
+
+def _record(dog_id, name, status, timestamp, origin='Stray', age_group='Adult'):
+    return {'id': dog_id, 'name': name, 'status': status, 'timestamp': timestamp,
+            'origin': origin, 'age_group': age_group}
+
+
+class DummyHandler:
+    def __init__(self, views, events=None):
+        self.views = views
+        self.events = events
+        self.viewed = []
+
+    def list_scrapes(self):
+        return sorted(self.views)
+
+    def get_scrape_view(self, scrape, source=None):
+        self.viewed.append(scrape)
+        return {r['id']: r for r in self.views[scrape]}
+
+    def get_events(self, event_types=None, since=None):
+        return self.events
+
+
+def test_sync_copies_new_scrapes_and_resyncs_recent_ones(tmp_path):
+    mirror = AnalyticsMirror(str(tmp_path / 'mirror.sqlite3'))
+    handler = DummyHandler({
+        'animal-humane-20260101-0900': [_record(1, 'Nova', 'Available', '2026-01-01T09:00:00-07:00')],
+        'animal-humane-20260110-0900': [_record(1, 'Nova', 'adopted', '2026-01-10T09:00:00-07:00')],
+    })
+
+    assert mirror.sync(handler, today=datetime(2026, 1, 12)) == 2
+    handler.viewed = []
+    mirror.sync(handler, today=datetime(2026, 1, 12))
+
+    # Only the scrape inside the resync window is copied again
+    assert handler.viewed == ['animal-humane-20260110-0900']
+
+
+def test_chart_queries_match_elasticsearch_shapes(tmp_path):
+    mirror = AnalyticsMirror(str(tmp_path / 'mirror.sqlite3'))
+    mirror.write_scrape('animal-humane-20260105-0900', [
+        _record(1, 'Nova', 'adopted', '2026-01-05T09:00:00-07:00', age_group='Puppy'),
+        _record(2, 'Kia', 'Available', '2026-01-05T09:00:00-07:00'),
+    ])
+    mirror.write_scrape('animal-humane-20260107-2300', [
+        # 23:00 Mountain on the 7th is the 8th in UTC, but the chart buckets at -07:00
+        _record(2, 'Kia', 'adopted', '2026-01-08T06:00:00+00:00'),
+    ])
+
+    assert mirror.adoptions_per_day() == [
+        {'date': '01/05/2026', 'count': 1, 'names': ['Nova']},
+        {'date': '01/06/2026', 'count': 0, 'names': []},
+        {'date': '01/07/2026', 'count': 1, 'names': ['Kia']},
+    ]
+    assert mirror.weekly_age_group_adoptions() == [
+        {'week': '01/05/2026', 'Puppy': 1, 'Adult': 1, 'Senior': 0},
+    ]
+    assert mirror.adoption_rates_per_origin() == [('Stray', 100.0)]
+
+
+def test_handler_answers_charts_from_mirror_when_configured(tmp_path, monkeypatch):
+    monkeypatch.setenv('ANALYTICS_BACKEND', 'sqlite')
+    monkeypatch.setenv('ANALYTICS_DB_PATH', str(tmp_path / 'mirror.sqlite3'))
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.analytics_mirror.write_scrape('animal-humane-20260105-0900', [
+        _record(1, 'Nova', 'adopted', '2026-01-05T09:00:00-07:00', origin='Aztec Animal Shelter'),
+        _record(2, 'Kia', 'Available', '2026-01-05T09:00:00-07:00', origin='Aztec Animal Shelter'),
+    ])
+
+    def fail(*args, **kwargs):
+        raise AssertionError('Elasticsearch should not be queried')
+    monkeypatch.setattr(handler.es, 'search', fail)
+
+    assert handler.get_adoption_percentages_per_origin() == [{
+        'latitude': 36.8305, 'longitude': -108.0095,
+        'locationName': 'Aztec Animal Shelter', 'adoptionRate': 50.0
+    }]
@@ -0,0 +1,39 @@
+import asyncio
+
+import api.main
+from api.main import app, get_dog_service, get_elasticsearch_service, lifespan
+from config import ElasticsearchConfig
+from services.elasticsearch_service import client_options
+
+
+class DummyService:
+    instances = []
+
+    def __init__(self, es_config):
+        self.es_config = es_config
+        self.closed = False
+        DummyService.instances.append(self)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_lifespan_shares_one_service_across_requests(monkeypatch):
+    monkeypatch.setattr(api.main, 'ElasticsearchService', DummyService)
+
+    async def run():
+        async with lifespan(app):
+            first, second = get_elasticsearch_service(), get_elasticsearch_service()
+            assert first is second
+            assert get_dog_service(first).es_service is first
+            return first
+
+    service = asyncio.run(run())
+    assert DummyService.instances == [service]
+    assert service.closed
+
+
+def test_client_options_size_the_pool_from_config():
+    options = client_options(ElasticsearchConfig(timeout=30, max_retries=5, pool_maxsize=16))
+    assert options['connections_per_node'] == 16
+    assert options['request_timeout'] == 30 and options['max_retries'] == 5
@@ -0,0 +1,51 @@
+import asyncio
+
+from elasticsearch import exceptions as es_exceptions
+
+from shelterdog_tracker import async_elasticsearch_handler
+from shelterdog_tracker.async_elasticsearch_handler import AsyncElasticsearchHandler
+from shelterdog_tracker.elasticsearch_handler import DOG_STATE_INDEX, LatestDoc
+
+
+class DummyAsyncES:
+    """Just enough of AsyncElasticsearch for the collapsed latest-docs search."""
+    def __init__(self, docs_by_id):
+        self.docs_by_id = docs_by_id
+        self.closed = []
+
+    async def open_point_in_time(self, index, keep_alive):
+        return {'id': 'pit-0'}
+
+    async def close_point_in_time(self, body):
+        self.closed.append(body['id'])
+
+    async def search(self, body):
+        hits = [{
+            'fields': {'id': [dog_id]},
+            'sort': [dog_id],
+            'inner_hits': {'latest': {'hits': {'hits': [
+                {'_index': index, '_id': str(dog_id), '_source': source}
+            ]}}}
+        } for dog_id, (index, source) in sorted(self.docs_by_id.items())]
+        return {'pit_id': 'pit-1', 'hits': {'hits': hits}}
+
+
+def test_async_availables_fall_back_to_latest_docs_before_dog_state_exists(monkeypatch):
+    async def missing_dog_state(es, index, **kwargs):
+        assert index == DOG_STATE_INDEX
+        raise es_exceptions.NotFoundError(404, 'index_not_found_exception', {})
+        yield
+
+    monkeypatch.setattr(async_elasticsearch_handler, 'async_scan', missing_dog_state)
+    es = DummyAsyncES({
+        1: ('animal-humane-20260110-1100', {'id': 1, 'name': 'Biscuit', 'status': 'Available', 'location': 'Main'}),
+        2: ('animal-humane-20260110-1100', {'id': 2, 'name': 'Pepper', 'status': 'adopted', 'location': ''}),
+    })
+    handler = AsyncElasticsearchHandler('http://localhost:9200', client=es)
+
+    availables = asyncio.run(handler.get_current_availables())
+
+    assert [(dog['dog_id'], dog['name']) for dog in availables] == [(1, 'Biscuit')]
+    assert es.closed == ['pit-1']
+    assert asyncio.run(handler.latest_docs([2]))[2] == LatestDoc(
+        'animal-humane-20260110-1100', '2', es.docs_by_id[2][1])
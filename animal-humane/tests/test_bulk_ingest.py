@@ -0,0 +1,60 @@
+import json
+
+from shelterdog_tracker import bulk_ingest as bulk_ingest_module
+from shelterdog_tracker.bulk_ingest import bulk_ingest, read_bulk_ndjson
+
+
+class DummyES:
+    """Bulk endpoint that rejects dog 2 with 429 once and dog 3 for good."""
+    def __init__(self):
+        self.requests = []
+        self.rejected = set()
+
+    def bulk(self, operations, refresh=None):
+        ops = [json.loads(line) for line in operations[::2]]
+        ids = [op['index']['_id'] for op in ops]
+        self.requests.append((ids, refresh))
+        items = []
+        for dog_id in ids:
+            if dog_id == 2 and dog_id not in self.rejected:
+                self.rejected.add(dog_id)
+                items.append({'index': {'_index': 'dogs', '_id': dog_id, 'status': 429}})
+            elif dog_id == 3:
+                items.append({'index': {'_index': 'dogs', '_id': dog_id, 'status': 400,
+                                        'error': {'type': 'mapper_parsing_exception'}}})
+            else:
+                items.append({'index': {'_index': 'dogs', '_id': dog_id, 'status': 201}})
+        return {'errors': True, 'items': items}
+
+
+def test_bulk_ingest_chunks_retries_429s_and_refreshes_only_the_last_chunk(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(bulk_ingest_module.time, 'sleep', sleeps.append)
+    es = DummyES()
+    actions = ({'_index': 'dogs', '_id': dog_id, '_source': {'id': dog_id}} for dog_id in range(1, 6))
+
+    result = bulk_ingest(es, actions, chunk_size=2, workers=1)
+
+    assert result.indexed == 4 and result.chunks == 3
+    assert result.failed == [{'_index': 'dogs', '_id': 3, 'status': 400,
+                              'error': {'type': 'mapper_parsing_exception'}}]
+    # Only the rejected document is resent, after a backoff
+    assert es.requests == [([1, 2], None), ([2], None), ([3, 4], None), ([5], 'wait_for')]
+    assert sleeps == [1]
+
+
+def test_chunks_respect_max_bytes_and_archived_files_parse(tmp_path):
+    archive = tmp_path / 'animal-humane-07142025-10h27m.ndjson'
+    archive.write_text(
+        '{"index": {"_index": "animal-humane-07142025-10h27m","_id": "1"}}\n'
+        '{"id" : 1,"name":"Nova"}\n'
+        '\n'
+        '{"index":{"_index":"animal-humane-07142025-10h27m","_id":"2"}}\n'
+        '{"id" : 2,"name":"Snoopy"}\n'
+    )
+    actions = list(read_bulk_ndjson(archive))
+    assert actions[1] == {'_op_type': 'index', '_index': 'animal-humane-07142025-10h27m', '_id': '2',
+                          '_source': {'id': 2, 'name': 'Snoopy'}}
+
+    chunks = list(bulk_ingest_module.iter_chunks(actions, chunk_size=100, max_chunk_bytes=100))
+    assert [len(chunk) for chunk in chunks] == [1, 1]
@@ -0,0 +1,79 @@
+from shelterdog_tracker import elasticsearch_handler
+from shelterdog_tracker.elasticsearch_handler import DOG_STATE_INDEX, ElasticsearchHandler, LatestDoc
+
+
+def test_apply_corrections_bulk_updates_latest_docs_and_reports_failures(monkeypatch):
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.latest_docs = lambda ids, fields=None: {
+        1: LatestDoc('animal-humane-20260110-1100', '1', {}),
+        2: LatestDoc('animal-humane-daily-20260101', 'animal-humane-20260101-0900-2', {}),
+    }
+    adopted = []
+    handler.record_adoption_events = lambda updates: adopted.append(sorted(updates))
+    blocks = []
+
+    class Indices:
+        def put_settings(self, index, body):
+            blocks.append((index, body['index.blocks.write']))
+
+    class ES:
+        indices = Indices()
+
+    handler.es = ES()
+    sent = []
+
+    def fake_bulk(es, actions, **kwargs):
+        actions = list(actions)
+        sent.append((actions, kwargs))
+        if actions[0]['_index'] == DOG_STATE_INDEX:
+            return len(actions), []
+        # The block was put back before dog 2's update landed
+        return 1, [{'update': {'_index': 'animal-humane-daily-20260101', '_id': 'animal-humane-20260101-0900-2',
+                               'status': 403, 'error': {'type': 'cluster_block_exception'}}}]
+
+    monkeypatch.setattr(elasticsearch_handler.helpers, 'bulk', fake_bulk)
+
+    outcome = handler.apply_corrections([
+        (1, {'location': ''}), ('1', {'status': 'adopted'}), (2, {'returned': 1}), (3, {'location': 'Foster'}),
+    ])
+
+    corrections, kwargs = sent[0]
+    assert corrections[0] == {
+        '_op_type': 'update', '_index': 'animal-humane-20260110-1100', '_id': '1',
+        'doc': {'location': '', 'status': 'adopted'}, 'retry_on_conflict': 3
+    }
+    assert kwargs['max_retries'] == 3 and kwargs['raise_on_error'] is False
+    assert outcome['updated'] == {1: ('animal-humane-20260110-1100', {'location': '', 'status': 'adopted'})}
+    assert outcome['failed'] == {2: {'type': 'cluster_block_exception'}}
+    assert outcome['missing'] == [3]
+    # Only the applied correction is mirrored into dog-state, and it was an adoption
+    assert [a['_id'] for a in sent[1][0]] == ['1']
+    assert adopted == [[1]]
+    # The compacted index was only writable for the bulk
+    assert blocks == [('animal-humane-daily-20260101', False), ('animal-humane-daily-20260101', True)]
+
+
+def test_dogs_in_compacted_indices_that_stay_read_only_are_skipped(monkeypatch):
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.latest_docs = lambda ids, fields=None: {
+        1: LatestDoc('animal-humane-20260110-1100', '1', {}),
+        2: LatestDoc('animal-humane-monthly-202512', 'animal-humane-20251201-0900-2', {}),
+    }
+    handler.record_adoption_events = lambda updates: None
+
+    class Indices:
+        def put_settings(self, index, body):
+            raise RuntimeError('security_exception')
+
+    class ES:
+        indices = Indices()
+
+    handler.es = ES()
+    sent = []
+    monkeypatch.setattr(elasticsearch_handler.helpers, 'bulk',
+                        lambda es, actions, **kwargs: sent.append(list(actions)) or (len(sent[-1]), []))
+
+    outcome = handler.apply_corrections([(1, {'location': ''}), (2, {'location': ''})])
+
+    assert [action['_id'] for action in sent[0]] == ['1']
+    assert list(outcome['updated']) == [1] and outcome['failed'] == {2: 'security_exception'}
@@ -0,0 +1,71 @@
+from shelterdog_tracker import elasticsearch_handler
+from shelterdog_tracker.dog_events import detect_events, advance_states, DOG_EVENTS_INDEX
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+
+
+def _events_by_dog(events):
+    return {(e['dog_id'], e['event']) for e in events}
+
+
+def test_detect_events_covers_each_transition():
+    previous = {
+        '1': {'id': 1, 'status': 'Available', 'location': 'MKN-18', 'listed': True},
+        '2': {'id': 2, 'status': 'adopted', 'location': '', 'listed': False},
+        '3': {'id': 3, 'status': 'Available', 'location': 'MKS-02', 'listed': False},
+        '4': {'id': 4, 'status': 'Available', 'location': 'MKS-05', 'listed': True},
+        '5': {'id': 5, 'status': 'Available', 'location': 'Foster', 'listed': True},
+    }
+    current = [
+        {'id': 1, 'status': 'Available', 'location': 'MKN-18'},
+        {'id': 2, 'status': 'Available', 'location': 'MKS-01'},
+        {'id': 3, 'status': 'Available', 'location': 'MKS-02'},
+        {'id': 4, 'status': 'Available', 'location': 'Main Campus, Trial Adoption'},
+        {'id': 6, 'status': 'Available', 'location': 'MKN-01', 'timestamp': '2026-01-10T09:00:00-07:00'},
+    ]
+
+    events = detect_events(previous, current, 'animal-humane-20260110-0900')
+
+    assert _events_by_dog(events) == {
+        (2, 'returned'),
+        (3, 'relisted'),
+        (4, 'trial_started'),
+        (5, 'delisted'),
+        (6, 'intake'),
+    }
+    assert all(e['timestamp'] == '2026-01-10T09:00:00-07:00' for e in events)
+
+
+def test_replaying_scrapes_detects_adoption_then_delisting():
+    states = {}
+    scrapes = [
+        ('animal-humane-20260110-0900', [{'id': 7, 'status': 'Available', 'location': 'MKN-02'}]),
+        ('animal-humane-20260110-1100', [{'id': 7, 'status': 'adopted', 'location': ''}]),
+        ('animal-humane-20260110-1300', []),
+    ]
+
+    events = []
+    for index, records in scrapes:
+        events += detect_events(states, records, index, timestamp=index)
+        advance_states(states, records, index)
+
+    assert [(e['scrape'][-4:], e['event']) for e in events] == [
+        ('0900', 'intake'), ('1100', 'adopted'), ('1300', 'delisted')
+    ]
+
+
+def test_get_events_returns_none_without_events_index(monkeypatch):
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    queries = []
+
+    def missing_scan(es, index, query, **kwargs):
+        queries.append((index, query))
+        raise elasticsearch_handler.es_exceptions.NotFoundError("index_not_found_exception", meta=None, body=None)
+
+    monkeypatch.setattr(elasticsearch_handler, 'scan', missing_scan)
+
+    assert handler.get_events(event_types=['adopted'], since='now-7d/d') is None
+    index, query = queries[0]
+    assert index == DOG_EVENTS_INDEX
+    filters = query['query']['bool']['filter']
+    assert {'terms': {'event': ['adopted']}} in filters
+    assert filters[1]['range']['timestamp']['gte'] == 'now-7d/d'
@@ -0,0 +1,53 @@
+from datetime import date
+
+from shelterdog_tracker.dog_history import DogHistory
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+
+
+def test_dog_history_tracks_first_day_and_adoptions(tmp_path):
+    history = DogHistory.build({'5': 'animal-humane-20260110-0900', '3': 'animal-humane-20260109-1900'},
+                               adopted_ids=[3])
+    history.add_scrape('animal-humane-20260111-0900', [3, 7])
+    history.add_scrape('animal-humane-20260108-1100', [5])  # a late backfill moves first_seen earlier
+
+    assert history.through == 'animal-humane-20260111-0900'
+    assert history.seen_before(5, date(2026, 1, 9)) and history.seen_before(3, '20260110')
+    assert not history.seen_before(7, date(2026, 1, 11)) and history.ever_seen(7)
+    assert not history.ever_seen(8)
+    assert history.ever_adopted(3) and not history.ever_adopted(5)
+
+    path = str(tmp_path / 'history.npz')
+    history.save(path)
+    loaded = DogHistory.load(path)
+    assert loaded.through == history.through
+    assert list(loaded.seen_ids) == [3, 5, 7] and list(loaded.first_days) == [20260109, 20260108, 20260111]
+    assert DogHistory.load(str(tmp_path / 'missing.npz')).through is None
+
+
+def test_handler_answers_from_sidecar_and_rebuilds_only_when_behind(tmp_path, monkeypatch):
+    monkeypatch.setenv('DOG_HISTORY_PATH', str(tmp_path / 'history.npz'))
+
+    class Catalog:
+        latest = 'animal-humane-20260110-0900'
+
+        def latest_scrape(self):
+            return self.latest
+
+    catalog = Catalog()
+    rebuilds = []
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    monkeypatch.setattr(ElasticsearchHandler, 'index_catalog', property(lambda self: catalog))
+
+    def rebuild():
+        rebuilds.append(catalog.latest)
+        return DogHistory.build({'1': 'animal-humane-20260101-0900'}, adopted_ids=[1], through=catalog.latest)
+
+    handler.rebuild_dog_history = rebuild
+    handler.es = None  # no per-dog searches
+
+    assert handler.has_been_seen_before('1')
+    assert not handler.has_been_seen_before('2')
+    assert rebuilds == ['animal-humane-20260110-0900']
+    catalog.latest = 'animal-humane-20260110-1100'
+    assert handler.get_dog_history().ever_adopted(1)
+    assert len(rebuilds) == 2
@@ -0,0 +1,52 @@
+from shelterdog_tracker.dog_id_sets import ScrapeIdSets, day_start, difference
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+
+
+def test_union_and_difference_over_scrape_ranges(tmp_path):
+    id_sets = ScrapeIdSets({
+        'animal-humane-20260109-1900': [3, 1, 2],
+        'animal-humane-20260110-0900': [2, 3, 4],
+        'animal-humane-20260110-1100': [4, 5],
+    })
+
+    today = day_start('20260110')
+    assert list(id_sets.union(start=today)) == [2, 3, 4, 5]
+    assert list(id_sets.seen_before(today)) == [1, 2, 3]
+    assert list(difference(id_sets.union(start=today), id_sets.seen_before(today))) == [4, 5]
+
+    path = str(tmp_path / 'ids.npz')
+    id_sets.save(path)
+    loaded = ScrapeIdSets.load(path)
+    assert loaded.scrapes == id_sets.scrapes
+    assert list(loaded.ids_at('animal-humane-20260110-1100')) == [4, 5]
+
+
+def test_get_scrape_id_sets_reads_only_scrapes_missing_from_sidecar(tmp_path):
+    requested = []
+
+    class DummyES:
+        def mget(self, index, ids, _source):
+            requested.append(list(ids))
+            return {'docs': [{'_id': i, 'found': True, '_source': {'dog_ids': [int(i[-4:])]}} for i in ids]}
+
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.es = DummyES()
+    scrapes = ['animal-humane-20260110-0900', 'animal-humane-20260110-1100']
+    handler.list_scrapes = lambda: scrapes
+    sidecar = str(tmp_path / 'ids.npz')
+
+    assert len(handler.get_scrape_id_sets(sidecar_path=sidecar)) == 2
+    scrapes.append('animal-humane-20260110-1300')
+    id_sets = handler.get_scrape_id_sets(sidecar_path=sidecar)
+
+    assert requested == [scrapes[:2], scrapes[2:]]
+    assert list(id_sets.union()) == [900, 1100, 1300]
+
+
+def test_unreadable_sidecar_is_logged_and_ignored(tmp_path, caplog):
+    path = tmp_path / 'scrape_id_sets.npz'
+    path.write_bytes(b'not an npz')
+
+    with caplog.at_level('WARNING', logger='shelterdog_tracker.dog_id_sets'):
+        assert len(ScrapeIdSets.load(str(path))) == 0
+    assert 'Ignoring unreadable id set sidecar' in caplog.text
@@ -0,0 +1,170 @@
+from elasticsearch import exceptions as es_exceptions
+
+from shelterdog_tracker import elasticsearch_handler
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler, DOG_STATE_INDEX
+from shelterdog_tracker.dog import Dog
+
+
+def test_get_current_availables_reads_dog_state(monkeypatch):
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    scanned = []
+
+    def fake_scan(es, index, query, **kwargs):
+        scanned.append(index)
+        return iter([
+            {'_source': {'id': 1, 'name': 'Nova', 'status': 'Available', 'location': 'MKN-18'}},
+            {'_source': {'id': 2, 'name': 'Kia', 'status': 'adopted', 'location': ''}},
+        ])
+
+    monkeypatch.setattr(elasticsearch_handler, 'scan', fake_scan)
+
+    avail = handler.get_current_availables()
+
+    assert scanned == [DOG_STATE_INDEX]
+    assert [d['dog_id'] for d in avail] == [1]
+    assert avail[0]['name'] == 'Nova'
+
+
+def test_get_dog_states_falls_back_to_snapshots_when_missing(monkeypatch):
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+
+    def missing_scan(es, index, query, **kwargs):
+        raise es_exceptions.NotFoundError("index_not_found_exception", meta=None, body=None)
+
+    class DummyES:
+        def search(self, index, body):
+            # One composite bucket per dog, newest record as its top hit
+            assert 'after' not in body['aggs']['dogs']['composite']
+            return {'hits': {'hits': []}, 'aggregations': {'dogs': {'buckets': [
+                {'key': {'id': 1}, 'latest': {'hits': {'hits': [{'_source': {'id': 1, 'status': 'adopted'}}]}}},
+            ]}}}
+
+    monkeypatch.setattr(elasticsearch_handler, 'scan', missing_scan)
+    handler.es = DummyES()
+
+    states = handler.get_dog_states()
+
+    assert states == {'1': {'id': 1, 'status': 'adopted'}}
+
+
+def test_upsert_dog_state_sends_one_scripted_upsert_per_dog(monkeypatch):
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-20251230-1500')
+    sent = {}
+
+    class DummyIndices:
+        def exists(self, index):
+            return True
+
+    class DummyES:
+        indices = DummyIndices()
+        def update_by_query(self, **kwargs):
+            sent['delisted_query'] = kwargs['body']['query']
+
+    def fake_bulk(es, actions, **kwargs):
+        sent['actions'] = list(actions)
+        return len(sent['actions']), []
+
+    handler.es = DummyES()
+    monkeypatch.setattr(elasticsearch_handler.helpers, 'bulk', fake_bulk)
+
+    dogs = [
+        Dog(timestamp='2025-12-30T15:00:00-07:00', dog_id=1, name='Nova'),
+        Dog(timestamp='2025-12-30T15:00:00-07:00', dog_id=2, name='Kia'),
+    ]
+    handler.upsert_dog_state(dogs, 'animal-humane-20251230-1500')
+
+    actions = sent['actions']
+    assert [a['_id'] for a in actions] == ['1', '2']
+    assert all(a['_index'] == DOG_STATE_INDEX and a['scripted_upsert'] for a in actions)
+    assert actions[0]['script']['params']['index'] == 'animal-humane-20251230-1500'
+    assert actions[0]['script']['params']['record']['name'] == 'Nova'
+    assert sent['delisted_query']['bool']['must_not'] == [{'terms': {'id': [1, 2]}}]
+
+
+def test_upsert_dog_state_only_touches_unchanged_dogs(monkeypatch):
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-20251230-1700')
+    touched = []
+
+    class DummyIndices:
+        def exists(self, index):
+            return True
+
+    class DummyES:
+        indices = DummyIndices()
+        def update_by_query(self, **kwargs):
+            touched.append(kwargs['body'])
+
+    def fake_bulk(es, actions, **kwargs):
+        actions = list(actions)
+        touched.append([a['_id'] for a in actions])
+        return len(actions), []
+
+    handler.es = DummyES()
+    monkeypatch.setattr(elasticsearch_handler.helpers, 'bulk', fake_bulk)
+
+    dogs = [
+        {'id': 1, 'name': 'Nova', 'timestamp': '2025-12-30T17:00:00-07:00', 'length_of_stay_days': 9},
+        {'id': 2, 'name': 'Kia', 'timestamp': '2025-12-30T17:00:00-07:00', 'location': 'Main Campus, Trial Adoption'},
+    ]
+    handler.upsert_dog_state(dogs, 'animal-humane-20251230-1700', unchanged_ids={'1'}, mark_delisted=False)
+
+    touch, upserted = touched
+    # One update_by_query moves the unchanged dog forward with just its volatile fields
+    assert touch['query'] == {'ids': {'values': ['1']}}
+    assert touch['script']['params']['volatile'] == {
+        '1': {'timestamp': '2025-12-30T17:00:00-07:00', 'length_of_stay_days': 9}
+    }
+    assert upserted == ['2']
+
+
+def test_get_first_seen_uses_one_composite_aggregation_without_dog_state():
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    searches = []
+
+    class DummyIndices:
+        def exists(self, index):
+            return False
+
+    class DummyES:
+        indices = DummyIndices()
+
+        def search(self, index, body):
+            searches.append(body)
+            return {'aggregations': {'dogs': {'buckets': [
+                {'key': {'id': 1}, 'earliest': {'hits': {'hits': [{
+                    '_index': 'animal-humane-monthly-202512',
+                    '_source': {'name': 'Nova', 'scrape': 'animal-humane-20251201-0900',
+                                'timestamp': '2025-12-01T09:00:00-07:00'}
+                }]}}},
+            ]}}}
+
+    handler.es = DummyES()
+
+    first_seen = handler.get_first_seen([1, 2])
+
+    assert len(searches) == 1
+    assert searches[0]['query'] == {'terms': {'id': [1, 2]}}
+    assert first_seen == {'1': {'id': 1, 'name': 'Nova', 'first_seen': '2025-12-01T09:00:00-07:00',
+                                'first_index': 'animal-humane-20251201-0900'}}
+
+
+def test_ingest_leaves_dog_state_to_the_rebuild(monkeypatch):
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-20251230-1500')
+    calls = []
+
+    class DummyIndices:
+        def exists(self, index):
+            return False
+
+        def create(self, index, body):
+            calls.append(('create', index))
+
+    class DummyES:
+        indices = DummyIndices()
+
+    handler.es = DummyES()
+    monkeypatch.setattr(elasticsearch_handler.helpers, 'bulk', lambda *args, **kwargs: calls.append('bulk'))
+
+    # A first scrape after deploy must not build dog-state from itself alone
+    assert handler.upsert_dog_state([{'id': 1, 'name': 'Nova'}], 'animal-humane-20251230-1500') == 0
+    assert calls == []
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from shelterdog_tracker.feed_fetcher import FeedFetchError, FeedFetcher, rebase_url
+
+
+class DummyResponse:
+    def __init__(self, status, body=None):
+        self.status = status
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type=None):
+        return self.body
+
+
+class DummySession:
+    """Stand-in ShelterLuv: query 2 is slow, query 3 returns 503 once."""
+    def __init__(self):
+        self.requests = []
+        self.open = 0
+        self.max_open = 0
+        self.closed = False
+
+    def get(self, url, headers=None):
+        self.requests.append(url)
+        session = self
+
+        class Request:
+            async def __aenter__(self):
+                session.open += 1
+                session.max_open = max(session.max_open, session.open)
+                query = url.rsplit('=', 1)[-1]
+                await asyncio.sleep(0.02 if query == '2' else 0)
+                if query == '3' and session.requests.count(url) == 1:
+                    return DummyResponse(503)
+                if query == '9':
+                    return DummyResponse(404)
+                return DummyResponse(200, {'animals': [{'nid': int(query)}]})
+
+            async def __aexit__(self, *exc):
+                session.open -= 1
+                return False
+
+        return Request()
+
+    async def close(self):
+        self.closed = True
+
+
+def test_feeds_fetched_in_parallel_in_order_with_retries():
+    session = DummySession()
+    fetcher = FeedFetcher(base_url='http://127.0.0.1:8081', concurrency=2, backoff=0,
+                          session_factory=lambda: session)
+    urls = [f'https://new.shelterluv.com/embed/available-animals/1255?saved_query={q}' for q in (1, 2, 3)]
+
+    feeds = fetcher.fetch_all_sync(urls)
+
+    assert [feed['animals'][0]['nid'] for feed in feeds] == [1, 2, 3]
+    assert session.requests[0] == 'http://127.0.0.1:8081/embed/available-animals/1255?saved_query=1'
+    assert session.requests.count(session.requests[2]) == 2  # the 503 was retried
+    assert session.max_open == 2 and session.closed
+
+
+def test_unretryable_feed_failure_fails_the_scrape():
+    session = DummySession()
+    fetcher = FeedFetcher(session_factory=lambda: session, backoff=0)
+
+    with pytest.raises(FeedFetchError, match='HTTP 404'):
+        fetcher.fetch_all_sync(['https://new.shelterluv.com/embed/available-animals/1255?saved_query=9'])
+    assert session.requests == ['https://new.shelterluv.com/embed/available-animals/1255?saved_query=9']
+    assert session.closed
+    assert rebase_url('https://new.shelterluv.com/a?b=1', 'http://localhost:9000/sl/') == 'http://localhost:9000/sl/a?b=1'
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from shelterdog_tracker.feed_fetcher import FeedFetchError
+from shelterdog_tracker.feed_urls import load_feed_urls, save_feed_urls
+from shelterdog_tracker.shelter_scraper import ShelterScraper
+
+OLD = 'https://new.shelterluv.com/embed/available-animals/1255?saved_query=7'
+NEW = ['https://new.shelterluv.com/embed/available-animals/1255?saved_query=8',
+       'https://new.shelterluv.com/embed/available-animals/1255?saved_query=9']
+
+
+class DummyFetcher:
+    """Feed 7 has been retired (404); 8 and 9 work."""
+    def __init__(self):
+        self.fetched = []
+
+    def fetch_changes_sync(self, urls):
+        self.fetched.append(list(urls))
+        if OLD in urls:
+            raise FeedFetchError(f'{OLD}: HTTP 404')
+        return [{'animals': [{'nid': int(url[-1])}]} for url in urls], True
+
+
+def make_scraper(tmp_path, discovered):
+    scraper = ShelterScraper(fetcher=DummyFetcher(), feed_urls_path=str(tmp_path / 'feed_urls.json'))
+    scraper.fetch_iframe_urls_fallback = lambda: discovered.append('fallback') or NEW
+    scraper.fetch_iframe_urls = lambda: discovered.append('selenium') or NEW
+    return scraper
+
+
+def test_cached_feed_urls_skip_discovery(tmp_path):
+    discovered = []
+    scraper = make_scraper(tmp_path, discovered)
+    save_feed_urls(NEW, scraper.feed_urls_path)
+
+    feeds, _ = scraper.fetch_feeds()
+
+    assert [feed['animals'][0]['nid'] for feed in feeds] == [8, 9]
+    assert discovered == [] and scraper.fetcher.fetched == [NEW]
+
+
+def test_invalid_cache_falls_back_to_page_parser_and_persists(tmp_path):
+    discovered = []
+    scraper = make_scraper(tmp_path, discovered)
+    save_feed_urls([OLD], scraper.feed_urls_path)
+
+    assert len(scraper.fetch_feeds()[0]) == 2
+    assert discovered == ['fallback']
+    assert load_feed_urls(scraper.feed_urls_path) == NEW
+
+    # Past the age limit the set is rediscovered even though it still works
+    later = datetime.now() + timedelta(days=8)
+    assert load_feed_urls(scraper.feed_urls_path, now=later) is None
@@ -0,0 +1,117 @@
+from shelterdog_tracker.feed_fetcher import FeedFetcher
+from shelterdog_tracker.feed_validators import FeedValidators
+from scheduler.background_scheduler import AnimalHumaneScheduler
+
+ETAGGED = 'https://new.shelterluv.com/embed/available-animals/1255?saved_query=1'
+PLAIN = 'https://new.shelterluv.com/embed/available-animals/1255?saved_query=2'
+
+
+class DummyResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type=None):
+        return self.body
+
+
+class DummySession:
+    """Feed 1 sends an ETag and honours If-None-Match; feed 2 re-orders its animals every time."""
+    def __init__(self):
+        self.sent_headers = []
+        self.calls = 0
+
+    def get(self, url, headers=None):
+        self.sent_headers.append(headers)
+        self.calls += 1
+        if url == ETAGGED:
+            if headers.get('If-None-Match') == '"v1"':
+                return DummyResponse(304)
+            return DummyResponse(200, {'animals': [{'nid': 1}]}, {'ETag': '"v1"'})
+        animals = [{'nid': 2}, {'nid': 3}]
+        return DummyResponse(200, {'animals': animals if self.calls % 2 else animals[::-1]})
+
+    async def close(self):
+        pass
+
+
+def test_unchanged_feeds_are_detected_once_committed(tmp_path):
+    session = DummySession()
+    validators = FeedValidators(str(tmp_path / 'validators.json'))
+    fetcher = FeedFetcher(session_factory=lambda: session, validators=validators)
+
+    feeds, changed = fetcher.fetch_changes_sync([ETAGGED, PLAIN])
+    assert changed
+    # Nothing committed yet (e.g. indexing failed), so it still counts as a change
+    assert fetcher.fetch_changes_sync([ETAGGED, PLAIN])[1]
+
+    validators.commit()
+    fetcher.validators = FeedValidators(validators.path)
+    feeds, changed = fetcher.fetch_changes_sync([ETAGGED, PLAIN])
+    assert not changed
+    assert session.sent_headers[-2] == {'If-None-Match': '"v1"'}
+    # The 304 is answered from the kept body
+    assert feeds[0] == {'animals': [{'nid': 1}]}
+    # Dropping a feed changes the scrape even though the rest are unchanged
+    assert fetcher.fetch_changes_sync([ETAGGED])[1]
+
+
+def test_scheduler_skips_index_and_publishing_when_no_feed_changed(monkeypatch):
+    import scheduler.background_scheduler as background_scheduler
+
+    class Scraper:
+        committed = 0
+
+        def scrape_all_dogs(self, skip_if_unchanged=False):
+            return None
+
+        def commit_feed_validators(self):
+            self.committed += 1
+
+    class Handler:
+        def __init__(self, host, index_name):
+            self.index_name = index_name
+
+        def record_unchanged_scrape(self):
+            recorded.append(self.index_name)
+            return True
+
+        analytics_backend = 'elasticsearch'
+
+    published = []
+    recorded = []
+    monkeypatch.setattr(background_scheduler, 'run_orchestrator', lambda: published.append(1) or True)
+    monkeypatch.setattr(background_scheduler, 'ElasticsearchHandler', Handler)
+    scheduler = AnimalHumaneScheduler()
+    scheduler.scraper = Scraper()
+
+    assert scheduler.run_orchestrator()  # first run of the day always publishes
+    assert scheduler.scrape_and_index()
+    assert not scheduler.scrape_changed
+    # Recorded as an "unchanged" scrape, just like an unchanged push
+    assert len(recorded) == 1 and recorded[0].startswith('animal-humane-')
+    # Refreshed validators are kept even though nothing was written
+    assert scheduler.scraper.committed == 1
+    assert not scheduler.run_orchestrator()
+    assert published == [1]
+
+
+def test_record_unchanged_scrape_points_at_the_previous_scrape():
+    from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-20260110-1100')
+    handler._get_previous_states = lambda: {'1': {'last_index': 'animal-humane-20260110-0900'}}
+    handler.get_scrape_view = lambda scrape: {1: {'id': 1, 'name': 'Nova', 'scrape': scrape, 'timestamp': 'then'}}
+    recorded = []
+    handler._record_unchanged_scrape = lambda records, previous_states: recorded.append(records)
+
+    assert handler.record_unchanged_scrape()
+    (record,), = recorded
+    assert record['scrape'] == 'animal-humane-20260110-1100' and record['timestamp'] != 'then'
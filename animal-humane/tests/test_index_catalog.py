@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from shelterdog_tracker import index_catalog
+from shelterdog_tracker.index_catalog import IndexCatalog, parse_scrape_time
+
+
+class DummyIndices:
+    def __init__(self, es):
+        self.es = es
+
+    def get_alias(self, name):
+        return {self.es.alias_target: {'aliases': {name: {}}}}
+
+
+class DummyCat:
+    def __init__(self, es):
+        self.es = es
+
+    def indices(self, **kwargs):
+        self.es.listings += 1
+        return [{'index': name, 'status': 'open'} for name in self.es.index_names]
+
+
+class DummyES:
+    def __init__(self, index_names, alias_target):
+        self.index_names = index_names
+        self.alias_target = alias_target
+        self.listings = 0
+        self.indices = DummyIndices(self)
+        self.cat = DummyCat(self)
+
+    def search(self, index, body):
+        return {'hits': {'hits': [{'_source': {'scrape': 'animal-humane-20260110-1300'}}]}}
+
+
+def test_catalog_parses_and_answers_range_lookups(monkeypatch):
+    monkeypatch.setattr(index_catalog, 'scan', lambda es, **kwargs: iter([
+        {'_source': {'scrape': 'animal-humane-20260110-1300'}},  # delta-stored, no index of its own
+    ]))
+    es = DummyES([
+        'animal-humane-monthly-202511', 'animal-humane-daily-20260102', 'animal-humane-deltas-202601',
+        'animal-humane-20260109-1900', 'animal-humane-20260110-0900',
+    ], alias_target='animal-humane-20260110-0900')
+    catalog = IndexCatalog()
+    catalog.sync(es)
+
+    assert catalog.scrapes == ['animal-humane-20260109-1900', 'animal-humane-20260110-0900',
+                               'animal-humane-20260110-1300']
+    assert catalog.latest_snapshot_index() == 'animal-humane-20260110-0900'
+    assert catalog.latest_scrape() == 'animal-humane-20260110-1300'
+    assert catalog.compacted_indices == ['animal-humane-daily-20260102', 'animal-humane-monthly-202511']
+    today = datetime(2026, 1, 10)
+    assert catalog.scrapes_between(end=today) == ['animal-humane-20260109-1900']
+    assert catalog.snapshot_indices_between(start=today) == ['animal-humane-20260110-0900']
+    assert parse_scrape_time('animal-humane-20260110-1300') == datetime(2026, 1, 10, 13, 0)
+    assert parse_scrape_time('animal-humane-daily-20260102') is None
+
+
+def test_catalog_reloads_only_when_the_alias_moves(monkeypatch):
+    monkeypatch.setattr(index_catalog, 'scan', lambda es, **kwargs: iter([]))
+    es = DummyES(['animal-humane-20260110-0900'], alias_target='animal-humane-20260110-0900')
+    catalog = IndexCatalog(check_interval=0)
+
+    first = catalog.sync(es)
+    assert catalog.sync(es) == first
+    assert es.listings == 1
+
+    es.index_names.append('animal-humane-20260110-1100')
+    es.alias_target = 'animal-humane-20260110-1100'
+    assert catalog.sync(es) == first + 1
+    assert es.listings == 2
+    assert catalog.latest_snapshot_index() == 'animal-humane-20260110-1100'
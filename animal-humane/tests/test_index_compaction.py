@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import pytest
+
+from shelterdog_tracker.index_compaction import compact_into, plan_compaction
+
+
+def test_plan_compaction_groups_closed_days_and_old_months():
+    indices = [
+        'animal-humane-20260301-0900', 'animal-humane-20260301-1100',
+        'animal-humane-daily-20260102', 'animal-humane-20260103-0900',
+        'animal-humane-20260409-0900',  # inside the keep window
+        'animal-humane-deltas-202603', 'animal-humane-monthly-202512',
+    ]
+
+    plan = plan_compaction(indices, today=datetime(2026, 4, 12), keep_days=7, monthly_after_days=60)
+
+    assert plan == [
+        ('animal-humane-daily-20260301', ['animal-humane-20260301-0900', 'animal-humane-20260301-1100']),
+        ('animal-humane-monthly-202601', ['animal-humane-20260103-0900', 'animal-humane-daily-20260102']),
+    ]
+
+
+class DummyIndices:
+    def __init__(self, calls):
+        self.calls = calls
+        self.existing = set()
+
+    def exists(self, index):
+        return index in self.existing
+
+    def create(self, index, body):
+        self.calls.append(('create', index))
+
+    def put_settings(self, index, body):
+        self.calls.append(('settings', index, body))
+
+    def forcemerge(self, index, max_num_segments):
+        self.calls.append(('forcemerge', index))
+
+    def delete(self, index):
+        self.calls.append(('delete', index))
+
+    def refresh(self, index):
+        pass
+
+
+class DummyES:
+    def __init__(self, counts):
+        self.calls = []
+        self.counts = counts
+        self.indices = DummyIndices(self.calls)
+
+    def options(self, **kwargs):
+        return self
+
+    def count(self, index):
+        return {'count': self.counts[index]}
+
+    def reindex(self, body, **kwargs):
+        self.calls.append(('reindex', body['source']['index'], body['dest']['index']))
+        self.counts[body['dest']['index']] = self.copied
+
+    def update(self, **kwargs):
+        self.calls.append(('manifest', kwargs['id']))
+
+    def update_by_query(self, **kwargs):
+        pass
+
+    def delete_by_query(self, index, body, **kwargs):
+        self.calls.append(('delete_by_query', index, body['query']))
+
+
+def test_compact_into_deletes_sources_only_after_verified_copy():
+    es = DummyES({'animal-humane-20260301-0900': 3, 'animal-humane-20260301-1100': 2})
+    es.copied = 5
+
+    compact_into(es, 'animal-humane-daily-20260301', ['animal-humane-20260301-0900', 'animal-humane-20260301-1100'])
+
+    steps = [call[0] for call in es.calls]
+    # (the second create is the manifest index)
+    assert steps == ['create', 'reindex', 'create', 'manifest', 'manifest', 'forcemerge', 'settings', 'delete']
+    assert es.calls[6][2] == {'index.blocks.write': True}
+
+
+def test_compact_into_keeps_sources_when_counts_differ():
+    es = DummyES({'animal-humane-20260301-0900': 3})
+    es.copied = 2
+
+    with pytest.raises(RuntimeError):
+        compact_into(es, 'animal-humane-daily-20260301', ['animal-humane-20260301-0900'])
+
+    # The half-filled target this run created goes; the source stays
+    assert es.calls[-1] == ('delete', 'animal-humane-daily-20260301')
+    assert ('delete', 'animal-humane-20260301-0900') not in es.calls
+
+
+def test_failed_compaction_into_existing_index_removes_only_this_runs_documents():
+    es = DummyES({'animal-humane-monthly-202601': 40, 'animal-humane-20260131-0900': 3,
+                  'animal-humane-daily-20260130': 6})
+    es.indices.existing.add('animal-humane-monthly-202601')
+    es.copied = 45
+
+    with pytest.raises(RuntimeError):
+        compact_into(es, 'animal-humane-monthly-202601', ['animal-humane-20260131-0900', 'animal-humane-daily-20260130'])
+
+    _, index, query = next(call for call in es.calls if call[0] == 'delete_by_query')
+    assert index == 'animal-humane-monthly-202601'
+    assert query['bool']['should'] == [
+        {'terms': {'scrape.keyword': ['animal-humane-20260131-0900']}},
+        {'prefix': {'scrape.keyword': 'animal-humane-20260130-'}},
+    ]
+    assert es.calls[-1] == ('settings', 'animal-humane-monthly-202601', {'index.blocks.write': True})
+    assert 'delete' not in [call[0] for call in es.calls]
@@ -0,0 +1,48 @@
+from shelterdog_tracker.index_template import (
+    SNAPSHOT_TEMPLATE, SNAPSHOT_TEMPLATE_NAME, SNAPSHOT_TEMPLATE_VERSION, ensure_snapshot_template
+)
+
+
+class DummyIndices:
+    def __init__(self, installed_version=None):
+        self.installed_version = installed_version
+        self.put = []
+
+    def exists_index_template(self, name):
+        return self.installed_version is not None
+
+    def get_index_template(self, name):
+        return {'index_templates': [{'name': name, 'index_template': {'version': self.installed_version}}]}
+
+    def put_index_template(self, name, body):
+        self.put.append((name, body))
+
+
+class DummyES:
+    def __init__(self, installed_version=None):
+        self.indices = DummyIndices(installed_version)
+
+
+def test_template_types_the_fields_queries_depend_on():
+    props = SNAPSHOT_TEMPLATE['template']['mappings']['properties']
+    assert props['id']['type'] == 'long'
+    for field in ('status', 'location', 'origin'):
+        assert props[field]['type'] == 'keyword'
+        # Existing queries on <field>.keyword keep working
+        assert props[field]['fields']['keyword']['type'] == 'keyword'
+    assert props['timestamp']['type'] == 'date'
+    assert props['intake_date']['type'] == 'date'
+    assert SNAPSHOT_TEMPLATE['template']['settings']['index.sort.field'] == 'id'
+
+
+def test_ensure_snapshot_template_installs_missing_or_older_versions_only():
+    missing = DummyES()
+    assert ensure_snapshot_template(missing) is True
+    assert missing.indices.put[0][0] == SNAPSHOT_TEMPLATE_NAME
+
+    older = DummyES(installed_version=SNAPSHOT_TEMPLATE_VERSION - 1)
+    assert ensure_snapshot_template(older) is True
+
+    current = DummyES(installed_version=SNAPSHOT_TEMPLATE_VERSION)
+    assert ensure_snapshot_template(current) is False
+    assert current.indices.put == []
@@ -0,0 +1,73 @@
+from shelterdog_tracker import elasticsearch_handler
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler, LatestDoc
+
+
+class DummyES:
+    """Collapsed search over a point in time, two dogs per page."""
+    def __init__(self, docs_by_id, page_size=2):
+        self.docs_by_id = docs_by_id
+        self.page_size = page_size
+        self.searches = []
+        self.closed = []
+
+    def open_point_in_time(self, index, keep_alive):
+        return {'id': 'pit-0'}
+
+    def close_point_in_time(self, body):
+        self.closed.append(body['id'])
+
+    def search(self, body):
+        self.searches.append(dict(body))
+        assert body['collapse']['field'] == 'id'
+        size = body['collapse']['inner_hits']['size']
+        ids = sorted(i for i in self.docs_by_id if i in body['query']['terms']['id'])
+        after = body.get('search_after', [None])[0]
+        page = [i for i in ids if after is None or i > after][:self.page_size]
+        hits = [{
+            'fields': {'id': [dog_id]},
+            'sort': [dog_id],
+            'inner_hits': {'latest': {'hits': {'hits': [
+                {'_index': index, '_id': str(dog_id), '_source': source}
+                for index, source in self.docs_by_id[dog_id][:size]
+            ]}}}
+        } for dog_id in page]
+        return {'pit_id': f'pit-{len(self.searches)}', 'hits': {'hits': hits}}
+
+
+def make_handler(es):
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.es = es
+    return handler
+
+
+def test_latest_docs_pages_through_collapsed_hits(monkeypatch):
+    es = DummyES({
+        1: [('animal-humane-20260110-1100', {'location': ''})],
+        2: [('animal-humane-20260110-0900', {'location': 'Main Campus'})],
+        3: [('animal-humane-daily-20260101', {'location': 'Foster'})],
+    }, page_size=2)
+    handler = make_handler(es)
+    # Shrink the page so the test walks search_after
+    monkeypatch.setattr(elasticsearch_handler, 'LATEST_DOCS_PAGE_SIZE', 2)
+
+    latest = handler.recent_docs(['3', 1, 2, 99], fields=['location'])
+
+    assert latest[1] == [LatestDoc('animal-humane-20260110-1100', '1', {'location': ''})]
+    assert latest[3][0].index == 'animal-humane-daily-20260101'
+    assert 99 not in latest
+    # A full page asks for the next one; each batch of ids starts over
+    assert [(s['query']['terms']['id'], s.get('search_after')) for s in es.searches] == [
+        ([1, 2], None), ([1, 2], [2]), ([3, 99], None)
+    ]
+    assert es.closed  # the point in time is always released
+
+
+def test_latest_docs_returns_newest_and_recent_docs_several():
+    es = DummyES({5: [('animal-humane-20260110-1100', {'returned': 1}),
+                      ('animal-humane-20260109-1900', {'returned': 1})]})
+    handler = make_handler(es)
+
+    assert handler.latest_docs([5])[5].index == 'animal-humane-20260110-1100'
+    recent = handler.recent_docs([5], size=2)
+    assert [doc.index for doc in recent[5]] == ['animal-humane-20260110-1100', 'animal-humane-20260109-1900']
+    assert handler.latest_docs([]) == {}
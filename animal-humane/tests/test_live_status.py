@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from shelterdog_tracker.live_status import LiveStatusChecker, parse_animal
+
+PAGE = ('<html><body><iframe-animal :animal="{&quot;nid&quot;:{id},&quot;name&quot;:&quot;Nova&quot;,'
+        '&quot;location&quot;:&quot;{location}&quot;}" :settings="{}"></iframe-animal></body></html>')
+LOCATIONS = {1: 'Main Kennel North, MKN-18', 2: 'Main Campus, Trial Adoption', 3: ''}
+
+
+class DummyResponse:
+    def __init__(self, status, text=''):
+        self.status = status
+        self._text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return self._text
+
+
+class DummySession:
+    """Animal pages for dogs 1-3; dog 4's page is a 404."""
+    def __init__(self, requests):
+        self.requests = requests
+
+    def get(self, url):
+        dog_id = int(url.rsplit('/', 1)[-1])
+        self.requests.append(url)
+        if dog_id not in LOCATIONS:
+            return DummyResponse(404)
+        return DummyResponse(200, PAGE.replace('{id}', str(dog_id)).replace('{location}', LOCATIONS[dog_id]))
+
+    async def close(self):
+        pass
+
+
+def test_batch_check_parses_statuses_and_caches_successes():
+    requests = []
+    checker = LiveStatusChecker(rate=0, base_url='http://127.0.0.1:8081', session_factory=lambda: DummySession(requests))
+
+    statuses = checker.check_many_sync(['1', 2, 3, 4])
+
+    assert statuses[1].location == 'Main Kennel North, MKN-18' and not statuses[1].is_adopted
+    assert statuses[2].is_trial_adoption and statuses[3].is_adopted
+    assert statuses[4].error == 'HTTP 404' and statuses[4].as_dict()['location'] == 'error'
+    assert statuses[1].animal['name'] == 'Nova'
+    assert sorted(requests)[0] == 'http://127.0.0.1:8081/embed/animal/1'
+
+    # Fresh successes come from the cache; the failure is retried
+    requests.clear()
+    checker.check_many_sync([1, 2, 3, 4])
+    assert requests == ['http://127.0.0.1:8081/embed/animal/4']
+
+
+def test_rate_limit_spaces_requests(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    checker = LiveStatusChecker(rate=10, session_factory=lambda: DummySession([]))
+    monkeypatch.setattr('shelterdog_tracker.live_status.asyncio.sleep', fake_sleep)
+    asyncio.run(checker.check_many([1, 2, 3]))
+
+    # Three starts back to back need two waits, the last about 0.2s out
+    assert len(sleeps) == 2 and 0.15 < max(sleeps) <= 0.2
+    assert parse_animal('<div>no data</div>') is None
+
+
+def test_sync_check_inside_event_loop_points_to_check_many():
+    checker = LiveStatusChecker(rate=0, session_factory=lambda: DummySession([]))
+
+    async def handler():
+        with pytest.raises(RuntimeError, match='await check_many'):
+            checker.check_many_sync([1])
+        return await checker.check_many([1])
+
+    assert asyncio.run(handler())[1].location == 'Main Kennel North, MKN-18'
+
+
+def test_scrape_dog_locations_leaves_out_pages_without_animal_data(monkeypatch):
+    from shelterdog_tracker import shelter_scraper
+
+    class Session(DummySession):
+        def get(self, url):
+            if url.endswith('/5'):
+                return DummyResponse(200, '<html><body>Loading...</body></html>')
+            return super().get(url)
+
+    checker = LiveStatusChecker(rate=0, session_factory=lambda: Session([]))
+    monkeypatch.setattr(shelter_scraper, 'get_live_status_checker', lambda: checker)
+    scraper = shelter_scraper.ShelterScraper(fetcher=object())
+    urls = [f'https://new.shelterluv.com/embed/animal/{dog_id}' for dog_id in (1, 3, 4, 5)]
+
+    # 3 is adopted (""), 4 is a 404 and 5 has no :animal data, so neither 4 nor 5 is reported
+    assert scraper.scrape_dog_locations(urls) == {urls[0]: 'Main Kennel North, MKN-18', urls[1]: ''}
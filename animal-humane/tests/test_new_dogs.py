@@ -0,0 +1,32 @@
+from shelterdog_tracker import elasticsearch_handler
+from shelterdog_tracker.dog_id_sets import ScrapeIdSets
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+
+
+def test_get_new_dogs_diffs_id_sets_and_looks_names_up_once(monkeypatch):
+    class FixedDatetime(elasticsearch_handler.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 1, 10, 12, 0)
+
+    monkeypatch.setattr(elasticsearch_handler, 'datetime', FixedDatetime)
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.get_scrape_id_sets = lambda: ScrapeIdSets({
+        'animal-humane-20260109-1900': [1, 2],
+        'animal-humane-20260110-0900': [1, 2, 30],
+        'animal-humane-20260110-1100': [2, 4, 30],
+    })
+    lookups = []
+
+    def fake_first_seen(dog_ids):
+        lookups.append(sorted(dog_ids))
+        return {'4': {'id': 4, 'name': 'Rex', 'first_seen': '2026-01-10T11:00:00-07:00'}}
+    handler.get_first_seen = fake_first_seen
+
+    result = handler.get_new_dogs()
+
+    assert lookups == [['30', '4']]
+    assert result == {'new_dogs': [
+        {'name': 'Rex', 'url': 'https://new.shelterluv.com/embed/animal/4', 'first_seen': '2026-01-10T11:00:00-07:00'},
+        {'name': '(document not found)', 'url': 'https://new.shelterluv.com/embed/animal/30', 'first_seen': None},
+    ]}
@@ -0,0 +1,96 @@
+import pytest
+from elasticsearch import exceptions as es_exceptions
+
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+from shelterdog_tracker.read_session import PitClient
+
+
+class DummyIndices:
+    def exists(self, index):
+        return index != 'dog-state'
+
+
+class DummyES:
+    def __init__(self):
+        self.indices = DummyIndices()
+        self.searches = []
+        self.gets = []
+        self.closed = []
+
+    def open_point_in_time(self, index, keep_alive, ignore_unavailable=None):
+        self.opened = index
+        return {'id': 'pit-1'}
+
+    def close_point_in_time(self, body):
+        self.closed.append(body['id'])
+
+    def search(self, body=None, **kwargs):
+        self.searches.append(body)
+        return {'pit_id': 'pit-2', 'hits': {'hits': [{'_source': {'id': 1}, 'sort': [0]}]}}
+
+    def get(self, index, id):
+        self.gets.append((index, id))
+        return {'_source': {'scrape': id, 'storage_index': id}}
+
+
+class Catalog:
+    def latest_scrape(self):
+        return 'animal-humane-20260110-0900'
+
+
+def test_session_searches_one_pit_and_reads_each_manifest_once(monkeypatch):
+    es = DummyES()
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest', client=es)
+    monkeypatch.setattr(ElasticsearchHandler, 'index_catalog', property(lambda self: Catalog()))
+
+    with handler.read_session() as session:
+        assert session.get_scrape_manifest('animal-humane-20260110-0900') is not None
+        assert session.get_scrape_manifest('animal-humane-20260110-0900') is not None
+        session.es.search(index='animal-humane-20260110-*', body={'query': {'term': {'status': 'adopted'}}}, size=5)
+        session.es.search(index='animal-humane-20260110-*', body={})
+        # A missing concrete index still raises, so readers can fall back
+        with pytest.raises(es_exceptions.NotFoundError):
+            session.es.search(index='dog-state', body={})
+
+    assert 'dog-state' in es.opened and 'animal-humane-*' in es.opened
+    assert es.gets == [('dog-snapshot-manifests', 'animal-humane-20260110-0900')]
+    first, second = es.searches
+    assert first['pit'] == {'id': 'pit-1', 'keep_alive': '2m'} and first['size'] == 5
+    assert first['query']['bool']['filter'] == [{'wildcard': {'_index': 'animal-humane-20260110-*'}}]
+    assert first['query']['bool']['must'] == [{'term': {'status': 'adopted'}}]
+    # Later searches carry the id Elasticsearch handed back, and that's the one closed
+    assert second['pit']['id'] == 'pit-2' and es.closed == ['pit-2']
+    assert handler._read_cache is None
+
+
+def test_pit_scan_pages_with_search_after(monkeypatch):
+    monkeypatch.setattr('shelterdog_tracker.read_session.SCAN_PAGE_SIZE', 1)
+    es = DummyES()
+    pages = iter([[{'_source': {'id': 1}, 'sort': [7]}], []])
+    es.search = lambda body=None, **kwargs: (es.searches.append(dict(body)), {'hits': {'hits': next(pages)}})[1]
+
+    hits = list(PitClient(es, 'pit-1').scan(index='animal-humane-*', query={'query': {'match_all': {}}}))
+
+    assert [hit['_source']['id'] for hit in hits] == [1]
+    assert es.searches[0]['sort'] == ['_shard_doc'] and es.searches[1]['search_after'] == [7]
+
+
+def test_latest_docs_in_a_session_reuse_its_point_in_time(monkeypatch):
+    es = DummyES()
+    opened = []
+    es.open_point_in_time = lambda index, keep_alive, ignore_unavailable=None: opened.append(index) or {'id': 'pit-1'}
+    hit = {'fields': {'id': [1]}, 'inner_hits': {'latest': {'hits': {'hits': [
+        {'_index': 'animal-humane-20260110-0900', '_id': '1', '_source': {'name': 'Nova'}}]}}}}
+    es.search = lambda body=None, **kwargs: es.searches.append(body) or {'pit_id': 'pit-1', 'hits': {'hits': [hit]}}
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest', client=es)
+    monkeypatch.setattr(ElasticsearchHandler, 'index_catalog', property(lambda self: Catalog()))
+
+    with handler.read_session() as session:
+        latest = session.latest_docs([1], fields=['name'])
+        session.recent_docs([1, 2], size=2)
+
+    assert latest[1].source == {'name': 'Nova'}
+    # Only the session's own point in time was opened, and only it was closed
+    assert len(opened) == 1 and es.closed == ['pit-1']
+    assert all(body['pit']['id'] == 'pit-1' for body in es.searches)
+    assert es.searches[0]['query']['bool']['filter'] == [{'wildcard': {'_index': 'animal-humane-*'}}]
@@ -20,6 +20,8 @@ def test_recent_adopted_missing_with_trial_history_promotes_to_adopted():
     # DummyES will return both hits for any search; the handler logic will use them appropriately
     handler.es = DummyES([recent_adopted_hit, trial_history_hit])
     handler.get_all_ids = lambda idx: []
+    # Listed earlier today; its latest record comes back from the same hits
+    handler.get_listed_on = lambda day, fields=None: [hit['_source'] for hit in handler.es._hits][:1]
     handler.get_returned_dogs = lambda avail, idx: []
 
     groups = handler.get_dog_groups(availables, 'animal-humane-20251230-1500')
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from services.recent_pupdates_service import RecentPupdatesService
+from services.request_cache import coalesced, request_scope
+
+
+class DummyService:
+    def __init__(self):
+        self._in_flight = {}
+        self.calls = []
+
+    @coalesced
+    async def get_current_availables(self):
+        self.calls.append('availables')
+        await asyncio.sleep(0)
+        return [{'dog_id': 1, 'id': 1, 'name': 'Nova', 'location': 'Trial Adoption'}]
+
+    @coalesced
+    async def get_dog_events(self, event_types=None, since=None, dog_ids=None):
+        self.calls.append(('events', tuple(event_types)))
+        if since == 'broken':
+            raise RuntimeError('es down')
+        return [{'dog_id': 1}]
+
+
+def test_concurrent_calls_share_one_read_and_scopes_memoize():
+    service = DummyService()
+
+    async def run():
+        # No scope: only calls running at the same time are shared
+        await asyncio.gather(service.get_current_availables(), service.get_current_availables())
+        await service.get_current_availables()
+        assert service.calls == ['availables', 'availables']
+
+        service.calls.clear()
+        with request_scope():
+            await service.get_current_availables()
+            await asyncio.gather(service.get_dog_events(event_types=['intake']),
+                                 service.get_dog_events(event_types=['intake']),
+                                 service.get_dog_events(event_types=['returned']))
+            await service.get_current_availables()
+            # Failures aren't kept
+            for _ in range(2):
+                with pytest.raises(RuntimeError):
+                    await service.get_dog_events(event_types=['adopted'], since='broken')
+        assert service.calls == ['availables', ('events', ('intake',)), ('events', ('returned',)),
+                                 ('events', ('adopted',)), ('events', ('adopted',))]
+        assert service._in_flight == {}
+
+    asyncio.run(run())
+
+
+def test_recent_pupdates_reads_availables_once():
+    es_service = DummyService()
+    service = RecentPupdatesService(es_service=es_service, dog_service=object())
+
+    async def no_sections():
+        return []
+
+    service._get_adopted_dogs = service._get_unlisted_dogs = service._get_missing_dogs_data = no_sections
+
+    async def no_update():
+        return None
+
+    service._get_last_es_update = service._get_missing_dogs_last_update = no_update
+
+    asyncio.run(service.get_recent_pupdates())
+    assert es_service.calls.count('availables') == 1
+
+
+def test_adoption_events_normalize_like_the_other_sections():
+    class EventsService:
+        async def get_dog_events(self, event_types=None, since=None, dog_ids=None):
+            event = {'dog_id': 7, 'event': 'adopted', 'name': 'Rex', 'scrape': 'animal-humane-20260110-0900',
+                     'status': 'adopted', 'location': '', 'previous_status': 'Available',
+                     'url': 'https://new.shelterluv.com/embed/animal/7'}
+            return [dict(event, timestamp='2026-01-08T09:00:00'), dict(event, timestamp='2026-01-10T09:00:00')]
+
+    service = RecentPupdatesService(es_service=EventsService(), dog_service=object())
+
+    adopted = service._normalize_diff_section(asyncio.run(service._get_adopted_dogs()), 'adopted')
+
+    assert len(adopted) == 1
+    entry = adopted[0]
+    assert (entry.id, entry.name, entry.status, entry.location) == (7, 'Rex', 'adopted', '')
+    assert entry.url == 'https://new.shelterluv.com/embed/animal/7'
+    assert entry.section_metadata == {'source': 'diff_analysis_adopted'}
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+
+
+def _ms(iso):
+    return datetime.fromisoformat(iso).timestamp() * 1000
+
+
+def _bucket(dog_id, first_adopted, available_days):
+    return {
+        'key': dog_id,
+        'adopted': {'first': {'value': _ms(first_adopted)}},
+        'available': {'days': {'buckets': [
+            {'key_as_string': day, 'last': {'value': _ms(last)}} for day, last in available_days
+        ]}},
+    }
+
+
+def test_get_returned_dogs_uses_one_aggregation_for_all_availables():
+    searches = []
+
+    class DummyES:
+        def search(self, index, body):
+            searches.append(body)
+            return {'aggregations': {'dogs': {'buckets': [
+                # Adopted on the 8th, back on the site today
+                _bucket(1, '2026-01-08T11:00:00-07:00', [('2026-01-07', '2026-01-07T19:00:00-07:00'),
+                                                         ('2026-01-10', '2026-01-10T09:00:00-07:00')]),
+                # Came back yesterday, so not a return today
+                _bucket(2, '2026-01-05T11:00:00-07:00', [('2026-01-09', '2026-01-09T09:00:00-07:00'),
+                                                         ('2026-01-10', '2026-01-10T09:00:00-07:00')]),
+                # Adopted today
+                _bucket(3, '2026-01-10T09:00:00-07:00', [('2026-01-10', '2026-01-10T11:00:00-07:00')]),
+            ]}}}
+
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.es = DummyES()
+    availables = [{'dog_id': i, 'name': n, 'url': f'u{i}', 'location': 'MKN'} for i, n in [(1, 'Nova'), (2, 'Kia'), (3, 'Bo')]]
+
+    returned = handler.get_returned_dogs(availables, 'animal-humane-20260110-1100')
+
+    assert len(searches) == 1
+    assert searches[0]['query'] == {'terms': {'id': [1, 2, 3]}}
+    assert returned == [{'name': 'Nova', 'dog_id': 1, 'url': 'u1', 'location': 'MKN'}]
@@ -0,0 +1,130 @@
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+from shelterdog_tracker.snapshot_delta import content_hash, delta_index_for, is_unchanged, plan_delta
+
+
+def test_plan_delta_writes_only_added_and_changed_dogs():
+    previous = {
+        '1': {'id': 1, 'name': 'Nova', 'location': 'MKN-18', 'listed': True, 'timestamp': 'old'},
+        '2': {'id': 2, 'name': 'Kia', 'location': 'MKS-01', 'listed': True},
+        '3': {'id': 3, 'name': 'Bo', 'location': 'MKS-02', 'listed': True},
+        '4': {'id': 4, 'name': 'Pip', 'location': 'Foster', 'listed': False},
+    }
+    records = [
+        {'id': 1, 'name': 'Nova', 'location': 'MKN-18', 'timestamp': 'new', 'length_of_stay_days': 9},
+        {'id': 2, 'name': 'Kia', 'location': 'Main Campus, Trial Adoption'},
+        {'id': 4, 'name': 'Pip', 'location': 'Foster'},
+        {'id': 5, 'name': 'Rex', 'location': 'MKN-01'},
+    ]
+
+    to_write, added, changed, removed = plan_delta(previous, records)
+
+    assert [r['id'] for r in to_write] == [2, 4, 5]
+    assert added == [4, 5]
+    assert changed == [2]
+    assert removed == [3]
+
+    keyframe_write, _, _, _ = plan_delta(previous, records, keyframe=True)
+    assert [r['id'] for r in keyframe_write] == [1, 2, 4, 5]
+
+
+def test_delta_index_is_monthly():
+    assert delta_index_for('animal-humane-20260110-0900') == 'animal-humane-deltas-202601'
+
+
+def test_get_scrape_view_rebuilds_delta_scrape_from_manifest():
+    scrape = 'animal-humane-20260110-1300'
+    searches = []
+
+    class DummyIndices:
+        def exists(self, index):
+            return False
+
+    class DummyES:
+        indices = DummyIndices()
+
+        def get(self, index, id):
+            return {'_source': {'scrape': id, 'mode': 'delta', 'dog_ids': [1, 2], 'storage_index': 'animal-humane-deltas-202601'}}
+
+        def search(self, index, body):
+            searches.append((index, body))
+            return {'hits': {'hits': [
+                {'_source': {'id': 1, 'name': 'Nova', 'scrape': 'animal-humane-20260110-0900'}},
+                {'_source': {'id': 2, 'name': 'Kia', 'scrape': 'animal-humane-20260110-1300'}},
+            ]}}
+
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.es = DummyES()
+
+    view = handler.get_scrape_view(scrape)
+
+    assert sorted(view) == [1, 2]
+    index, body = searches[0]
+    assert index == 'animal-humane-deltas-202601'
+    assert body['collapse'] == {'field': 'id'}
+    assert {'range': {'scrape.keyword': {'lte': scrape}}} in body['query']['bool']['filter']
+
+
+def test_content_hash_ignores_volatile_fields_and_drives_plan_delta():
+    record = {'id': 1, 'name': 'Nova', 'location': 'MKN-18', 'timestamp': 'a', 'length_of_stay_days': 3}
+    later = dict(record, timestamp='b', length_of_stay_days=4, scrape='animal-humane-20260110-1100')
+    assert content_hash(record) == content_hash(later)
+    assert content_hash(record) != content_hash(dict(record, location='MKN-19'))
+
+    # dog-state holds the hash rather than every field it was computed from
+    previous = {'1': {'id': 1, 'listed': True, 'content_hash': content_hash(record)}}
+    _, added, changed, removed = plan_delta(previous, [later])
+    assert is_unchanged(added, changed, removed)
+    _, _, changed, _ = plan_delta(previous, [dict(later, location='MKN-19')])
+    assert changed == [1]
+
+
+def test_readers_of_the_newest_scrape_see_delta_scrapes():
+    import asyncio
+
+    from services.recent_pupdates_service import RecentPupdatesService
+    from shelterdog_tracker.async_elasticsearch_handler import AsyncElasticsearchHandler
+    from shelterdog_tracker.elasticsearch_handler import LatestDoc
+
+    delta_scrape = 'animal-humane-20260110-1100'
+
+    class Indices:
+        def exists(self, index):
+            # Only the last full scrape has an index
+            return index == 'animal-humane-20260110-0900'
+
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.es = type('ES', (), {'indices': Indices()})()
+    handler.get_scrape_view = lambda scrape, source=None: {
+        1: {'id': 1, 'status': 'Available', 'age_group': 'Adult'},
+        5: {'id': 5, 'status': 'Available', 'age_group': 'Puppy'},
+        6: {'id': 6, 'status': 'Available', 'age_group': 'Adult'},
+    }
+    assert handler.get_age_groups(delta_scrape) == [{'age_group': 'Adult', 'count': 2}, {'age_group': 'Puppy', 'count': 1}]
+
+    class AsyncES:
+        async def search(self, index, body):
+            return {'aggregations': {'unique_dogs': {'buckets': [{'key': 1}, {'key': 5}, {'key': 7}]}}}
+
+    async_handler = AsyncElasticsearchHandler('http://localhost:9200', client=AsyncES())
+
+    async def latest_docs(ids, fields=None):
+        return {dog_id: LatestDoc('animal-humane-deltas-202601', str(dog_id),
+                                  {'id': dog_id, 'name': f'Dog {dog_id}', 'status': 'Available', 'location': 'MKN-01'})
+                for dog_id in ids}
+    async_handler.latest_docs = latest_docs
+
+    class EsService:
+        def __init__(self):
+            self.async_handler = async_handler
+
+        async def get_most_recent_index(self):
+            return delta_scrape
+
+        async def get_scrape_ids(self, scrape):
+            # Dog 5 was added by the delta scrape, so only the full index lacks it
+            return [1, 5] if scrape == delta_scrape else [1]
+
+    service = RecentPupdatesService(es_service=EsService(), dog_service=object())
+    unlisted = asyncio.run(service._get_unlisted_dogs())
+
+    assert [dog['id'] for dog in unlisted] == [7]
@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+from shelterdog_tracker.snapshot_delta import scrape_name_at
+
+
+def test_scrape_name_at_uses_shelter_local_time():
+    assert scrape_name_at(datetime(2026, 1, 10, 9, 30)) == 'animal-humane-20260110-0930'
+    # 16:30 UTC is 09:30 in Albuquerque in January
+    assert scrape_name_at(datetime(2026, 1, 10, 16, 30, tzinfo=timezone.utc)) == 'animal-humane-20260110-0930'
+
+
+def test_state_at_reads_newest_scrape_at_or_before_the_moment():
+    class DummyES:
+        def search(self, index, body):
+            assert body['query'] == {'range': {'scrape': {'lte': 'animal-humane-20260110-1200'}}}
+            return {'hits': {'hits': [{'_source': {'scrape': 'animal-humane-20260110-1100'}}]}}
+
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.es = DummyES()
+    # An older snapshot without a manifest loses to the newer delta scrape
+    handler.get_snapshot_indices = lambda: ['animal-humane-20260109-1900', 'animal-humane-20260110-1300']
+    viewed = []
+
+    def fake_view(scrape, source=None):
+        viewed.append(scrape)
+        return {2: {'id': 2, 'name': 'Kia'}, 1: {'id': 1, 'name': 'Nova'}}
+    handler.get_scrape_view = fake_view
+
+    state = handler.state_at(datetime(2026, 1, 10, 12, 0))
+
+    assert viewed == ['animal-humane-20260110-1100']
+    assert state['scrape'] == 'animal-humane-20260110-1100'
+    assert [d['id'] for d in state['dogs']] == [1, 2]
@@ -0,0 +1,53 @@
+from shelterdog_tracker import elasticsearch_handler
+from shelterdog_tracker.dog_id_sets import ScrapeIdSets
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler, LatestDoc
+
+
+class Catalog:
+    """Today's only scrape was unchanged, so the newest index is yesterday's."""
+    def latest_scrape(self):
+        return 'animal-humane-20260110-0900'
+
+
+def make_handler(monkeypatch):
+    class FixedDatetime(elasticsearch_handler.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 1, 10, 12, 0)
+
+    monkeypatch.setattr(elasticsearch_handler, 'datetime', FixedDatetime)
+    monkeypatch.setattr(ElasticsearchHandler, 'index_catalog', property(lambda self: Catalog()))
+    handler = ElasticsearchHandler(host='http://localhost:9200', index_name='animal-humane-latest')
+    handler.get_scrape_id_sets = lambda: ScrapeIdSets({
+        'animal-humane-20260109-1900': [1, 2, 3],
+        'animal-humane-20260110-0900': [1, 2],
+    })
+    records = {
+        1: {'id': 1, 'name': 'Nova', 'status': 'Available', 'location': 'Main Kennel North'},
+        2: {'id': 2, 'name': 'Rex', 'status': 'adopted', 'location': ''},
+        3: {'id': 3, 'name': 'Old', 'status': 'adopted', 'location': ''},
+    }
+    handler.latest_docs = lambda ids, fields=None: {
+        dog_id: LatestDoc('animal-humane-20260109-1900', str(dog_id), records[dog_id]) for dog_id in ids
+    }
+    return handler
+
+
+def test_dog_groups_use_the_newest_scrape_even_without_its_own_index(monkeypatch):
+    handler = make_handler(monkeypatch)
+    seen = []
+    handler.get_all_ids = lambda idx: seen.append(idx) or [1, 2]
+    handler.get_returned_dogs = lambda availables, idx: seen.append(idx) or []
+
+    groups = handler.get_dog_groups([{'dog_id': 1, 'name': 'Nova', 'location': 'Main Kennel North'}],
+                                    'animal-humane-20260109-1900')
+
+    # Only today's adoption; dog 3 was yesterday's and isn't reported again
+    assert [dog['dog_id'] for dog in groups['adopted_dogs']] == [2]
+    assert seen == ['animal-humane-20260110-0900'] * 2
+
+
+def test_unlisted_dogs_cover_days_whose_scrapes_wrote_no_index(monkeypatch):
+    handler = make_handler(monkeypatch)
+
+    assert handler.get_unlisted_dogs() == [{'name': 'Nova', 'id': 1}]
@@ -4,52 +4,26 @@ Update static data files for the portfolio demo deployment
 This includes both timestamp updates and location_info.jsonl synchronization
 """
 import json
-import requests
-from datetime import datetime
 import os
 import shutil
 from pathlib import Path
 
+from shelterdog_tracker.elasticsearch_handler import ElasticsearchHandler
+from shelterdog_tracker.index_catalog import parse_scrape_time
+
 def get_latest_index_timestamp():
     """Get the timestamp from the most recent Elasticsearch index"""
     try:
-        # Query Elasticsearch for indices
-        response = requests.get('http://localhost:9200/_cat/indices/animal-humane-*?format=json&h=index')
-        if response.status_code != 200:
-            print(f"❌ Failed to query Elasticsearch: {response.status_code}")
-            return None
-            
-        indices = response.json()
-        if not indices:
+        # The shared index catalog knows every scrape, however it's stored
+        es_host = os.getenv('ELASTICSEARCH_HOST', 'http://localhost:9200')
+        handler = ElasticsearchHandler(host=es_host, index_name="animal-humane-latest")
+        latest_index = handler.index_catalog.latest_scrape()
+        if not latest_index:
             print("❌ No animal-humane indices found")
             return None
-            
-        # Find the most recent index
-        index_names = [idx['index'] for idx in indices]
-        latest_index = sorted(index_names)[-1]
         print(f"📊 Latest index: {latest_index}")
         
-        # Parse timestamp from index name (format: animal-humane-YYYYMMDD-HHMM)
-        if '-' not in latest_index:
-            print(f"❌ Invalid index name format: {latest_index}")
-            return None
-            
-        parts = latest_index.split('-')
-        if len(parts) < 4:
-            print(f"❌ Invalid index name format: {latest_index}")
-            return None
-            
-        date_part = parts[2]  # YYYYMMDD
-        time_part = parts[3]  # HHMM
-        
-        # Convert to datetime
-        year = int(date_part[:4])
-        month = int(date_part[4:6])
-        day = int(date_part[6:8])
-        hour = int(time_part[:2])
-        minute = int(time_part[2:4])
-        
-        dt = datetime(year, month, day, hour, minute)
+        dt = parse_scrape_time(latest_index)
         
         return dt, latest_index
         